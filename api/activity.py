@@ -0,0 +1,48 @@
+"""
+Materialized discussion activity.
+
+``Discussion.comment_count`` and ``Discussion.last_activity_at`` (the
+creation time of the newest comment, or of the discussion if it has none)
+let lists sort by activity without a correlated ``MAX()`` per row.
+``api.signals`` keeps them current. A new comment bumps the count and
+advances the time with ``F()``/``GREATEST`` in one UPDATE. A deleted comment
+decrements the count and recomputes the time from the
+``(discussion, created_at, id)`` index, also in one UPDATE, unless its
+discussion is deleted along with it. ``reconcile_discussion_activity``
+repairs everything, e.g. after bulk inserts that skip the signals.
+"""
+from django.db.models import Case, Count, F, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Comment, Discussion
+
+
+def latest_comment_at():
+    comments = Comment.objects.filter(discussion_id=OuterRef('pk')).order_by('-created_at')
+    return Subquery(comments.values('created_at')[:1])
+
+
+def discussion_activity():
+    """UPDATE expressions recomputing the activity of each discussion row."""
+    comments = Comment.objects.filter(discussion_id=OuterRef('pk')).order_by()
+    return {
+        'comment_count': Coalesce(Subquery(
+            comments.values('discussion_id').annotate(total=Count('pk')).values('total')
+        ), 0),
+        'last_activity_at': Greatest('created_at', Coalesce(latest_comment_at(), 'created_at')),
+    }
+
+
+def comment_added(comment):
+    Discussion.objects.filter(pk=comment.discussion_id).update(
+        comment_count=F('comment_count') + 1,
+        last_activity_at=Greatest('last_activity_at', Value(comment.created_at)),
+    )
+
+
+def comment_removed(comment):
+    Discussion.objects.filter(pk=comment.discussion_id).update(
+        # Never below zero; the column is unsigned on MySQL.
+        comment_count=Case(When(comment_count__gt=0, then=F('comment_count') - 1), default=0),
+        last_activity_at=Greatest('created_at', Coalesce(latest_comment_at(), 'created_at')),
+    )
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Category, Discussion, Comment, News, ProgrammingLanguage, CodeSnippet, Code, Tag, Blog
+from .models import Category, Discussion, Comment, News, ProgrammingLanguage, CodeSnippet, Code, Tag, Blog, Reaction
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -10,7 +10,7 @@ class CategoryAdmin(admin.ModelAdmin):
 
 @admin.register(Discussion)
 class DiscussionAdmin(admin.ModelAdmin):
-    list_display = ('title', 'author', 'category', 'created_at', 'views')
+    list_display = ('title', 'author', 'category', 'created_at', 'views', 'unique_views')
     list_filter = ('category', 'created_at', 'is_pinned')
     search_fields = ('title', 'content')
     date_hierarchy = 'created_at'
@@ -34,7 +34,7 @@ class ProgrammingLanguageAdmin(admin.ModelAdmin):
 
 @admin.register(CodeSnippet)
 class CodeSnippetAdmin(admin.ModelAdmin):
-    list_display = ('title', 'author', 'created_at')
+    list_display = ('title', 'author', 'created_at', 'likes_count', 'dislikes_count')
     list_filter = ('created_at', 'author')
     search_fields = ('title', 'description')
     date_hierarchy = 'created_at'
@@ -47,6 +47,12 @@ class SnippetCodeAdmin(admin.ModelAdmin):
 
 @admin.register(Blog)
 class BlogAdmin(admin.ModelAdmin):
-    list_display = ('title', 'author', 'created_at')
+    list_display = ('title', 'author', 'created_at', 'likes_count')
     search_fields = ('title', 'content')
-    list_filter = ('created_at', 'tags')
\ No newline at end of file
+    list_filter = ('created_at', 'tags')
+
+@admin.register(Reaction)
+class ReactionAdmin(admin.ModelAdmin):
+    list_display = ('user', 'kind', 'content_type', 'object_id', 'created_at')
+    list_filter = ('kind', 'content_type')
+    raw_id_fields = ('user',)
\ No newline at end of file
@@ -0,0 +1,230 @@
+"""
+Async read path for the busiest list and detail endpoints.
+
+Under ASGI, ``backend.asgi_urls`` sends GET requests for discussions, blogs,
+snippets and news to the views below. They borrow querysets, pagination,
+permissions, validators and serializers from the sync viewsets, but fetch
+rows with the async ORM (``aiterator``/``aget``). A slow query therefore
+suspends a coroutine instead of holding one of the server's sync threads.
+Every other method is handed to the sync viewset unchanged.
+
+``prefetch_related()`` cannot be combined with ``aiterator()`` on Django 4.2,
+so prefetches run as one ``prefetch_related_objects`` call after the page has
+been fetched.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.db.models import prefetch_related_objects
+from django.http import Http404, HttpResponse
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .authentication import aget_user
+from .cache import cached_response, store_response
+from .conditional import ConditionalGetMixin, not_modified, set_validators
+from .reactions import auser_reactions
+from .viewcounts import view_counter, viewer_key
+from .views import BlogViewSet, CodeSnippetViewSet, DiscussionViewSet, NewsViewSet, UserReactionContextMixin
+
+# (view class, detail) -> sync viewset view that handles non-GET methods.
+_sync_views = {}
+
+
+async def authenticate(request):
+    """``CachedJWTAuthentication.authenticate`` with the user fetched through the async ORM."""
+    authenticator = JWTAuthentication()
+    header = authenticator.get_header(request)
+    raw_token = authenticator.get_raw_token(header) if header is not None else None
+    if raw_token is None:
+        return AnonymousUser()
+
+    return await aget_user(authenticator.get_validated_token(raw_token))
+
+
+async def fetch(queryset):
+    """Evaluate ``queryset`` with ``aiterator()``, then apply its prefetches."""
+    lookups = queryset._prefetch_related_lookups
+    rows = [row async for row in queryset.prefetch_related(None).aiterator()]
+    if rows and lookups:
+        await sync_to_async(prefetch_related_objects)(rows, *lookups)
+    return rows
+
+
+def render(response):
+    """Render a DRF ``Response`` as JSON here rather than in a sync thread."""
+    if not isinstance(response, Response):
+        return response
+    response.accepted_renderer = JSONRenderer()
+    response.accepted_media_type = JSONRenderer.media_type
+    response.renderer_context = {}
+    response.render()
+    rendered = HttpResponse(response.content, status=response.status_code)
+    for name, value in response.items():
+        rendered[name] = value
+    return rendered
+
+
+class AsyncReadView(View):
+    """
+    Async ``list``/``retrieve`` for ``viewset_class``. Route the list URL with
+    no kwargs and the detail URL with ``pk``.
+    """
+    viewset_class = None
+    list_actions = {'get': 'list', 'post': 'create'}
+    detail_actions = {'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'}
+    # Serialize in a worker thread when serializers do blocking work (file
+    # or cache access) that must not run on the event loop.
+    serialize_in_thread = False
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # Token-authenticated like the DRF views. csrf_exempt() cannot wrap
+        # async views on Django 4.2.
+        view.csrf_exempt = True
+        return view
+
+    async def get(self, request, *args, **kwargs):
+        try:
+            viewset = await self.initialize(request, 'retrieve' if 'pk' in kwargs else 'list', kwargs)
+            if 'pk' in kwargs:
+                response = await self.retrieve(viewset, kwargs['pk'])
+            else:
+                response = await self.list(viewset)
+        except Http404:
+            response = self.handle_exception(request, exceptions.NotFound())
+        except exceptions.APIException as exc:
+            response = self.handle_exception(request, exc)
+        return render(response)
+
+    async def delegate(self, request, *args, **kwargs):
+        detail = 'pk' in kwargs
+        key = (type(self), detail)
+        if key not in _sync_views:
+            actions = self.detail_actions if detail else self.list_actions
+            _sync_views[key] = self.viewset_class.as_view(actions)
+        return await sync_to_async(_sync_views[key])(request, *args, **kwargs)
+
+    post = put = patch = delete = head = options = delegate
+
+    async def initialize(self, request, action, kwargs):
+        user = await authenticate(request)
+        drf_request = Request(request)
+        drf_request.user = user
+        viewset = self.viewset_class(
+            request=drf_request, args=(), kwargs=kwargs, action=action, format_kwarg=None,
+        )
+        for permission in viewset.get_permissions():
+            if not permission.has_permission(drf_request, viewset):
+                if not user.is_authenticated:
+                    raise exceptions.NotAuthenticated()
+                raise exceptions.PermissionDenied(getattr(permission, 'message', None))
+        return viewset
+
+    def handle_exception(self, request, exc):
+        # Same body shape as DRF's default exception handler.
+        data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+        response = Response(data, status=exc.status_code)
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            response.status_code = 401
+            response['WWW-Authenticate'] = JWTAuthentication().authenticate_header(request)
+        return response
+
+    async def serialize(self, viewset, data, many=False):
+        context = viewset.get_serializer_context()
+        user = viewset.request.user
+        if isinstance(viewset, UserReactionContextMixin) and user.is_authenticated:
+            ids = [instance.pk for instance in data] if many else [data.pk]
+            context['user_reactions'] = await auser_reactions(user, viewset.queryset.model, ids)
+
+        serializer = viewset.get_serializer_class()(data, many=many, context=context)
+        if self.serialize_in_thread:
+            return await sync_to_async(lambda: serializer.data)()
+        # Everything is loaded by now; a stray lazy query raises
+        # SynchronousOnlyOperation instead of going unnoticed.
+        return serializer.data
+
+    async def list(self, viewset):
+        request = viewset.request
+        namespace = getattr(viewset, 'cache_namespace', None)
+        if namespace:
+            key, response = await sync_to_async(cached_response)(namespace, request)
+            if response is not None:
+                return response
+
+        etag = last_modified = None
+        if isinstance(viewset, ConditionalGetMixin):
+            etag, last_modified = await viewset.aget_list_etag(request)
+            response = not_modified(request, etag)
+            if response is not None:
+                return response
+
+        queryset = viewset.filter_queryset(viewset.get_queryset())
+        paginator = viewset.paginator
+        if paginator is not None:
+            page_queryset = paginator.get_page_queryset(queryset, request, view=viewset)
+            rows = paginator.build_page(await fetch(page_queryset))
+            response = paginator.get_paginated_response(await self.serialize(viewset, rows, many=True))
+        else:
+            response = Response(await self.serialize(viewset, await fetch(queryset), many=True))
+
+        if etag is not None:
+            set_validators(response, etag, last_modified)
+        if namespace:
+            await sync_to_async(store_response)(key, response)
+        return response
+
+    async def retrieve(self, viewset, pk):
+        request = viewset.request
+        queryset = viewset.filter_queryset(viewset.get_queryset())
+        try:
+            instance = await queryset.prefetch_related(None).aget(pk=pk)
+        except (ObjectDoesNotExist, TypeError, ValueError, ValidationError):
+            raise exceptions.NotFound()
+        lookups = queryset._prefetch_related_lookups
+        if lookups:
+            await sync_to_async(prefetch_related_objects)([instance], *lookups)
+        viewset.check_object_permissions(request, instance)
+        await self.on_retrieve(viewset, instance)
+
+        etag = last_modified = None
+        if isinstance(viewset, ConditionalGetMixin):
+            etag, last_modified = viewset.get_object_etag(request, instance)
+            response = not_modified(request, etag)
+            if response is not None:
+                return response
+
+        response = Response(await self.serialize(viewset, instance))
+        if etag is not None:
+            set_validators(response, etag, last_modified)
+        return response
+
+    async def on_retrieve(self, viewset, instance):
+        pass
+
+
+class AsyncDiscussionView(AsyncReadView):
+    viewset_class = DiscussionViewSet
+
+    async def on_retrieve(self, viewset, instance):
+        # record() occasionally flushes the buffer to the database.
+        await sync_to_async(view_counter.record)(instance.pk, viewer_key(viewset.request))
+
+
+class AsyncBlogView(AsyncReadView):
+    viewset_class = BlogViewSet
+    # Versioned image URLs stat the files and consult the cache.
+    serialize_in_thread = True
+
+
+class AsyncCodeSnippetView(AsyncReadView):
+    viewset_class = CodeSnippetViewSet
+
+
+class AsyncNewsView(AsyncReadView):
+    viewset_class = NewsViewSet
@@ -0,0 +1,91 @@
+"""
+JWT authentication with the user row served from the cache.
+
+``JWTAuthentication`` loads the user from the database on every request.
+``CachedJWTAuthentication`` keeps it in Django's default cache for
+``JWT_USER_CACHE_TIMEOUT`` seconds instead, keyed by user id and a per-user
+version. ``api.signals`` bumps the version whenever the user row is saved or
+deleted (status toggles, profile updates, password changes), so the next
+request reloads it. Bumping a version rather than deleting the entry means a
+request that read the row before the change cannot put the old copy back.
+Versions start from the clock, so one evicted from the cache never returns
+to a value an old entry is stored under.
+
+The is_active and revoked-token checks still run on every request. With the
+default per-process memory cache, other workers only see a change once
+their entry expires; use a shared CACHE_BACKEND for immediate invalidation.
+"""
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+KEY_PREFIX = 'jwt-user'
+
+User = get_user_model()
+
+
+def _version_key(user_id):
+    return f'{KEY_PREFIX}:version:{user_id}'
+
+
+def invalidate_user(user_id):
+    key = _version_key(user_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), None)
+        cache.incr(key)
+
+
+def _user_id(validated_token):
+    try:
+        return validated_token[api_settings.USER_ID_CLAIM]
+    except KeyError:
+        raise InvalidToken('Token contained no recognizable user identification')
+
+
+def _check_user(user, validated_token):
+    if user is None:
+        raise AuthenticationFailed('User not found', code='user_not_found')
+    if not user.is_active:
+        raise AuthenticationFailed('User is inactive', code='user_inactive')
+    if api_settings.CHECK_REVOKE_TOKEN:
+        if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed("The user's password has been changed.", code='password_changed')
+    return user
+
+
+def get_user(validated_token):
+    user_id = _user_id(validated_token)
+    version = cache.get_or_set(_version_key(user_id), time.time_ns, None)
+    key = f'{KEY_PREFIX}:{user_id}:{version}'
+    user = cache.get(key)
+    if user is None:
+        user = User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+        if user is not None:
+            cache.set(key, user, settings.JWT_USER_CACHE_TIMEOUT)
+    return _check_user(user, validated_token)
+
+
+async def aget_user(validated_token):
+    """``get_user`` for async views."""
+    user_id = _user_id(validated_token)
+    version = await cache.aget_or_set(_version_key(user_id), time.time_ns, None)
+    key = f'{KEY_PREFIX}:{user_id}:{version}'
+    user = await cache.aget(key)
+    if user is None:
+        user = await User.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).afirst()
+        if user is not None:
+            await cache.aset(key, user, settings.JWT_USER_CACHE_TIMEOUT)
+    return _check_user(user, validated_token)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        return get_user(validated_token)
@@ -0,0 +1,115 @@
+"""
+Batched creation of snippets and blogs.
+
+The single-object create serializers and the ``bulk`` endpoints both go
+through here. Tags are resolved with one ``IN`` lookup plus one bulk insert
+for the missing ones. Codes and tag links are inserted with ``bulk_create``,
+and the new rows are indexed for search in one pass. Each call runs in one
+transaction. On backends that cannot return the ids of a multi-row INSERT
+(MySQL), parent rows are saved one at a time with search indexing paused.
+
+``bulk_create`` bypasses ``post_save`` and ``m2m_changed``, so search
+indexing, tag statistics and the tag response-cache invalidation that the
+signals normally handle happen here explicitly.
+"""
+from django.db import connections, router, transaction
+from django.db.models import Prefetch, prefetch_related_objects
+from django.utils.text import slugify
+
+from .cache import CACHE_NAMESPACES, invalidate
+from .models import Blog, Code, CodeSnippet, Tag
+from .search import index_objects, paused_indexing
+from .tags import refresh_tag_stats
+
+BATCH_SIZE = 500
+
+
+def _insert(objs):
+    """Insert ``objs`` and set their primary keys; the caller indexes them."""
+    if not objs:
+        return
+    model = type(objs[0])
+    using = router.db_for_write(model)
+    if connections[using].features.can_return_rows_from_bulk_insert:
+        model.objects.bulk_create(objs, batch_size=BATCH_SIZE)
+        return
+    # MySQL does not report the ids of a multi-row INSERT, and the children
+    # need them, so save row by row. The rows are still indexed in one pass
+    # like on the other backends.
+    with transaction.atomic(using=using, savepoint=False), paused_indexing():
+        for obj in objs:
+            obj.save(force_insert=True, using=using)
+
+
+def resolve_tags(names):
+    """Return ``{name: Tag}`` for ``names``, creating the tags that don't exist yet."""
+    slugs = {name: slugify(name) for name in names}
+    tags = {tag.slug: tag for tag in Tag.objects.filter(slug__in=set(slugs.values()))}
+
+    missing = {}
+    for name, slug in slugs.items():
+        if slug not in tags:
+            missing.setdefault(slug, Tag(name=name.lower(), slug=slug))
+    if missing:
+        # A concurrent request may create the same tag; skip it and read
+        # back whatever won.
+        Tag.objects.bulk_create(missing.values(), ignore_conflicts=True)
+        tags.update((tag.slug, tag) for tag in Tag.objects.filter(slug__in=missing))
+        invalidate(CACHE_NAMESPACES[Tag])
+
+    return {name: tags[slug] for name, slug in slugs.items()}
+
+
+def create_snippets(items):
+    """
+    Create snippets from validated data. Each item holds the snippet's fields
+    (including ``author``) and a ``codes`` list. Returns the new snippets.
+    """
+    items = [dict(item) for item in items]
+    with transaction.atomic():
+        snippets = [
+            CodeSnippet(**{key: value for key, value in item.items() if key != 'codes'})
+            for item in items
+        ]
+        _insert(snippets)
+
+        Code.objects.bulk_create([
+            Code(snippet=snippet, **code)
+            for snippet, item in zip(snippets, items)
+            for code in item['codes']
+        ], batch_size=BATCH_SIZE)
+        # Read the codes back, since MySQL leaves bulk-created rows without
+        # ids. Prefetching them also serves the create response.
+        prefetch_related_objects(snippets, Prefetch('codes', queryset=Code.objects.select_related('language')))
+        codes = [code for snippet in snippets for code in snippet.codes.all()]
+
+        index_objects(snippets + codes)
+    return snippets
+
+
+def create_blogs(items):
+    """
+    Create blogs from validated data. Each item holds the blog's fields
+    (including ``author``) and an optional ``tags`` list of names. Returns
+    the new blogs.
+    """
+    items = [dict(item) for item in items]
+    with transaction.atomic():
+        tags = resolve_tags({name for item in items for name in item.get('tags', [])})
+        blogs = [
+            Blog(**{key: value for key, value in item.items() if key != 'tags'})
+            for item in items
+        ]
+        _insert(blogs)
+
+        BlogTag = Blog.tags.through
+        links = []
+        for blog, item in zip(blogs, items):
+            tag_ids = dict.fromkeys(tags[name].pk for name in item.get('tags', []))
+            links.extend(BlogTag(blog_id=blog.pk, tag_id=tag_id) for tag_id in tag_ids)
+        BlogTag.objects.bulk_create(links, batch_size=BATCH_SIZE)
+        # Inserted directly, so m2m_changed doesn't fire.
+        refresh_tag_stats({link.tag_id for link in links})
+
+        index_objects(blogs)
+    return blogs
@@ -0,0 +1,126 @@
+"""
+Response caching for rarely changing reference data.
+
+List responses are stored in Django's default cache, keyed by path and query
+string. Each namespace has a generation number that is part of every key.
+The post_save/post_delete handlers in ``api.signals`` invalidate a namespace
+by bumping its generation, so stale entries are never read again and simply
+expire. This works the same on the locmem, file and database backends, none
+of which can delete keys by pattern. A generation starts from the clock
+rather than 1, so a counter evicted from the cache never comes back with a
+value that older entries were stored under.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+from .conditional import make_etag, not_modified, set_validators
+from .models import Category, News, ProgrammingLanguage, Tag
+
+KEY_PREFIX = 'respcache'
+
+# Model -> cache namespace invalidated when a row of that model changes.
+CACHE_NAMESPACES = {
+    Tag: 'tags',
+    ProgrammingLanguage: 'languages',
+    Category: 'categories',
+    News: 'news',
+}
+
+
+def _incr(key, start=0):
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.add(key, start, None)
+        return cache.incr(key)
+
+
+def generation(namespace):
+    return cache.get_or_set(f'{KEY_PREFIX}:gen:{namespace}', time.time_ns, None)
+
+
+def invalidate(namespace):
+    _incr(f'{KEY_PREFIX}:gen:{namespace}', start=time.time_ns())
+
+
+def record(namespace, outcome):
+    _incr(f'{KEY_PREFIX}:stats:{namespace}:{outcome}')
+
+
+def stats():
+    keys = {
+        f'{KEY_PREFIX}:stats:{namespace}:{outcome}': (namespace, outcome)
+        for namespace in CACHE_NAMESPACES.values()
+        for outcome in ('hits', 'misses')
+    }
+    values = cache.get_many(list(keys))
+    result = {namespace: {'hits': 0, 'misses': 0} for namespace in CACHE_NAMESPACES.values()}
+    for key, (namespace, outcome) in keys.items():
+        result[namespace][outcome] = values.get(key, 0)
+    return result
+
+
+def response_cache_key(namespace, request):
+    query = sorted(
+        (name, value)
+        for name, values in request.query_params.lists()
+        for value in values
+    )
+    digest = hashlib.md5(
+        f'{request.get_host()}{request.path}?{query}'.encode('utf-8'),
+        usedforsecurity=False,
+    ).hexdigest()
+    return f'{KEY_PREFIX}:{namespace}:{generation(namespace)}:{digest}'
+
+
+def cached_response(namespace, request):
+    """
+    Look up the cached list response for ``request``. Returns ``(key,
+    response)``, where ``response`` is None on a miss; pass ``key`` to
+    ``store_response()`` once the response has been built.
+    """
+    key = response_cache_key(namespace, request)
+    cached = cache.get(key)
+    if cached is None:
+        record(namespace, 'misses')
+        return key, None
+
+    record(namespace, 'hits')
+    data, etag = cached
+    response = not_modified(request, etag)
+    if response is None:
+        response = set_validators(Response(data), etag)
+    response['X-Cache'] = 'HIT'
+    return key, response
+
+
+def store_response(key, response):
+    if response.status_code == 200:
+        etag = response.get('ETag') or make_etag(key)
+        set_validators(response, etag)
+        cache.set(key, (response.data, etag), settings.RESPONSE_CACHE_TIMEOUT)
+    response['X-Cache'] = 'MISS'
+    return response
+
+
+class CachedListMixin:
+    """
+    Serve ``list`` from the response cache. Set ``cache_namespace`` to one of
+    the values of ``CACHE_NAMESPACES``. Permission checks still run first,
+    because ``list`` is only reached after ``initial()``.
+
+    The entry's ETag is cached with it, so a conditional request is answered
+    with 304 without touching the database. List this mixin before
+    ``ConditionalGetMixin``.
+    """
+    cache_namespace = None
+
+    def list(self, request, *args, **kwargs):
+        key, response = cached_response(self.cache_namespace, request)
+        if response is not None:
+            return response
+        return store_response(key, super().list(request, *args, **kwargs))
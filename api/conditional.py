@@ -0,0 +1,134 @@
+"""
+Conditional GET for list and detail endpoints.
+
+Validators come from cheap queries rather than from the rendered payload:
+one aggregate (``MAX(updated_at)``, ``COUNT(*)`` and the sums of the ids and
+any counter columns) over the rows of the requested page for lists, and the
+fetched row for details. A matching ``If-None-Match`` is answered with 304
+before any serializer runs. ``If-Modified-Since`` is not honoured: counters
+and comments change without touching ``updated_at``, so ``Last-Modified`` is
+sent for information only.
+"""
+import hashlib
+
+from django.db.models import Count, Max, Sum
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+
+def make_etag(*parts):
+    seed = '|'.join(str(part) for part in parts)
+    return quote_etag(hashlib.md5(seed.encode('utf-8'), usedforsecurity=False).hexdigest())
+
+
+def set_validators(response, etag, last_modified=None):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    # Payloads can include per-user fields, so browsers must revalidate and
+    # shared caches must key on the credentials.
+    response['Cache-Control'] = 'private, no-cache'
+    patch_vary_headers(response, ['Authorization'])
+    return response
+
+
+def not_modified(request, etag):
+    """Return a 304 response if the request's If-None-Match matches, else None."""
+    response = get_conditional_response(request, etag=etag)
+    if response is not None:
+        set_validators(response, etag)
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    ETag/Last-Modified handling for ``list`` and ``retrieve``.
+
+    ``last_modified_field`` must be kept current on every write to the row.
+    ``version_fields`` name counter columns that change through
+    ``QuerySet.update()`` without touching it; they are folded into the ETag.
+    """
+    last_modified_field = 'updated_at'
+    version_fields = ()
+
+    def get_validator_queryset(self):
+        return self.filter_queryset(self.get_queryset())
+
+    def get_list_validator_queryset(self, request):
+        """
+        The rows of the requested page, including the one the paginator
+        reads ahead to decide on a next link, so validating a list costs the
+        same as fetching its page rather than a pass over the whole table.
+        """
+        queryset = self.get_validator_queryset()
+        paginator = self.paginator
+        if paginator is not None and hasattr(paginator, 'get_page_queryset'):
+            return paginator.get_page_queryset(queryset, request, view=self)
+        return queryset.order_by()
+
+    def get_list_aggregates(self):
+        aggregates = {
+            'last_modified': Max(self.last_modified_field),
+            'count': Count('pk'),
+            # Changes when a row enters or leaves the page.
+            'ids': Sum('pk'),
+        }
+        for field in self.version_fields:
+            aggregates[f'{field}_total'] = Sum(field)
+        return aggregates
+
+    def get_list_validators(self, queryset):
+        values = queryset.aggregate(**self.get_list_aggregates())
+        return values, values['last_modified']
+
+    async def aget_list_validators(self, queryset):
+        values = await queryset.aaggregate(**self.get_list_aggregates())
+        return values, values['last_modified']
+
+    def get_object_validators(self, instance):
+        values = {field: getattr(instance, field) for field in self.version_fields}
+        return values, getattr(instance, self.last_modified_field)
+
+    def get_list_etag(self, request):
+        """Return ``(etag, last_modified)`` for the list ``request`` asks for."""
+        values, last_modified = self.get_list_validators(self.get_list_validator_queryset(request))
+        return self.make_list_etag(request, values), last_modified
+
+    async def aget_list_etag(self, request):
+        """``get_list_etag`` for async views."""
+        values, last_modified = await self.aget_list_validators(self.get_list_validator_queryset(request))
+        return self.make_list_etag(request, values), last_modified
+
+    def make_list_etag(self, request, values):
+        return make_etag(
+            type(self).__name__, request.get_full_path(), request.user.pk,
+            sorted(values.items()),
+        )
+
+    def get_object_etag(self, request, instance):
+        values, last_modified = self.get_object_validators(instance)
+        etag = make_etag(
+            type(self).__name__, instance.pk, request.user.pk,
+            last_modified.isoformat(), sorted(values.items()),
+        )
+        return etag, last_modified
+
+    def list(self, request, *args, **kwargs):
+        etag, last_modified = self.get_list_etag(request)
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+        response = super().list(request, *args, **kwargs)
+        return set_validators(response, etag, last_modified)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.retrieve_conditionally(request, self.get_object())
+
+    def retrieve_conditionally(self, request, instance):
+        etag, last_modified = self.get_object_etag(request, instance)
+        response = not_modified(request, etag)
+        if response is not None:
+            return response
+        serializer = self.get_serializer(instance)
+        return set_validators(Response(serializer.data), etag, last_modified)
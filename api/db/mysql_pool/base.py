@@ -0,0 +1,17 @@
+"""
+MySQL backend with a per-process connection pool; see ``api.db.pool``.
+
+Select it with ``ENGINE = 'api.db.mysql_pool'`` (``DB_POOL=True``).
+"""
+from django.db.backends.mysql.base import Database, DatabaseWrapper as MySQLDatabaseWrapper
+
+from api.db.pool import PooledConnectionMixin
+
+
+class DatabaseWrapper(PooledConnectionMixin, MySQLDatabaseWrapper):
+    def _raw_is_usable(self, connection):
+        try:
+            connection.ping()
+        except Database.Error:
+            return False
+        return True
@@ -0,0 +1,216 @@
+"""
+Per-process database connection pool.
+
+``PooledConnectionMixin`` is mixed into a backend's ``DatabaseWrapper``.
+Closing a connection hands the open DB-API connection back to a pool shared
+by every thread of the process, and the next ``connect()`` takes it from
+there. That skips the TCP and authentication handshake and the
+``init_command`` of a fresh connection. Run it with ``CONN_MAX_AGE = 0`` so
+connections return to the pool after each request; this also works under
+ASGI, where every request runs in a new thread and thread-local persistent
+connections are not reused.
+
+Pool settings live in ``DATABASES[alias]['POOL']``:
+
+- ``MAX_SIZE``: open connections per process. Threads wait once all are in use.
+- ``IDLE_TIMEOUT``: seconds an idle connection is kept before being closed.
+- ``TIMEOUT``: seconds to wait for a free connection before giving up.
+
+Connections that saw errors or are returned mid-transaction are closed
+rather than pooled. With ``CONN_HEALTH_CHECKS`` a pooled connection is
+pinged before it is reused.
+"""
+import os
+import threading
+import time
+from collections import deque
+
+# alias -> ConnectionPool
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class ConnectionPool:
+    def __init__(self, max_size=10, idle_timeout=300, timeout=10):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.pid = os.getpid()
+        self.condition = threading.Condition()
+        # (connection, returned at), oldest first.
+        self.idle = deque()
+        self.size = 0
+        self.waiting = 0
+        self.stats = {
+            'created': 0,
+            'reused': 0,
+            'closed': 0,
+            'waits': 0,
+            'wait_seconds': 0.0,
+            'max_wait_seconds': 0.0,
+            'timeouts': 0,
+            'peak_in_use': 0,
+        }
+
+    def acquire(self, connect, is_usable=None):
+        """
+        Return ``(connection, reused)``. ``connect()`` opens a new connection;
+        ``is_usable(connection)``, if given, vets an idle one before reuse.
+        """
+        stale = []
+        started = None
+        connection = None
+        try:
+            with self.condition:
+                while True:
+                    now = time.monotonic()
+                    while self.idle and now - self.idle[0][1] > self.idle_timeout:
+                        stale.append(self.idle.popleft()[0])
+                        self.size -= 1
+                        self.stats['closed'] += 1
+                    if self.idle:
+                        connection = self.idle.pop()[0]
+                        break
+                    if self.size < self.max_size:
+                        self.size += 1
+                        break
+                    if started is None:
+                        started = now
+                        self.stats['waits'] += 1
+                    remaining = self.timeout - (now - started)
+                    if remaining <= 0:
+                        self.stats['timeouts'] += 1
+                        raise TimeoutError(
+                            f'No pooled database connection became free within {self.timeout}s '
+                            f'({self.max_size} in use)'
+                        )
+                    self.waiting += 1
+                    try:
+                        self.condition.wait(remaining)
+                    finally:
+                        self.waiting -= 1
+                self._checked_out(started, reused=connection is not None)
+        finally:
+            for old in stale:
+                self._close(old)
+
+        if connection is not None:
+            if is_usable is None or is_usable(connection):
+                return connection, True
+            self.release(connection, discard=True)
+            return self.acquire(connect, is_usable)
+
+        try:
+            return connect(), False
+        except BaseException:
+            with self.condition:
+                self.size -= 1
+                self.condition.notify()
+            raise
+
+    def release(self, connection, discard=False):
+        with self.condition:
+            if discard:
+                self.size -= 1
+                self.stats['closed'] += 1
+            else:
+                self.idle.append((connection, time.monotonic()))
+            self.condition.notify()
+        if discard:
+            self._close(connection)
+
+    def _checked_out(self, started, reused):
+        # Called with the condition held.
+        self.stats['reused' if reused else 'created'] += 1
+        if started is not None:
+            waited = time.monotonic() - started
+            self.stats['wait_seconds'] += waited
+            self.stats['max_wait_seconds'] = max(self.stats['max_wait_seconds'], waited)
+        self.stats['peak_in_use'] = max(self.stats['peak_in_use'], self.size - len(self.idle))
+
+    @staticmethod
+    def _close(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def snapshot(self):
+        with self.condition:
+            return {
+                'max_size': self.max_size,
+                'open': self.size,
+                'idle': len(self.idle),
+                'in_use': self.size - len(self.idle),
+                'waiting': self.waiting,
+                **self.stats,
+                'wait_seconds': round(self.stats['wait_seconds'], 6),
+                'max_wait_seconds': round(self.stats['max_wait_seconds'], 6),
+            }
+
+
+def get_pool(alias, settings_dict):
+    with _pools_lock:
+        pool = _pools.get(alias)
+        if pool is None or pool.pid != os.getpid():
+            # A forked worker must not touch the parent's sockets; forget
+            # anything inherited without closing it.
+            options = settings_dict.get('POOL', {})
+            pool = _pools[alias] = ConnectionPool(
+                max_size=options.get('MAX_SIZE', 10),
+                idle_timeout=options.get('IDLE_TIMEOUT', 300),
+                timeout=options.get('TIMEOUT', 10),
+            )
+        return pool
+
+
+def pool_stats():
+    """Metrics of this process's pools, by database alias."""
+    with _pools_lock:
+        pools = {alias: pool for alias, pool in _pools.items() if pool.pid == os.getpid()}
+    return {alias: pool.snapshot() for alias, pool in pools.items()}
+
+
+class PooledConnectionMixin:
+    """Mix in before the backend's ``DatabaseWrapper``."""
+
+    def get_new_connection(self, conn_params):
+        pool = get_pool(self.alias, self.settings_dict)
+        is_usable = self._raw_is_usable if self.settings_dict['CONN_HEALTH_CHECKS'] else None
+        try:
+            connection, self._pool_reused = pool.acquire(
+                lambda: super(PooledConnectionMixin, self).get_new_connection(conn_params), is_usable,
+            )
+        except TimeoutError as exc:
+            raise self.Database.OperationalError(str(exc)) from exc
+        return connection
+
+    def init_connection_state(self):
+        # Session settings survive on a pooled connection.
+        if not getattr(self, '_pool_reused', False):
+            super().init_connection_state()
+
+    def _close(self):
+        if self.connection is None:
+            return
+        reusable = (
+            not self.in_atomic_block
+            and not self.errors_occurred
+            and self.autocommit == self.settings_dict['AUTOCOMMIT']
+        )
+        get_pool(self.alias, self.settings_dict).release(self.connection, discard=not reusable)
+
+    def _raw_is_usable(self, connection):
+        """
+        Whether an idle DB-API connection still works. Backends override
+        this with a cheaper driver call (e.g. MySQL's ping).
+        """
+        try:
+            cursor = connection.cursor()
+            try:
+                cursor.execute('SELECT 1')
+            finally:
+                cursor.close()
+        except self.Database.Error:
+            return False
+        return True
@@ -0,0 +1,160 @@
+"""
+NDJSON export of user content.
+
+Rows are read in primary-key batches (``pk > last``), so memory stays flat
+however large the table is, and each batch is a cheap index range scan.
+Django's ``iterator()`` would not achieve this on MySQL, where the driver
+buffers the whole result set. Rows come out as flat dicts built from
+``values()``, and child rows (codes, tags) are fetched per batch. Passing
+``since`` limits the export to rows whose ``updated_at`` is at or after it,
+for incremental exports. Those are read in ``(updated_at, id)`` batches
+from the matching index instead, so they only touch the changed rows.
+
+``aexport_lines`` is the async counterpart for ASGI, where a synchronous
+streaming iterator would be buffered in full before being sent.
+"""
+import json
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Q
+
+from .models import Blog, Code, CodeSnippet, Comment, Discussion
+
+BATCH_SIZE = 1000
+
+
+def _blog_rows(rows):
+    tags = defaultdict(list)
+    links = Blog.tags.through.objects\
+        .filter(blog_id__in=[row['id'] for row in rows])\
+        .order_by('tag__slug')\
+        .values_list('blog_id', 'tag__slug')
+    for blog_id, slug in links:
+        tags[blog_id].append(slug)
+    for row in rows:
+        row['tags'] = tags[row['id']]
+    return rows
+
+
+def _snippet_rows(rows):
+    codes = defaultdict(list)
+    children = Code.objects\
+        .filter(snippet_id__in=[row['id'] for row in rows])\
+        .order_by('snippet_id', 'created_at', 'id')\
+        .values('id', 'snippet_id', 'language_id', 'code', 'created_at', language_slug=F('language__slug'))
+    for code in children:
+        codes[code.pop('snippet_id')].append(code)
+    for row in rows:
+        row['codes'] = codes[row['id']]
+    return rows
+
+
+RELATED_FIELDS = {
+    'author_username': 'author__username',
+    'category_slug': 'category__slug',
+}
+
+# Export type -> (model, exported fields, optional function adding child rows
+# to a batch)
+EXPORTS = {
+    'discussions': (
+        Discussion,
+        ('id', 'title', 'content', 'category_id', 'category_slug', 'author_id', 'author_username',
+         'views', 'unique_views', 'is_pinned', 'created_at', 'updated_at'),
+        None,
+    ),
+    'comments': (
+        Comment,
+        ('id', 'discussion_id', 'author_id', 'author_username', 'content', 'created_at', 'updated_at'),
+        None,
+    ),
+    'blogs': (
+        Blog,
+        ('id', 'title', 'content', 'author_id', 'author_username', 'image', 'likes_count',
+         'created_at', 'updated_at'),
+        _blog_rows,
+    ),
+    'snippets': (
+        CodeSnippet,
+        ('id', 'title', 'description', 'author_id', 'author_username', 'likes_count', 'dislikes_count',
+         'created_at', 'updated_at'),
+        _snippet_rows,
+    ),
+}
+
+
+def export_queryset(kind, since=None):
+    """The ordered rows of export type ``kind``, before batching."""
+    model, fields, complete = EXPORTS[kind]
+    # Related names are exported flattened, e.g. author__username as
+    # author_username.
+    queryset = model.objects.values(*[
+        field for field in fields if field not in RELATED_FIELDS
+    ], **{
+        field: F(RELATED_FIELDS[field]) for field in fields if field in RELATED_FIELDS
+    })
+    if since is None:
+        return queryset.order_by('pk')
+    return queryset.filter(updated_at__gte=since).order_by('updated_at', 'pk')
+
+
+def export_batch(queryset, since, last, batch_size=BATCH_SIZE):
+    """The batch of ``queryset`` following the row ``last`` (None for the first)."""
+    if last is not None:
+        if since is None:
+            queryset = queryset.filter(pk__gt=last['id'])
+        else:
+            queryset = queryset.filter(
+                Q(updated_at__gt=last['updated_at']) | Q(updated_at=last['updated_at'], pk__gt=last['id'])
+            )
+    return queryset[:batch_size]
+
+
+def export_rows(kind, since=None, batch_size=BATCH_SIZE):
+    """
+    Yield the rows of export type ``kind`` as dicts, in primary-key order, or
+    in ``(updated_at, id)`` order with ``since``.
+    """
+    complete = EXPORTS[kind][2]
+    queryset = export_queryset(kind, since)
+    last = None
+    while True:
+        rows = list(export_batch(queryset, since, last, batch_size))
+        if not rows:
+            return
+        last = rows[-1]
+        yield from complete(rows) if complete else rows
+
+
+async def aexport_rows(kind, since=None, batch_size=BATCH_SIZE):
+    """``export_rows`` for async callers."""
+    complete = EXPORTS[kind][2]
+    queryset = export_queryset(kind, since)
+    last = None
+    while True:
+        rows = [row async for row in export_batch(queryset, since, last, batch_size)]
+        if not rows:
+            return
+        last = rows[-1]
+        if complete:
+            rows = await sync_to_async(complete)(rows)
+        for row in rows:
+            yield row
+
+
+def encode(row):
+    return json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+
+def export_lines(kind, since=None, batch_size=BATCH_SIZE):
+    """``export_rows`` encoded as NDJSON lines."""
+    for row in export_rows(kind, since, batch_size):
+        yield encode(row)
+
+
+async def aexport_lines(kind, since=None, batch_size=BATCH_SIZE):
+    """``export_lines`` as an async iterator, for ASGI."""
+    async for row in aexport_rows(kind, since, batch_size):
+        yield encode(row)
@@ -0,0 +1,130 @@
+"""
+Responsive variants for blog images.
+
+After an upload, a small thread pool renders every width in
+``IMAGE_VARIANT_WIDTHS`` as WebP and in the original format. The files go to
+``blog_images/variants/<blog id>/`` and the result is recorded in
+``Blog.image_variants``, so list pages can send a small image instead of the
+original. Only the files recorded there are ever deleted. Rendering happens
+after the transaction commits, off the request path.
+``generate_image_variants`` backfills older posts.
+"""
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+
+from .models import Blog
+
+logger = logging.getLogger(__name__)
+
+VARIANT_DIR = 'blog_images/variants'
+
+# Pillow format -> (file extension, save options)
+FORMATS = {
+    'WEBP': ('webp', {'quality': 80, 'method': 4}),
+    'JPEG': ('jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+    'PNG': ('png', {'optimize': True}),
+    'GIF': ('gif', {}),
+}
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.IMAGE_VARIANT_WORKERS,
+            thread_name_prefix='image-variants',
+        )
+    return _executor
+
+
+def _encode(image, image_format):
+    extension, options = FORMATS[image_format]
+    if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    elif image_format == 'WEBP' and image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+    buffer = BytesIO()
+    image.save(buffer, format=image_format, **options)
+    return extension, buffer.getvalue()
+
+
+def render_variants(name, blog_id):
+    """Render the variants of ``blog_id``'s stored image ``name``; returns the variant map."""
+    with default_storage.open(name, 'rb') as handle:
+        image = Image.open(handle)
+        image.load()
+
+    source_format = image.format if image.format in FORMATS else 'PNG'
+    # Respect camera orientation before resizing.
+    image = ImageOps.exif_transpose(image)
+    stem = os.path.splitext(os.path.basename(name))[0]
+
+    variants = {}
+    for width in sorted(settings.IMAGE_VARIANT_WIDTHS):
+        # Never upscale: widths past the original collapse into one
+        # full-size variant, which still gains a WebP encoding.
+        width = min(width, image.width)
+        resized = image.copy()
+        resized.thumbnail((width, image.height), Image.LANCZOS)
+
+        entry = {}
+        for image_format in dict.fromkeys(('WEBP', source_format)):
+            extension, data = _encode(resized, image_format)
+            # Storage picks a free name rather than overwrite a file that
+            # is not ours to replace.
+            variant_name = f'{VARIANT_DIR}/{blog_id}/{stem}-{resized.width}w.{extension}'
+            entry[extension] = default_storage.save(variant_name, ContentFile(data))
+        variants[str(resized.width)] = entry
+        if width == image.width:
+            break
+    return variants
+
+
+def delete_variants(variants):
+    for entry in variants.values():
+        for name in entry.values():
+            if default_storage.exists(name):
+                default_storage.delete(name)
+
+
+def generate_variants(blog_id):
+    """Render and record the variants for one blog; safe to call repeatedly."""
+    blog = Blog.objects.filter(pk=blog_id).only('image', 'image_variants').first()
+    if blog is None:
+        return None
+
+    if blog.image_variants:
+        delete_variants(blog.image_variants)
+    variants = render_variants(blog.image.name, blog_id) if blog.image else {}
+
+    # update() rather than save(): bumping updated_at or reindexing the post
+    # for a derived field would be wrong.
+    Blog.objects.filter(pk=blog_id).update(image_variants=variants)
+    return variants
+
+
+def _run_in_background(blog_id):
+    try:
+        generate_variants(blog_id)
+    except Exception:
+        logger.exception('Failed to generate image variants for blog %s', blog_id)
+    finally:
+        close_old_connections()
+
+
+def schedule_variants(blog):
+    """Queue variant generation for ``blog`` once the current transaction commits."""
+    if not settings.IMAGE_VARIANTS_IN_BACKGROUND:
+        transaction.on_commit(lambda: generate_variants(blog.pk))
+        return
+    transaction.on_commit(lambda: _get_executor().submit(_run_in_background, blog.pk))
@@ -0,0 +1,173 @@
+"""
+Per-request SQL instrumentation, enabled with ``SQL_INSTRUMENTATION=True``.
+
+Every connection gets an execute wrapper that reports to the recorder of the
+request being served. The recorder lives in a context variable, so it follows
+the request into the threads that ``sync_to_async`` runs ORM calls in under
+ASGI. For each request the middleware:
+
+- adds ``Server-Timing`` entries for the SQL time and query count and the
+  total time spent in Django;
+- logs a JSON summary on the ``api.instrumentation`` logger;
+- flags N+1 patterns, i.e. the same statement shape run at least
+  ``SQL_NPLUSONE_THRESHOLD`` times, along with the serializer fields that
+  were being rendered when it ran;
+- logs every statement slower than ``SQL_SLOW_QUERY_MS``.
+
+Queries run while a streaming response is iterated happen after the
+middleware returns and are not counted.
+"""
+import json
+import logging
+import re
+import sys
+import time
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from rest_framework.serializers import Serializer
+
+logger = logging.getLogger(__name__)
+
+_recorder = ContextVar('sql_recorder', default=None)
+
+# Collapse IN lists so "IN (%s, %s)" and "IN (%s, %s, %s)" share a shape.
+_PLACEHOLDER_LIST = re.compile(r'\((?:\s*%s\s*,)+\s*%s\s*\)')
+
+_TO_REPRESENTATION = Serializer.to_representation.__code__
+
+
+def query_shape(sql):
+    return _PLACEHOLDER_LIST.sub('(...)', sql)
+
+
+def serializer_field():
+    """
+    Name the serializer field being rendered by the innermost
+    ``Serializer.to_representation`` on the stack, e.g.
+    ``CommentSerializer.author``, or None outside serialization.
+    """
+    frame = sys._getframe(2)
+    while frame is not None:
+        if frame.f_code is _TO_REPRESENTATION:
+            field = frame.f_locals.get('field')
+            if field is not None:
+                return f'{type(frame.f_locals["self"]).__name__}.{field.field_name}'
+            return None
+        frame = frame.f_back
+    return None
+
+
+class QueryRecorder:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+        self.fields = defaultdict(set)
+        self.slow = []
+
+    def record(self, sql, duration, alias):
+        shape = query_shape(sql)
+        self.count += 1
+        self.duration += duration
+        self.shapes[shape] += 1
+        field = serializer_field()
+        if field is not None:
+            self.fields[shape].add(field)
+        if duration * 1000 >= settings.SQL_SLOW_QUERY_MS:
+            self.slow.append({'sql': sql, 'ms': round(duration * 1000, 2), 'database': alias})
+
+    def repeated(self):
+        return [
+            {'sql': shape, 'count': count, 'fields': sorted(self.fields[shape])}
+            for shape, count in self.shapes.most_common()
+            if count >= settings.SQL_NPLUSONE_THRESHOLD
+        ]
+
+
+def record_queries(execute, sql, params, many, context):
+    recorder = _recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        recorder.record(sql, time.perf_counter() - started, context['connection'].alias)
+
+
+def install(connection, **kwargs):
+    # Persistent connections keep their wrappers; add this one only once.
+    if record_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_queries)
+
+
+class QueryInstrumentationMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.SQL_INSTRUMENTATION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        connection_created.connect(install)
+        for connection in connections.all(initialized_only=True):
+            install(connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder, token, started = self.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        return self.finish(request, response, recorder, started)
+
+    async def __acall__(self, request):
+        recorder, token, started = self.start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _recorder.reset(token)
+        return self.finish(request, response, recorder, started)
+
+    def start(self):
+        recorder = QueryRecorder()
+        return recorder, _recorder.set(recorder), time.perf_counter()
+
+    def finish(self, request, response, recorder, started):
+        total_ms = (time.perf_counter() - started) * 1000
+        sql_ms = recorder.duration * 1000
+        timings = [
+            f'db;dur={sql_ms:.1f};desc="{recorder.count} queries"',
+            f'app;dur={total_ms:.1f}',
+        ]
+        if response.has_header('Server-Timing'):
+            timings.insert(0, response['Server-Timing'])
+        response['Server-Timing'] = ', '.join(timings)
+
+        summary = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': recorder.count,
+            'sql_ms': round(sql_ms, 2),
+            'total_ms': round(total_ms, 2),
+        }
+        repeated = recorder.repeated()
+        if repeated:
+            summary['repeated'] = repeated
+            logger.warning(json.dumps({'event': 'nplusone', **summary}))
+        else:
+            logger.info(json.dumps({'event': 'request', **summary}))
+        for query in recorder.slow:
+            logger.warning(json.dumps({'event': 'slow_query', 'path': request.path, **query}))
+        return response
@@ -0,0 +1,18 @@
+from django.db import transaction
+from django.db.models import Max
+
+
+def update_in_pk_ranges(queryset, batch_size, **updates):
+    """
+    Apply ``queryset.update(**updates)`` one primary key range at a time, so
+    each UPDATE stays short and doesn't lock the whole table on large
+    installs. Returns the number of rows updated.
+    """
+    last_id = queryset.aggregate(last=Max('pk'))['last'] or 0
+    updated = 0
+    start = 0
+    while start < last_id:
+        with transaction.atomic():
+            updated += queryset.filter(pk__gt=start, pk__lte=start + batch_size).update(**updates)
+        start += batch_size
+    return updated
@@ -0,0 +1,102 @@
+import json
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api.models import Category, Tag
+from backend.urls import admin_router, router
+
+# Variants of the list endpoints that take a different query path.
+EXTRA_PATHS = [
+    '/api/discussions/?category={category}',
+    '/api/discussions/?sort=active',
+    '/api/snippets/?sort=most_liked',
+    '/api/snippets/?sort=oldest',
+    '/api/blogs/?tag={tag}',
+    '/api/tags/?sort=popular',
+    '/api/search/?q=django',
+]
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def router_paths():
+    """The list URL and one detail URL of every viewset registered on the routers."""
+    paths = []
+    for prefix, routes in (('/api/', router), ('/api/admin/', admin_router)):
+        for name, viewset, basename in routes.registry:
+            paths.append(f'{prefix}{name}/')
+            pk = viewset.queryset.order_by('-pk').values_list('pk', flat=True).first()
+            if pk is not None:
+                paths.append(f'{prefix}{name}/{pk}/')
+    return paths
+
+
+class Command(BaseCommand):
+    help = (
+        'Request every router endpoint repeatedly through the Django test client and print '
+        'latency percentiles, query counts and response sizes as JSON. Seed a SQLite database '
+        'with seed_forum first; the output of two commits can then be diffed.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help='Timed requests per endpoint.')
+        parser.add_argument('--warmup', type=int, default=5, help='Untimed requests per endpoint.')
+        parser.add_argument('--user', help='Username to authenticate as (default: the first superuser).')
+        parser.add_argument('--path', action='append', dest='paths', help='Only measure this path (repeatable).')
+        parser.add_argument('--output', '-o', help='Write the JSON report to this file instead of stdout.')
+
+    def handle(self, *args, **options):
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+        else:
+            user = User.objects.filter(is_superuser=True).order_by('pk').first()
+        if user is None:
+            raise CommandError('No user to authenticate as; create a superuser or pass --user.')
+
+        client = Client(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+        paths = options['paths'] or router_paths() + self.extra_paths()
+
+        endpoints = {}
+        for path in paths:
+            for _ in range(options['warmup']):
+                client.get(path)
+            latencies = []
+            for _ in range(options['requests']):
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    response = client.get(path)
+                    latencies.append(time.perf_counter() - started)
+            endpoints[path] = {
+                'status': response.status_code,
+                'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+                'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+                'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+                'queries': len(queries),
+                'bytes': len(response.content),
+            }
+            self.stderr.write(f'{path}: {json.dumps(endpoints[path])}')
+
+        report = json.dumps({
+            'database': connection.vendor,
+            'requests': options['requests'],
+            'endpoints': endpoints,
+        }, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                handle.write(report + '\n')
+        else:
+            self.stdout.write(report)
+
+    def extra_paths(self):
+        category = Category.objects.values_list('slug', flat=True).first() or 'general'
+        tag = Tag.objects.order_by('-blog_count').values_list('slug', flat=True).first() or 'python'
+        return [path.format(category=category, tag=tag) for path in EXTRA_PATHS]
@@ -0,0 +1,153 @@
+import re
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Q
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.request import Request
+
+from api.export import export_batch, export_queryset
+from api.models import Code, Comment
+from api.views import BlogViewSet, CodeSnippetViewSet, CommentViewSet, DiscussionViewSet, NewsViewSet
+
+
+def list_view(viewset_class, url):
+    request = Request(RequestFactory().get(url))
+    request.user = AnonymousUser()
+    return viewset_class(request=request, args=(), kwargs={}, action='list', format_kwarg=None)
+
+
+def list_query(viewset_class, url):
+    """The queryset the list endpoint runs for the first page of ``url``."""
+    view = list_view(viewset_class, url)
+    queryset = view.filter_queryset(view.get_queryset())
+    if view.paginator is not None:
+        queryset = view.paginator.get_page_queryset(queryset, request=view.request, view=view)
+    return queryset
+
+
+def validator_plan(viewset_class, url):
+    """The plan of the aggregate the list endpoint builds its ETag from."""
+    view = list_view(viewset_class, url)
+    with CaptureQueriesContext(connection) as queries:
+        view.get_list_etag(view.request)
+    with connection.cursor() as cursor:
+        cursor.execute(f'{connection.ops.explain_query_prefix()} {queries[-1]["sql"]}')
+        return '\n'.join(' '.join(str(cell) for cell in row) for row in cursor.fetchall())
+
+
+def export_page(kind):
+    """A later batch of an incremental export of ``kind``."""
+    since = timezone.now()
+    queryset = export_queryset(kind, since)
+    return export_batch(queryset, since, {'id': 1, 'updated_at': since})
+
+
+# Creation time of the comment a client polling with ``after`` last saw.
+POLL_ANCHOR = timezone.now()
+
+# (name, queryset or plan factory, problems tolerated in the plan)
+CHECKS = [
+    ('discussions', lambda: list_query(DiscussionViewSet, '/api/discussions/'), set()),
+    ('discussions by category', lambda: list_query(DiscussionViewSet, '/api/discussions/?category=general'), set()),
+    ('discussions, active', lambda: list_query(DiscussionViewSet, '/api/discussions/?sort=active'), set()),
+    ('discussions by category, active',
+     lambda: list_query(DiscussionViewSet, '/api/discussions/?category=general&sort=active'), set()),
+    ('discussion comments', lambda: Comment.objects.filter(discussion_id=1).order_by('created_at', 'id')[:51], set()),
+    ('discussion comments, polling', lambda: Comment.objects.filter(
+        Q(created_at__gt=POLL_ANCHOR) | Q(created_at=POLL_ANCHOR, pk__gt=1), discussion_id=1,
+    ).order_by('created_at', 'id')[:51], set()),
+    ('comments', lambda: list_query(CommentViewSet, '/api/comments/'), set()),
+    ('blogs', lambda: list_query(BlogViewSet, '/api/blogs/'), set()),
+    # Sorting one tag's blogs (bounded by Tag.blog_count) beats walking
+    # every blog in date order for all but the most popular tags.
+    ('blogs by tag', lambda: list_query(BlogViewSet, '/api/blogs/?tag=python'), {'sort'}),
+    ('snippets', lambda: list_query(CodeSnippetViewSet, '/api/snippets/'), set()),
+    ('snippets, oldest first', lambda: list_query(CodeSnippetViewSet, '/api/snippets/?sort=oldest'), set()),
+    ('snippets, most liked', lambda: list_query(CodeSnippetViewSet, '/api/snippets/?sort=most_liked'), set()),
+    ('snippet codes', lambda: Code.objects.filter(snippet_id=1).order_by('created_at'), set()),
+    ('news', lambda: list_query(NewsViewSet, '/api/news/'), set()),
+    ('discussions export since', lambda: export_page('discussions'), set()),
+    ('comments export since', lambda: export_page('comments'), set()),
+    ('blogs export since', lambda: export_page('blogs'), set()),
+    ('snippets export since', lambda: export_page('snippets'), set()),
+    ('discussions ETag', lambda: validator_plan(DiscussionViewSet, '/api/discussions/'), set()),
+    ('discussions ETag, active', lambda: validator_plan(DiscussionViewSet, '/api/discussions/?sort=active'), set()),
+    ('comments ETag', lambda: validator_plan(CommentViewSet, '/api/comments/'), set()),
+    ('blogs ETag', lambda: validator_plan(BlogViewSet, '/api/blogs/'), set()),
+    ('snippets ETag', lambda: validator_plan(CodeSnippetViewSet, '/api/snippets/'), set()),
+    ('news ETag', lambda: validator_plan(NewsViewSet, '/api/news/'), set()),
+]
+
+
+def sqlite_problems(plan):
+    problems = []
+    # Scanning the result of a subquery (the page an ETag aggregate runs
+    # over) only reads the rows that subquery produced.
+    derived = set(re.findall(r'\b(?:CO-ROUTINE|MATERIALIZE) (\w+)', plan))
+    for line in plan.splitlines():
+        # "SCAN api_blog USING INDEX blog_created_idx" walks an index in
+        # order and stops at the LIMIT; a bare "SCAN api_blog" reads the table.
+        match = re.search(r'\bSCAN (\w+)', line)
+        if match and match.group(1) not in derived | {'CONSTANT'} and 'INDEX' not in line:
+            problems.append(('scan', match.group(1)))
+        if 'USE TEMP B-TREE' in line:
+            problems.append(('sort', None))
+    return problems
+
+
+def mysql_problems(plan):
+    problems = []
+    for line in plan.splitlines():
+        # id, select_type, table, partitions, type, ... Extra
+        cells = line.split()
+        # <derivedN> is the result of a subquery, read in full by design.
+        if len(cells) > 4 and cells[4] == 'ALL' and not cells[2].startswith('<derived'):
+            problems.append(('scan', cells[2]))
+        if 'Using filesort' in line:
+            problems.append(('sort', None))
+    return problems
+
+
+PLAN_CHECKERS = {
+    'sqlite': sqlite_problems,
+    'mysql': mysql_problems,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Run EXPLAIN on the main query of each list endpoint and fail if a plan "
+        "reads a whole table or sorts without an index. MySQL may prefer a full "
+        "scan on nearly empty tables, so run this against realistic data."
+    )
+
+    def handle(self, *args, **options):
+        checker = PLAN_CHECKERS.get(connection.vendor)
+        if checker is None:
+            raise CommandError(f'Query plans cannot be checked on {connection.vendor}.')
+
+        failures = 0
+        for name, build, allowed in CHECKS:
+            plan = build()
+            if not isinstance(plan, str):
+                plan = plan.explain()
+            problems = [
+                'sort without an index' if kind == 'sort' else f'full scan of {table}'
+                for kind, table in dict.fromkeys(checker(plan))
+                if kind not in allowed
+            ]
+            if problems:
+                failures += 1
+                self.stdout.write(self.style.ERROR(f'{name}: {", ".join(problems)}'))
+                self.stdout.write(plan)
+            else:
+                self.stdout.write(self.style.SUCCESS(f'{name}: ok'))
+                if options['verbosity'] > 1:
+                    self.stdout.write(plan)
+
+        if failures:
+            raise CommandError(f'{failures} of {len(CHECKS)} queries have unindexed plans.')
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from api.export import BATCH_SIZE, EXPORTS, export_lines
+
+
+class Command(BaseCommand):
+    help = 'Export discussions, comments, blogs or snippets as NDJSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=list(EXPORTS))
+        parser.add_argument(
+            '--since',
+            help='Only export rows updated at or after this ISO 8601 timestamp.',
+        )
+        parser.add_argument(
+            '--output', '-o',
+            help='File to write to. Defaults to standard output.',
+        )
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = parse_datetime(options['since'])
+            except ValueError:
+                pass
+            if since is None:
+                raise CommandError(f"Invalid --since timestamp: {options['since']}")
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+
+        output = open(options['output'], 'w', encoding='utf-8') if options['output'] else self.stdout
+        count = 0
+        try:
+            for line in export_lines(options['kind'], since, options['batch_size']):
+                output.write(line)
+                count += 1
+        finally:
+            if output is not self.stdout:
+                output.close()
+
+        self.stderr.write(f"Exported {count} {options['kind']}.")
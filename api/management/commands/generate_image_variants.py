@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from api.images import generate_variants
+from api.models import Blog
+
+
+class Command(BaseCommand):
+    help = 'Render responsive variants for blog images that do not have them yet.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Regenerate variants for every blog image, not only missing ones.',
+        )
+
+    def handle(self, *args, **options):
+        blogs = Blog.objects.exclude(image='').exclude(image__isnull=True)
+        if not options['force']:
+            blogs = blogs.filter(image_variants={})
+
+        generated = failed = 0
+        for blog_id in blogs.order_by('pk').values_list('pk', flat=True).iterator():
+            try:
+                generate_variants(blog_id)
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(f'Blog {blog_id}: {exc}')
+            else:
+                generated += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated variants for {generated} blogs ({failed} failed).'
+        ))
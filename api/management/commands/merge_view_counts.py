@@ -0,0 +1,56 @@
+import glob
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.viewcounts import apply_view_counts, read_spool
+
+
+class Command(BaseCommand):
+    help = 'Merge discussion view counts spooled by the web workers and write them to the database.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--spool-dir',
+            default=getattr(settings, 'DISCUSSION_VIEW_SPOOL_DIR', ''),
+            help='Directory the workers spool view counts to (defaults to DISCUSSION_VIEW_SPOOL_DIR).',
+        )
+
+    def handle(self, *args, **options):
+        spool_dir = options['spool_dir']
+        if not spool_dir:
+            raise CommandError('No spool directory configured; set DISCUSSION_VIEW_SPOOL_DIR or pass --spool-dir.')
+        if not os.path.isdir(spool_dir):
+            self.stdout.write('Spool directory does not exist yet, nothing to merge.')
+            return
+
+        # Claim each file by renaming it first so that two concurrent runs
+        # never apply the same counts twice.
+        claimed = []
+        for path in sorted(glob.glob(os.path.join(spool_dir, 'views-*.json'))):
+            claimed_path = f'{path}.merging'
+            try:
+                os.rename(path, claimed_path)
+            except FileNotFoundError:
+                continue
+            claimed.append(claimed_path)
+
+        hits, sketches = {}, {}
+        for path in claimed:
+            read_spool(path, hits, sketches)
+
+        try:
+            apply_view_counts(hits, sketches)
+        except Exception:
+            for path in claimed:
+                os.rename(path, path[:-len('.merging')])
+            raise
+
+        for path in claimed:
+            os.remove(path)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Merged {len(claimed)} spool files: {sum(hits.values())} views '
+            f'across {len(hits)} discussions.'
+        ))
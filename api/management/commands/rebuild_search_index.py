@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from api.models import SearchDocument, SearchPosting
+from api.search import SEARCH_SOURCES, delete_rows, index_objects
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index from the content tables.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--type', action='append', dest='kinds', choices=list(SEARCH_SOURCES),
+            help='Only rebuild this search type (repeatable). Defaults to all types.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Number of objects indexed per transaction.',
+        )
+
+    def handle(self, *args, **options):
+        kinds = options['kinds'] or list(SEARCH_SOURCES)
+        batch_size = options['batch_size']
+
+        for kind in kinds:
+            model = SEARCH_SOURCES[kind]['model']
+            delete_rows(SearchDocument.objects.filter(kind=kind))
+            delete_rows(SearchPosting.objects.filter(kind=kind))
+
+            queryset = model.objects.order_by('pk')
+            if kind == 'comment':
+                queryset = queryset.select_related('discussion')
+            elif kind == 'code':
+                queryset = queryset.select_related('snippet')
+
+            indexed = 0
+            last_pk = 0
+            while True:
+                batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+                if not batch:
+                    break
+                index_objects(batch)
+                indexed += len(batch)
+                last_pk = batch[-1].pk
+
+            self.stdout.write(self.style.SUCCESS(f'Indexed {indexed} {kind} objects.'))
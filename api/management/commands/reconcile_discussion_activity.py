@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from api.activity import discussion_activity
+from api.management.batching import update_in_pk_ranges
+from api.models import Discussion
+
+
+class Command(BaseCommand):
+    help = 'Backfill or repair the denormalized comment counts and last-activity times on discussions.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of discussions recounted per UPDATE statement.',
+        )
+
+    def handle(self, *args, **options):
+        updated = update_in_pk_ranges(Discussion.objects.all(), options['batch_size'], **discussion_activity())
+        self.stdout.write(self.style.SUCCESS(f'Recounted comment activity for {updated} discussions.'))
@@ -0,0 +1,39 @@
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from api.management.batching import update_in_pk_ranges
+from api.models import Reaction
+from api.reactions import COUNTER_FIELDS, REACTION_TARGETS
+
+
+def count_subquery(content_type, kind):
+    counts = Reaction.objects\
+        .filter(content_type=content_type, object_id=OuterRef('pk'), kind=kind)\
+        .order_by()\
+        .values('object_id')\
+        .annotate(total=Count('pk'))\
+        .values('total')
+    return Coalesce(Subquery(counts), 0)
+
+
+class Command(BaseCommand):
+    help = 'Backfill or repair the denormalized like/dislike counters on snippets and blogs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of rows recounted per UPDATE statement.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        for name, model in REACTION_TARGETS.items():
+            content_type = ContentType.objects.get_for_model(model)
+            updated = update_in_pk_ranges(model.objects.all(), batch_size, **{
+                COUNTER_FIELDS[kind]: count_subquery(content_type, kind)
+                for kind in model.REACTION_KINDS
+            })
+            self.stdout.write(self.style.SUCCESS(f'Recounted reactions for {updated} {name}s.'))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from api.cache import CACHE_NAMESPACES, invalidate
+from api.management.batching import update_in_pk_ranges
+from api.models import Tag
+from api.tags import tag_stats
+
+
+class Command(BaseCommand):
+    help = 'Backfill or repair the denormalized blog counts and last-used times on tags.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of tags recounted per UPDATE statement.',
+        )
+
+    def handle(self, *args, **options):
+        updated = update_in_pk_ranges(Tag.objects.all(), options['batch_size'], **tag_stats())
+        invalidate(CACHE_NAMESPACES[Tag])
+        self.stdout.write(self.style.SUCCESS(f'Recounted blog statistics for {updated} tags.'))
@@ -0,0 +1,234 @@
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.text import slugify
+
+from api.models import (
+    Blog, Category, Code, CodeSnippet, Comment, Discussion, News, ProgrammingLanguage, Reaction, Tag,
+)
+
+# Defaults at --scale 1.
+VOLUMES = {
+    'users': 100_000,
+    'discussions': 50_000,
+    'comments': 1_000_000,
+    'snippets': 200_000,
+    'blogs': 20_000,
+    'news': 500,
+    'tags': 300,
+}
+
+CATEGORIES = ['General', 'Help', 'Show and Tell', 'Python', 'JavaScript', 'Databases', 'DevOps', 'Careers']
+LANGUAGES = [
+    ('Python', 'py'), ('JavaScript', 'js'), ('TypeScript', 'ts'), ('Go', 'go'), ('Rust', 'rs'),
+    ('Java', 'java'), ('C', 'c'), ('C++', 'cpp'), ('SQL', 'sql'), ('Shell', 'sh'),
+]
+WORDS = (
+    'django python query index cache request response server database table model view serializer '
+    'migration deploy docker async thread worker queue latency memory profile benchmark join filter '
+    'error debug test build release feature bug fix refactor pattern design api token session user'
+).split()
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """Let ``created_at``/``updated_at`` be set by hand so rows span a realistic date range."""
+    fields = [
+        field for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = (
+        'Fill the database with synthetic users, discussions, comments, snippets, reactions, '
+        'blogs and tags at production-like volumes, using bulk inserts.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scale', type=float, default=1.0,
+            help='Multiply every default volume, e.g. 0.01 for a quick local dataset.',
+        )
+        for name, count in VOLUMES.items():
+            parser.add_argument(f'--{name}', type=int, help=f'Number of {name} (default {count} x scale).')
+        parser.add_argument('--codes-per-snippet', type=int, default=3, help='Average codes per snippet.')
+        parser.add_argument('--reactions-per-snippet', type=int, default=20, help='Average reactions per snippet.')
+        parser.add_argument('--likes-per-blog', type=int, default=10, help='Average likes per blog.')
+        parser.add_argument('--tags-per-blog', type=int, default=3, help='Average tags per blog.')
+        parser.add_argument('--days', type=int, default=730, help='Spread creation times over this many days.')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per INSERT statement.')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed, for reproducible datasets.')
+        parser.add_argument(
+            '--index', action='store_true',
+            help='Rebuild the search index afterwards. Slow at full scale; only needed to measure search.',
+        )
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        self.span = timedelta(days=options['days']).total_seconds()
+        volumes = {
+            name: options[name] if options[name] is not None else max(1, int(count * options['scale']))
+            for name, count in VOLUMES.items()
+        }
+
+        with explicit_timestamps(User, Discussion, Comment, CodeSnippet, Code, Blog, News, Reaction):
+            user_ids = self.seed_users(volumes['users'])
+            category_ids = self.seed_reference_data()
+            discussion_ids = self.insert(Discussion, (
+                Discussion(
+                    title=self.sentence(6), content=self.paragraph(), category_id=self.rng.choice(category_ids),
+                    author_id=self.rng.choice(user_ids), is_pinned=self.rng.random() < 0.005,
+                    **self.timestamps(),
+                )
+                for _ in range(volumes['discussions'])
+            ))
+            self.seed_comments(volumes['comments'], discussion_ids, user_ids)
+            self.seed_snippets(volumes['snippets'], user_ids, options)
+            self.seed_blogs(volumes['blogs'], volumes['tags'], user_ids, options)
+            self.insert(News, (
+                News(title=self.sentence(8), body=self.paragraph(), **self.timestamps())
+                for _ in range(volumes['news'])
+            ))
+
+        call_command('reconcile_reaction_counts', stdout=self.stdout)
+        call_command('reconcile_tag_stats', stdout=self.stdout)
+        call_command('reconcile_discussion_activity', stdout=self.stdout)
+        if options['index']:
+            call_command('rebuild_search_index', stdout=self.stdout)
+
+    def insert(self, model, objs):
+        """Bulk insert ``objs`` in batches and return the new primary keys."""
+        started = time.monotonic()
+        # MySQL doesn't return the ids of bulk inserts; read them back.
+        before = model.objects.aggregate(last=Max('pk'))['last'] or 0
+        objs = iter(objs)
+        while True:
+            batch = list(islice(objs, self.batch_size))
+            if not batch:
+                break
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+        ids = list(model.objects.filter(pk__gt=before).order_by('pk').values_list('pk', flat=True))
+        self.stdout.write(f'{model._meta.verbose_name_plural}: {len(ids)} in {time.monotonic() - started:.1f}s')
+        return ids
+
+    def timestamps(self):
+        created = self.now - timedelta(seconds=self.rng.random() * self.span)
+        return {'created_at': created, 'updated_at': created}
+
+    def sentence(self, words):
+        return ' '.join(self.rng.choices(WORDS, k=self.rng.randint(max(1, words // 2), words))).capitalize()
+
+    def paragraph(self, sentences=4):
+        return '. '.join(self.sentence(12) for _ in range(self.rng.randint(1, sentences))) + '.'
+
+    def count(self, mean):
+        """A long-tailed count averaging ``mean``: most rows get a few, some get many."""
+        return int(self.rng.expovariate(1 / mean)) if mean > 0 else 0
+
+    def seed_users(self, count):
+        # Hashing is deliberately slow; every synthetic user shares one hash.
+        password = make_password('password')
+        start = User.objects.filter(username__startswith='seed_').count()
+        return self.insert(User, (
+            User(
+                username=f'seed_{n}', email=f'seed_{n}@example.com', password=password,
+                date_joined=self.timestamps()['created_at'],
+            )
+            for n in range(start, start + count)
+        ))
+
+    def seed_reference_data(self):
+        Category.objects.bulk_create(
+            [Category(name=name, slug=slugify(name)) for name in CATEGORIES], ignore_conflicts=True,
+        )
+        ProgrammingLanguage.objects.bulk_create(
+            [ProgrammingLanguage(name=name, slug=slugify(name), code=code) for name, code in LANGUAGES],
+            ignore_conflicts=True,
+        )
+        self.language_ids = list(ProgrammingLanguage.objects.values_list('pk', flat=True))
+        return list(Category.objects.values_list('pk', flat=True))
+
+    def seed_comments(self, count, discussion_ids, user_ids):
+        # Skewed towards a minority of busy discussions, like a real forum.
+        weights = [self.rng.paretovariate(1.5) for _ in discussion_ids]
+        targets = self.rng.choices(discussion_ids, weights=weights, k=count)
+        self.insert(Comment, (
+            Comment(
+                discussion_id=discussion_id, author_id=self.rng.choice(user_ids),
+                content=self.paragraph(2), **self.timestamps(),
+            )
+            for discussion_id in targets
+        ))
+
+    def seed_snippets(self, count, user_ids, options):
+        snippet_ids = self.insert(CodeSnippet, (
+            CodeSnippet(
+                title=self.sentence(6), description=self.paragraph(2), author_id=self.rng.choice(user_ids),
+                **self.timestamps(),
+            )
+            for _ in range(count)
+        ))
+        self.insert(Code, (
+            Code(snippet_id=snippet_id, language_id=self.rng.choice(self.language_ids), code=self.paragraph(6),
+                 created_at=self.timestamps()['created_at'])
+            for snippet_id in snippet_ids
+            for _ in range(1 + self.count(options['codes_per_snippet'] - 1))
+        ))
+        self.seed_reactions(CodeSnippet, snippet_ids, user_ids, options['reactions_per_snippet'], dislikes=0.2)
+
+    def seed_blogs(self, count, tag_count, user_ids, options):
+        Tag.objects.bulk_create([
+            Tag(name=f'{word}-{n}', slug=f'{word}-{n}')
+            for n, word in enumerate(self.rng.choices(WORDS, k=tag_count))
+        ], ignore_conflicts=True)
+        tag_ids = list(Tag.objects.values_list('pk', flat=True))
+        # A few tags are far more popular than the rest.
+        tag_weights = [self.rng.paretovariate(1.2) for _ in tag_ids]
+
+        blog_ids = self.insert(Blog, (
+            Blog(title=self.sentence(8), content=self.paragraph(8), author_id=self.rng.choice(user_ids),
+                 **self.timestamps())
+            for _ in range(count)
+        ))
+        BlogTag = Blog.tags.through
+        self.insert(BlogTag, (
+            BlogTag(blog_id=blog_id, tag_id=tag_id)
+            for blog_id in blog_ids
+            for tag_id in set(self.rng.choices(tag_ids, weights=tag_weights, k=self.count(options['tags_per_blog'])))
+        ))
+        self.seed_reactions(Blog, blog_ids, user_ids, options['likes_per_blog'], dislikes=0)
+
+    def seed_reactions(self, model, object_ids, user_ids, mean, dislikes):
+        content_type = ContentType.objects.get_for_model(model)
+        self.insert(Reaction, (
+            Reaction(
+                user_id=user_id, content_type=content_type, object_id=object_id,
+                kind=Reaction.DISLIKE if self.rng.random() < dislikes else Reaction.LIKE,
+                created_at=self.timestamps()['created_at'],
+            )
+            for object_id in object_ids
+            for user_id in self.rng.sample(user_ids, min(len(user_ids), self.count(mean)))
+        ))
@@ -0,0 +1,188 @@
+"""
+Serving of uploaded media under ``MEDIA_URL``.
+
+URLs built with ``media_url`` carry a ``?v=`` content hash, and responses to
+those URLs are cached by browsers and proxies for a year as immutable.
+Unversioned URLs are revalidated against an ETag. Single byte ranges are
+supported. When ``MEDIA_SENDFILE_BACKEND`` is set, the transfer is handed to
+the front proxy through ``X-Sendfile`` (Apache, lighttpd) or
+``X-Accel-Redirect`` (nginx), so no worker stays busy for the download.
+Otherwise full files go out through ``FileResponse``, which servers exposing
+``wsgi.file_wrapper`` (gunicorn, uWSGI) send with zero-copy ``sendfile()``.
+"""
+import hashlib
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from django.views.decorators.http import require_safe
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+CHUNK_SIZE = 64 * 1024
+VERSION_LENGTH = 16
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def _resolve(name):
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, name)
+    except SuspiciousFileOperation:
+        raise Http404('Invalid path')
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        raise Http404('File not found')
+    if not os.path.isfile(full_path):
+        raise Http404('File not found')
+    return full_path, stat
+
+
+def content_version(name, stat=None):
+    """
+    Short SHA-256 of a media file's contents. It is cached per
+    ``(name, mtime, size)``, so the file is only read again after it changes.
+    """
+    if stat is None:
+        full_path, stat = _resolve(name)
+    else:
+        full_path = safe_join(settings.MEDIA_ROOT, name)
+    key = f'media-version:{hashlib.md5(name.encode("utf-8"), usedforsecurity=False).hexdigest()}:' \
+          f'{stat.st_mtime_ns}:{stat.st_size}'
+    version = cache.get(key)
+    if version is None:
+        digest = hashlib.sha256()
+        with open(full_path, 'rb') as handle:
+            for chunk in iter(lambda: handle.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+        version = digest.hexdigest()[:VERSION_LENGTH]
+        cache.set(key, version, None)
+    return version
+
+
+def media_url(name):
+    """``default_storage.url(name)`` with a ``?v=`` content hash appended."""
+    url = default_storage.url(name)
+    try:
+        return f'{url}?v={content_version(name)}'
+    except Http404:
+        return url
+
+
+def _parse_range(header, size):
+    """
+    Return ``(start, end)`` (inclusive) for a single satisfiable range, None
+    if the header should be ignored, or ``False`` if it cannot be satisfied.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        # Malformed or multi-range requests get the whole file.
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or (last and int(last) < start):
+        return False
+    return start, end
+
+
+def _range_chunks(handle, start, length):
+    try:
+        handle.seek(start)
+        while length > 0:
+            chunk = handle.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        handle.close()
+
+
+def _offload(path, full_path):
+    backend = settings.MEDIA_SENDFILE_BACKEND
+    response = HttpResponse()
+    if backend == 'xsendfile':
+        response['X-Sendfile'] = full_path
+    elif backend == 'xaccel':
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_REDIRECT_PREFIX + quote(path)
+    else:
+        return None
+    # The proxy supplies the body, its length and range handling.
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    full_path, stat = _resolve(path)
+    etag = quote_etag(f'{stat.st_mtime_ns:x}-{stat.st_size:x}')
+    last_modified = int(stat.st_mtime)
+
+    version = request.GET.get('v')
+    if version and version == content_version(path, stat):
+        cache_control = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    else:
+        cache_control = 'public, no-cache'
+
+    def finish(response):
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        response['Cache-Control'] = cache_control
+        return response
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        return finish(response)
+
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or 'application/octet-stream'
+
+    response = _offload(path, full_path)
+    if response is not None:
+        response['Content-Type'] = content_type
+        return finish(response)
+
+    byte_range = None
+    range_header = request.META.get('HTTP_RANGE')
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if range_header and (not if_range or if_range == etag
+                         or parse_http_date_safe(if_range) == last_modified):
+        byte_range = _parse_range(range_header, stat.st_size)
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{stat.st_size}'
+        return finish(response)
+
+    if byte_range is None:
+        response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(
+            _range_chunks(open(full_path, 'rb'), start, length),
+            status=206,
+            content_type=content_type,
+        )
+        response['Content-Length'] = str(length)
+        response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['Accept-Ranges'] = 'bytes'
+    return finish(response)
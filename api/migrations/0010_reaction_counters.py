@@ -0,0 +1,58 @@
+# Generated by Django 4.2.19 on 2026-10-17 19:41
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def _count_subquery(through, source_field):
+    counts = through.objects.filter(**{source_field: OuterRef('pk')})\
+        .order_by()\
+        .values(source_field)\
+        .annotate(total=Count('pk'))\
+        .values('total')
+    return Coalesce(Subquery(counts), 0)
+
+
+def backfill_counters(apps, schema_editor):
+    CodeSnippet = apps.get_model('api', 'CodeSnippet')
+    Blog = apps.get_model('api', 'Blog')
+    CodeSnippet.objects.update(
+        likes_count=_count_subquery(CodeSnippet.likes.through, 'codesnippet_id'),
+        dislikes_count=_count_subquery(CodeSnippet.dislikes.through, 'codesnippet_id'),
+    )
+    Blog.objects.update(likes_count=_count_subquery(Blog.likes.through, 'blog_id'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_role'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blog',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='codesnippet',
+            name='dislikes_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='codesnippet',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='blog',
+            index=models.Index(fields=['-likes_count', '-created_at'], name='blog_most_liked_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='codesnippet',
+            index=models.Index(fields=['-likes_count', '-created_at'], name='snippet_most_liked_idx'),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
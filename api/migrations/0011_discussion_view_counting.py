@@ -0,0 +1,26 @@
+# Generated by Django 4.2.19 on 2026-10-17 19:43
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_reaction_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DiscussionViewerSketch',
+            fields=[
+                ('discussion', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='viewer_sketch', serialize=False, to='api.discussion')),
+                ('registers', models.BinaryField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='discussion',
+            name='unique_views',
+            field=models.IntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,142 @@
+# Generated by Django 4.2.19 on 2026-10-17 19:45
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+
+
+BATCH_SIZE = 5000
+
+# (model, m2m field, kind). Likes are copied first, so a user who somehow
+# sits in both relations of a snippet keeps the like.
+REACTION_SOURCES = [
+    ('codesnippet', 'likes', 'like'),
+    ('blog', 'likes', 'like'),
+    ('codesnippet', 'dislikes', 'dislike'),
+]
+
+# model -> {counter field: kind}
+COUNTERS = {
+    'codesnippet': {'likes_count': 'like', 'dislikes_count': 'dislike'},
+    'blog': {'likes_count': 'like'},
+}
+
+
+def copy_m2m_to_reactions(apps, schema_editor):
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    Reaction = apps.get_model('api', 'Reaction')
+
+    for model_name, field_name, kind in REACTION_SOURCES:
+        model = apps.get_model('api', model_name)
+        through = getattr(model, field_name).through
+        content_type, _ = ContentType.objects.get_or_create(app_label='api', model=model_name)
+        source_column = f'{model_name}_id'
+
+        last_pk = 0
+        while True:
+            rows = list(
+                through.objects.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .values_list('pk', source_column, 'user_id')[:BATCH_SIZE]
+            )
+            if not rows:
+                break
+            Reaction.objects.bulk_create([
+                Reaction(user_id=user_id, content_type=content_type, object_id=object_id, kind=kind)
+                for _, object_id, user_id in rows
+            ], ignore_conflicts=True)
+            last_pk = rows[-1][0]
+
+    recount_reactions(apps)
+
+
+def recount_reactions(apps):
+    # Dropping the duplicate dislikes above leaves the counters copied from
+    # the m2m tables too high; recount them from the reactions kept.
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    Reaction = apps.get_model('api', 'Reaction')
+
+    for model_name, counters in COUNTERS.items():
+        model = apps.get_model('api', model_name)
+        content_type = ContentType.objects.get(app_label='api', model=model_name)
+        model.objects.update(**{
+            field: Coalesce(Subquery(
+                Reaction.objects
+                .filter(content_type=content_type, object_id=OuterRef('pk'), kind=kind)
+                .order_by()
+                .values('object_id')
+                .annotate(total=Count('pk'))
+                .values('total')
+            ), 0)
+            for field, kind in counters.items()
+        })
+
+
+def copy_reactions_to_m2m(apps, schema_editor):
+    ContentType = apps.get_model('contenttypes', 'ContentType')
+    Reaction = apps.get_model('api', 'Reaction')
+
+    for model_name, field_name, kind in REACTION_SOURCES:
+        model = apps.get_model('api', model_name)
+        through = getattr(model, field_name).through
+        content_type = ContentType.objects.filter(app_label='api', model=model_name).first()
+        if content_type is None:
+            continue
+        source_column = f'{model_name}_id'
+
+        rows = Reaction.objects.filter(content_type=content_type, kind=kind)\
+            .values_list('object_id', 'user_id')\
+            .iterator(chunk_size=BATCH_SIZE)
+        batch = []
+        for object_id, user_id in rows:
+            batch.append(through(**{source_column: object_id, 'user_id': user_id}))
+            if len(batch) >= BATCH_SIZE:
+                through.objects.bulk_create(batch, ignore_conflicts=True)
+                batch = []
+        through.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('api', '0011_discussion_view_counting'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Reaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('kind', models.CharField(choices=[('like', 'Like'), ('dislike', 'Dislike')], max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reactions', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='reaction',
+            index=models.Index(fields=['content_type', 'object_id', 'kind'], name='reaction_target_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='reaction',
+            constraint=models.UniqueConstraint(fields=('user', 'content_type', 'object_id'), name='unique_reaction_per_target'),
+        ),
+        migrations.RunPython(copy_m2m_to_reactions, copy_reactions_to_m2m),
+        migrations.RemoveField(
+            model_name='blog',
+            name='likes',
+        ),
+        migrations.RemoveField(
+            model_name='codesnippet',
+            name='dislikes',
+        ),
+        migrations.RemoveField(
+            model_name='codesnippet',
+            name='likes',
+        ),
+    ]
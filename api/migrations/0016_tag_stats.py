@@ -0,0 +1,44 @@
+# Generated by Django 4.2.19 on 2026-10-17 20:21
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_tag_stats(apps, schema_editor):
+    Blog = apps.get_model('api', 'Blog')
+    Tag = apps.get_model('api', 'Tag')
+    links = Blog.tags.through.objects.filter(tag_id=OuterRef('pk')).order_by()
+    Tag.objects.update(
+        blog_count=Coalesce(Subquery(
+            links.values('tag_id').annotate(total=Count('pk')).values('total')
+        ), 0),
+        last_used_at=Subquery(
+            links.order_by('-blog__created_at').values('blog__created_at')[:1]
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_blog_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='blog_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='last_used_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['-blog_count', 'name'], name='tag_popular_idx'),
+        ),
+        migrations.RunPython(backfill_tag_stats, migrations.RunPython.noop),
+    ]
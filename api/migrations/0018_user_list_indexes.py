@@ -0,0 +1,36 @@
+# Generated by Django 4.2.19 on 2026-10-17 21:05
+
+from django.db import migrations, models
+
+# auth_user belongs to django.contrib.auth, so its extra indexes for the admin
+# user listing are created here. The username column already has the index
+# of its unique constraint.
+USER_INDEXES = [
+    models.Index(fields=['date_joined', 'id'], name='auth_user_joined_idx'),
+    models.Index(fields=['email', 'id'], name='auth_user_email_idx'),
+    models.Index(fields=['is_superuser', 'is_staff', 'is_active', 'date_joined'], name='auth_user_role_idx'),
+]
+
+
+def add_user_indexes(apps, schema_editor):
+    User = apps.get_model('auth', 'User')
+    for index in USER_INDEXES:
+        schema_editor.add_index(User, index)
+
+
+def remove_user_indexes(apps, schema_editor):
+    User = apps.get_model('auth', 'User')
+    for index in USER_INDEXES:
+        schema_editor.remove_index(User, index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('api', '0017_access_pattern_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_user_indexes, remove_user_indexes),
+    ]
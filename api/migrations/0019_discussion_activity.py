@@ -0,0 +1,60 @@
+# Generated by Django 4.2.19 on 2026-10-17 20:38
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+import django.utils.timezone
+
+
+def backfill_discussion_activity(apps, schema_editor):
+    Comment = apps.get_model('api', 'Comment')
+    Discussion = apps.get_model('api', 'Discussion')
+    comments = Comment.objects.filter(discussion_id=OuterRef('pk')).order_by()
+    latest = Subquery(comments.order_by('-created_at').values('created_at')[:1])
+    Discussion.objects.update(
+        comment_count=Coalesce(Subquery(
+            comments.values('discussion_id').annotate(total=Count('pk')).values('total')
+        ), 0),
+        last_activity_at=Greatest('created_at', Coalesce(latest, 'created_at')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_user_list_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='discussion',
+            name='discussion_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='discussion',
+            name='discussion_category_idx',
+        ),
+        migrations.AddField(
+            model_name='discussion',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='discussion',
+            name='last_activity_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.RunPython(backfill_discussion_activity, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='discussion',
+            index=models.Index(fields=['-is_pinned', '-last_activity_at', '-id'], name='discussion_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='discussion',
+            index=models.Index(fields=['category', '-is_pinned', '-created_at', '-id'], name='discussion_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='discussion',
+            index=models.Index(fields=['category', '-is_pinned', '-last_activity_at', '-id'], name='discussion_cat_active_idx'),
+        ),
+    ]
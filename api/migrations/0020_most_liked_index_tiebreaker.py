@@ -0,0 +1,29 @@
+# Generated by Django 4.2.19 on 2026-10-17 20:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_discussion_activity'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='blog',
+            name='blog_most_liked_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='codesnippet',
+            name='snippet_most_liked_idx',
+        ),
+        migrations.AddIndex(
+            model_name='blog',
+            index=models.Index(fields=['-likes_count', '-created_at', '-id'], name='blog_most_liked_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='codesnippet',
+            index=models.Index(fields=['-likes_count', '-created_at', '-id'], name='snippet_most_liked_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.19 on 2026-10-17 20:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_most_liked_index_tiebreaker'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blog',
+            index=models.Index(fields=['updated_at', 'id'], name='blog_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='codesnippet',
+            index=models.Index(fields=['updated_at', 'id'], name='snippet_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['updated_at', 'id'], name='comment_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='discussion',
+            index=models.Index(fields=['updated_at', 'id'], name='discussion_updated_idx'),
+        ),
+    ]
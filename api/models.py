@@ -1,5 +1,7 @@
 from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
+from django.contrib.contenttypes.models import ContentType
 from django.utils import timezone
 from django.utils.text import slugify
 
@@ -40,11 +42,45 @@ class Discussion(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     views = models.IntegerField(default=0)
+    unique_views = models.IntegerField(default=0)
     is_pinned = models.BooleanField(default=False)
+    # Maintained by api.activity when comments are added or removed.
+    comment_count = models.PositiveIntegerField(default=0)
+    last_activity_at = models.DateTimeField(default=timezone.now)
 
     def __str__(self):
         return self.title
 
+    class Meta:
+        # Lists put pinned discussions first. The trailing id matches the
+        # keyset pagination tie-breaker, so pages are read straight from the
+        # index without a sort.
+        indexes = [
+            models.Index(fields=['-is_pinned', '-created_at', '-id'], name='discussion_pinned_idx'),
+            models.Index(fields=['-is_pinned', '-last_activity_at', '-id'], name='discussion_active_idx'),
+            models.Index(fields=['category', '-is_pinned', '-created_at', '-id'], name='discussion_category_idx'),
+            models.Index(fields=['category', '-is_pinned', '-last_activity_at', '-id'],
+                         name='discussion_cat_active_idx'),
+            # Incremental exports (api.export).
+            models.Index(fields=['updated_at', 'id'], name='discussion_updated_idx'),
+        ]
+
+class DiscussionViewerSketch(models.Model):
+    """
+    HyperLogLog registers estimating the distinct viewers of a discussion.
+    Kept out of the discussion row so list queries don't carry the blob.
+    """
+    discussion = models.OneToOneField(
+        Discussion,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='viewer_sketch'
+    )
+    registers = models.BinaryField()
+
+    def __str__(self):
+        return f'Viewer sketch for {self.discussion_id}'
+
 class Comment(models.Model):
     discussion = models.ForeignKey(Discussion, on_delete=models.CASCADE, related_name='comments')
     author = models.ForeignKey(User, on_delete=models.CASCADE)
@@ -55,6 +91,13 @@ class Comment(models.Model):
     def __str__(self):
         return f'Comment by {self.author.username} on {self.discussion.title}'
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['discussion', 'created_at', 'id'], name='comment_discussion_idx'),
+            models.Index(fields=['created_at', 'id'], name='comment_created_idx'),
+            models.Index(fields=['updated_at', 'id'], name='comment_updated_idx'),
+        ]
+
 class News(models.Model):
     title = models.CharField(max_length=200)
     body = models.TextField()
@@ -64,6 +107,9 @@ class News(models.Model):
     class Meta:
         ordering = ['-created_at']
         verbose_name_plural = 'News'
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='news_created_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -90,22 +136,25 @@ class CodeSnippet(models.Model):
     description = models.TextField()
     author = models.ForeignKey(User, on_delete=models.CASCADE)
     created_at = models.DateTimeField(auto_now_add=True)
-    likes = models.ManyToManyField(User, related_name='liked_snippets')
-    dislikes = models.ManyToManyField(User, related_name='disliked_snippets')
+    updated_at = models.DateTimeField(auto_now=True)
+    reactions = GenericRelation('Reaction')
+    # Denormalized reaction counters, kept in sync by api.reactions and
+    # repaired by the reconcile_reaction_counts command.
+    likes_count = models.PositiveIntegerField(default=0)
+    dislikes_count = models.PositiveIntegerField(default=0)
+
+    REACTION_KINDS = ('like', 'dislike')
 
     def __str__(self):
         return self.title
 
     class Meta:
         ordering = ['-created_at']
-
-    @property
-    def likes_count(self):
-        return self.likes.count()
-
-    @property
-    def dislikes_count(self):
-        return self.dislikes.count()
+        indexes = [
+            models.Index(fields=['-likes_count', '-created_at', '-id'], name='snippet_most_liked_idx'),
+            models.Index(fields=['-created_at', '-id'], name='snippet_created_idx'),
+            models.Index(fields=['updated_at', 'id'], name='snippet_updated_idx'),
+        ]
 
 class Code(models.Model):
     snippet = models.ForeignKey(CodeSnippet, related_name='codes', on_delete=models.CASCADE)
@@ -122,17 +171,26 @@ class Code(models.Model):
 
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['snippet', 'created_at'], name='code_snippet_idx'),
+        ]
 
 class Tag(models.Model):
     name = models.CharField(max_length=50, unique=True)
     slug = models.SlugField(unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Maintained by api.tags; repaired by the reconcile_tag_stats command.
+    blog_count = models.PositiveIntegerField(default=0)
+    last_used_at = models.DateTimeField(null=True, blank=True)
 
     def __str__(self):
         return self.name
 
     class Meta:
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['-blog_count', 'name'], name='tag_popular_idx'),
+        ]
 
 class Blog(models.Model):
     title = models.CharField(max_length=200)
@@ -140,16 +198,88 @@ class Blog(models.Model):
     author = models.ForeignKey(User, on_delete=models.CASCADE)
     tags = models.ManyToManyField(Tag, related_name='blogs')
     image = models.ImageField(upload_to='blog_images/', blank=True, null=True)
+    # {"<width>": {"webp": <storage name>, "<format>": <storage name>}},
+    # filled in by api.images after the upload is saved.
+    image_variants = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
-    likes = models.ManyToManyField(User, related_name='liked_blogs', blank=True)
+    reactions = GenericRelation('Reaction')
+    likes_count = models.PositiveIntegerField(default=0)
+
+    REACTION_KINDS = ('like',)
 
     def __str__(self):
         return self.title
 
-    @property
-    def likes_count(self):
-        return self.likes.count()
-
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-likes_count', '-created_at', '-id'], name='blog_most_liked_idx'),
+            models.Index(fields=['-created_at', '-id'], name='blog_created_idx'),
+            models.Index(fields=['updated_at', 'id'], name='blog_updated_idx'),
+        ]
+
+class Reaction(models.Model):
+    """A user's like or dislike of a snippet or blog; at most one per target."""
+    LIKE = 'like'
+    DISLIKE = 'dislike'
+    KIND_CHOICES = [
+        (LIKE, 'Like'),
+        (DISLIKE, 'Dislike'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='reactions')
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveBigIntegerField()
+    target = GenericForeignKey('content_type', 'object_id')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'{self.user_id} {self.kind}s {self.content_type_id}:{self.object_id}'
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'content_type', 'object_id'],
+                name='unique_reaction_per_target'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['content_type', 'object_id', 'kind'], name='reaction_target_idx'),
+        ]
+
+class SearchDocument(models.Model):
+    """Searchable text of one indexed object, kept up to date by api.search."""
+    kind = models.CharField(max_length=20)
+    object_id = models.PositiveBigIntegerField()
+    parent_id = models.PositiveBigIntegerField(null=True, blank=True)
+    title = models.CharField(max_length=200)
+    body = models.TextField()
+    created_at = models.DateTimeField()
+
+    def __str__(self):
+        return f'{self.kind}:{self.object_id}'
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='unique_search_document'),
+        ]
+
+class SearchPosting(models.Model):
+    """One term of the inverted index with its weight in a document."""
+    term = models.CharField(max_length=64)
+    kind = models.CharField(max_length=20)
+    object_id = models.PositiveBigIntegerField()
+    weight = models.PositiveIntegerField()
+
+    def __str__(self):
+        return f'{self.term} -> {self.kind}:{self.object_id}'
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['term', 'kind', 'object_id'], name='unique_search_posting'),
+        ]
+        indexes = [
+            models.Index(fields=['kind', 'object_id'], name='search_posting_doc_idx'),
+        ]
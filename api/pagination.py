@@ -0,0 +1,219 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+from datetime import date, datetime
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over a composite, unique ordering such as
+    ``('-created_at', '-id')``.
+
+    Pages are selected with a ``(created_at, id) < (x, y)`` style filter
+    instead of OFFSET, and no COUNT(*) is issued, so the hundredth page costs
+    the same as the first. Views can pick the ordering per request by
+    defining ``get_pagination_ordering()``. The last ordering field must be
+    unique and none of them may be NULL.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    ordering = ('-created_at', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page_queryset = self.get_page_queryset(queryset, request, view)
+        return self.build_page(list(page_queryset))
+
+    def get_page_queryset(self, queryset, request, view=None):
+        """
+        Return the ordered, filtered and sliced queryset for the requested
+        page. It is left unevaluated so async callers can iterate it with
+        ``async for``; pass the rows to ``build_page()`` afterwards.
+        """
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.position, self.reverse = self.decode_cursor(request, queryset.model)
+
+        ordering = self.ordering
+        if self.reverse:
+            ordering = tuple(self._invert(field) for field in ordering)
+
+        queryset = queryset.order_by(*ordering)
+        if self.position is not None:
+            queryset = queryset.filter(self._keyset_filter(ordering, self.position))
+
+        # Fetch one extra row to know whether another page follows.
+        return queryset[:self.page_size + 1]
+
+    def build_page(self, rows):
+        has_more = len(rows) > self.page_size
+        page = rows[:self.page_size]
+
+        if self.reverse:
+            page.reverse()
+            self.has_next = page != []
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.position is not None and page != []
+
+        self.page = page
+        return page
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                return _positive_int(
+                    request.query_params[self.page_size_query_param],
+                    strict=True,
+                    cutoff=self.max_page_size
+                )
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def get_ordering(self, request, queryset, view):
+        if view is not None and hasattr(view, 'get_pagination_ordering'):
+            return tuple(view.get_pagination_ordering())
+        return tuple(self.ordering)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, instance, reverse):
+        position = [
+            self._serialize_value(self._get_value(instance, field.lstrip('-')))
+            for field in self.ordering
+        ]
+        payload = {'p': position}
+        if reverse:
+            payload['r'] = 1
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(payload, separators=(',', ':')).encode('ascii')
+        ).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')))
+            position = payload['p']
+            reverse = bool(payload.get('r', 0))
+        except (TypeError, ValueError, KeyError, AttributeError, UnicodeEncodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        # A well-formed cursor can still carry values of the wrong type;
+        # convert them here rather than let the filter fail with a 500.
+        values = []
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip('-')
+            model_field = model._meta.pk if name == 'pk' else model._meta.get_field(name)
+            try:
+                value = model_field.to_python(value)
+            except (ValidationError, TypeError, ValueError):
+                raise NotFound(self.invalid_cursor_message)
+            if value is None:
+                raise NotFound(self.invalid_cursor_message)
+            if isinstance(value, datetime) and settings.USE_TZ and timezone.is_naive(value):
+                value = timezone.make_aware(value)
+            values.append(value)
+        return values, reverse
+
+    def _keyset_filter(self, ordering, position):
+        # (a, b, c) > (x, y, z) expands to
+        #   a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z)
+        # with a leading a >= x bound so the database can range-scan the
+        # index on the first column.
+        names = [field.lstrip('-') for field in ordering]
+        condition = Q()
+        for i, field in enumerate(ordering):
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            clause = Q(**{f'{names[i]}__{lookup}': position[i]})
+            for name, value in zip(names[:i], position[:i]):
+                clause &= Q(**{name: value})
+            condition |= clause
+
+        first_lookup = 'lte' if ordering[0].startswith('-') else 'gte'
+        return Q(**{f'{names[0]}__{first_lookup}': position[0]}) & condition
+
+    @staticmethod
+    def _invert(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    @staticmethod
+    def _get_value(instance, name):
+        if isinstance(instance, dict):
+            return instance[name]
+        return getattr(instance, name)
+
+    @staticmethod
+    def _serialize_value(value):
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        return value
+
+
+class DiscussionPagination(KeysetPagination):
+    page_size = 20
+
+
+class CommentPagination(KeysetPagination):
+    page_size = 50
+    ordering = ('created_at', 'id')
+
+
+class UserPagination(KeysetPagination):
+    page_size = 50
+    ordering = ('-date_joined', '-id')
+
+
+class SearchPagination(PageNumberPagination):
+    # Ranked results have no stable keyset, and nobody pages deep into
+    # search hits, so plain page numbers are fine here.
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 50
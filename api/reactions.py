@@ -0,0 +1,219 @@
+"""
+Reaction toggling and syncing.
+
+Reactions live in the single ``Reaction`` table, and each target model
+carries denormalized ``<kind>s_count`` columns. Every change runs in one
+transaction that updates both, so the counters never drift from the rows.
+A toggle costs a fixed handful of queries however popular the target is.
+Deleting a user takes their reactions out of the counters before the rows
+cascade away (``remove_user_reactions``, from ``api.signals``).
+"""
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.contrib.contenttypes.models import ContentType
+from django.db import IntegrityError, transaction
+from django.db.models import Case, F, Q, When
+
+from .models import Blog, CodeSnippet, Reaction
+
+# Public names used by the API for each reactable model.
+REACTION_TARGETS = {
+    'snippet': CodeSnippet,
+    'blog': Blog,
+}
+
+COUNTER_FIELDS = {
+    Reaction.LIKE: 'likes_count',
+    Reaction.DISLIKE: 'dislikes_count',
+}
+
+
+def counter_fields(model):
+    return [COUNTER_FIELDS[kind] for kind in model.REACTION_KINDS]
+
+
+def reaction_deltas(previous, current):
+    """Counter changes caused by moving from ``previous`` to ``current``."""
+    deltas = {}
+    if previous == current:
+        return deltas
+    if previous is not None:
+        deltas[COUNTER_FIELDS[previous]] = -1
+    if current is not None:
+        deltas[COUNTER_FIELDS[current]] = deltas.get(COUNTER_FIELDS[current], 0) + 1
+    return deltas
+
+
+def user_reactions(user, model, ids):
+    """Return ``{object_id: kind}`` for the reactions ``user`` left on ``ids``."""
+    content_type = ContentType.objects.get_for_model(model)
+    return dict(
+        Reaction.objects
+        .filter(user=user, content_type=content_type, object_id__in=ids)
+        .values_list('object_id', 'kind')
+    )
+
+
+async def auser_reactions(user, model, ids):
+    """Async version of ``user_reactions``."""
+    content_type = await sync_to_async(ContentType.objects.get_for_model)(model)
+    reactions = Reaction.objects\
+        .filter(user=user, content_type=content_type, object_id__in=ids)\
+        .values_list('object_id', 'kind')
+    # aiterator() runs the query synchronously for values_list() querysets
+    # on Django 4.2; async iteration of the queryset itself does not.
+    return {object_id: kind async for object_id, kind in reactions}
+
+
+def toggle_reaction(user, target, kind):
+    """
+    Toggle ``user``'s ``kind`` reaction on ``target``, replacing any other
+    reaction they had left on it.
+
+    Returns ``(current_kind, counts)``, where ``current_kind`` is None if the
+    toggle removed the reaction and ``counts`` maps counter field to value.
+    """
+    model = type(target)
+    if kind not in model.REACTION_KINDS:
+        raise ValueError(f'{model.__name__} does not support {kind!r} reactions')
+    content_type = ContentType.objects.get_for_model(model)
+
+    with transaction.atomic():
+        reaction = Reaction.objects.select_for_update()\
+            .filter(user=user, content_type=content_type, object_id=target.pk)\
+            .values_list('pk', 'kind')
+        existing = reaction.first()
+
+        previous = current = None
+        if existing is None:
+            try:
+                with transaction.atomic():
+                    Reaction.objects.create(
+                        user=user, content_type=content_type, object_id=target.pk, kind=kind
+                    )
+                current = kind
+            except IntegrityError:
+                # A concurrent request from the same user inserted first, and
+                # its insert counted whatever kind it stored. Toggle that row.
+                existing = reaction.first()
+
+        if existing is not None:
+            if existing[1] == kind:
+                previous = kind
+                Reaction.objects.filter(pk=existing[0]).delete()
+            else:
+                previous, current = existing[1], kind
+                Reaction.objects.filter(pk=existing[0]).update(kind=kind)
+
+        deltas = reaction_deltas(previous, current)
+        if deltas:
+            model.objects.filter(pk=target.pk).update(
+                **{field: F(field) + delta for field, delta in deltas.items()}
+            )
+        counts = model.objects.filter(pk=target.pk).values(*counter_fields(model)).get()
+
+    return current, counts
+
+
+def sync_reactions(user, items):
+    """
+    Apply a batch of desired reaction states for ``user``.
+
+    ``items`` is a sequence of ``(model, object_id, kind)`` tuples, where a
+    ``kind`` of None clears the reaction. Unlike toggles, applying the same
+    batch twice is a no-op, which is what offline clients replaying a queue
+    need. When a target appears more than once, its last entry wins. Returns
+    ``(states, missing)``: ``states`` maps ``(model, object_id)`` to
+    ``(kind, counts)``, and ``missing`` lists targets that do not exist.
+    """
+    desired = {}
+    for model, object_id, kind in items:
+        desired[(model, object_id)] = kind
+
+    ids_by_model = defaultdict(set)
+    for model, object_id in desired:
+        ids_by_model[model].add(object_id)
+    content_types = ContentType.objects.get_for_models(*ids_by_model)
+    models_by_content_type = {ct.pk: model for model, ct in content_types.items()}
+
+    with transaction.atomic():
+        existing_ids = {
+            model: set(model.objects.filter(pk__in=ids).values_list('pk', flat=True))
+            for model, ids in ids_by_model.items()
+        }
+        missing = [key for key in desired if key[1] not in existing_ids[key[0]]]
+        for key in missing:
+            del desired[key]
+
+        lookup = Q()
+        for model, ids in existing_ids.items():
+            lookup |= Q(content_type=content_types[model], object_id__in=ids)
+        current = {}
+        if desired:
+            current = {
+                (models_by_content_type[content_type_id], object_id): (pk, kind)
+                for pk, content_type_id, object_id, kind in Reaction.objects
+                    .select_for_update()
+                    .filter(lookup, user=user)
+                    .values_list('pk', 'content_type_id', 'object_id', 'kind')
+            }
+
+        to_create, to_delete, to_update = [], [], defaultdict(list)
+        deltas = {}
+        for (model, object_id), kind in desired.items():
+            pk, previous = current.get((model, object_id), (None, None))
+            if previous == kind:
+                continue
+            if previous is None:
+                to_create.append(Reaction(
+                    user=user, content_type=content_types[model], object_id=object_id, kind=kind
+                ))
+            elif kind is None:
+                to_delete.append(pk)
+            else:
+                to_update[kind].append(pk)
+            deltas[(model, object_id)] = reaction_deltas(previous, kind)
+
+        if to_create:
+            Reaction.objects.bulk_create(to_create)
+        if to_delete:
+            Reaction.objects.filter(pk__in=to_delete).delete()
+        for kind, pks in to_update.items():
+            Reaction.objects.filter(pk__in=pks).update(kind=kind)
+
+        # Targets that need the same counter change share one UPDATE.
+        grouped = defaultdict(list)
+        for (model, object_id), change in deltas.items():
+            grouped[(model, tuple(sorted(change.items())))].append(object_id)
+        for (model, change), object_ids in grouped.items():
+            model.objects.filter(pk__in=object_ids).update(
+                **{field: F(field) + delta for field, delta in change}
+            )
+
+        counts = {}
+        for model, ids in existing_ids.items():
+            for row in model.objects.filter(pk__in=ids).values('pk', *counter_fields(model)):
+                counts[(model, row.pop('pk'))] = row
+
+    states = {key: (kind, counts[key]) for key, kind in desired.items()}
+    return states, missing
+
+
+def remove_user_reactions(user):
+    """
+    Decrement the counters for every reaction ``user`` left, with one UPDATE
+    per target model and kind. Called before the account is deleted, since
+    the reaction rows cascade away without touching the counters.
+    """
+    content_types = ContentType.objects.get_for_models(*REACTION_TARGETS.values())
+    for model, content_type in content_types.items():
+        for kind in model.REACTION_KINDS:
+            field = COUNTER_FIELDS[kind]
+            object_ids = Reaction.objects\
+                .filter(user=user, content_type=content_type, kind=kind)\
+                .values('object_id')
+            model.objects.filter(pk__in=object_ids).update(**{
+                # Never below zero; the columns are unsigned on MySQL.
+                field: Case(When(**{f'{field}__gt': 0}, then=F(field) - 1), default=0),
+            })
@@ -0,0 +1,165 @@
+"""
+Read replicas for safe-method requests.
+
+``ReplicaMiddleware`` picks a replica alias from ``DATABASE_REPLICAS`` for
+GET, HEAD and OPTIONS requests, and ``ReplicaRouter`` sends that request's
+reads to it. The alias is held in a context variable, so ORM calls made
+from ``sync_to_async`` threads under ASGI see it too. Writes, and every
+query of other requests, use ``default``.
+
+Reads stay on the primary in two cases:
+
+- For ``REPLICA_PIN_SECONDS`` after a client sends an unsafe request, so it
+  reads its own writes. Clients are told apart by a hash of their
+  Authorization header. Pins live in the default cache, so they only hold
+  across workers when that cache is shared.
+- When a replica's lag exceeds ``REPLICA_MAX_LAG_SECONDS``, replication has
+  stopped, or the replica can't be reached. Health is checked at most every
+  ``REPLICA_CHECK_INTERVAL`` seconds per process. Backends without
+  replication status (SQLite, for local testing with two database files)
+  count as never lagging.
+"""
+import hashlib
+import random
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DatabaseError, connections
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_read_alias = ContextVar('read_alias', default=None)
+
+# alias -> usable; refreshed every REPLICA_CHECK_INTERVAL seconds.
+_health = {}
+_health_checked_at = None
+_health_lock = threading.Lock()
+
+
+def replica_lag(alias):
+    """Seconds the replica is behind, or None if replication is not running."""
+    connection = connections[alias]
+    if connection.vendor != 'mysql':
+        return 0
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute('SHOW REPLICA STATUS')
+        except DatabaseError:
+            # MySQL before 8.0.22.
+            cursor.execute('SHOW SLAVE STATUS')
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        status = dict(zip([column[0] for column in cursor.description], row))
+    lag = status.get('Seconds_Behind_Source', status.get('Seconds_Behind_Master'))
+    return None if lag is None else float(lag)
+
+
+def check_replicas():
+    global _health_checked_at
+    health = {}
+    for alias in settings.DATABASE_REPLICAS:
+        try:
+            lag = replica_lag(alias)
+        except DatabaseError:
+            lag = None
+        health[alias] = lag is not None and lag <= settings.REPLICA_MAX_LAG_SECONDS
+    _health.update(health)
+    _health_checked_at = time.monotonic()
+
+
+def health_is_stale():
+    return _health_checked_at is None or \
+        time.monotonic() - _health_checked_at >= settings.REPLICA_CHECK_INTERVAL
+
+
+def refresh_health():
+    # One thread checks; the others keep using the previous result.
+    if _health_lock.acquire(blocking=_health_checked_at is None):
+        try:
+            if health_is_stale():
+                check_replicas()
+        finally:
+            _health_lock.release()
+
+
+def healthy_replica():
+    replicas = [alias for alias in settings.DATABASE_REPLICAS if _health.get(alias)]
+    return random.choice(replicas) if replicas else None
+
+
+def pin_key(request):
+    authorization = request.headers.get('Authorization')
+    if not authorization:
+        return None
+    return 'replica-pin:' + hashlib.sha256(authorization.encode('utf-8')).hexdigest()
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        key = pin_key(request)
+        alias = None
+        if request.method in SAFE_METHODS and not (key and cache.get(key)):
+            if health_is_stale():
+                refresh_health()
+            alias = healthy_replica()
+
+        token = _read_alias.set(alias)
+        try:
+            response = self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+
+        if request.method not in SAFE_METHODS and key:
+            cache.set(key, True, settings.REPLICA_PIN_SECONDS)
+        return response
+
+    async def __acall__(self, request):
+        key = pin_key(request)
+        alias = None
+        if request.method in SAFE_METHODS and not (key and await cache.aget(key)):
+            if health_is_stale():
+                await sync_to_async(refresh_health)()
+            alias = healthy_replica()
+
+        token = _read_alias.set(alias)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _read_alias.reset(token)
+
+        if request.method not in SAFE_METHODS and key:
+            await cache.aset(key, True, settings.REPLICA_PIN_SECONDS)
+        return response
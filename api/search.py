@@ -0,0 +1,210 @@
+"""
+Full-text search over discussions, comments, blogs, news, snippets and code.
+
+Indexed objects are copied into ``SearchDocument`` and tokenized into
+``SearchPosting`` rows (term -> document, weight). The post_save and
+post_delete signals in ``api.signals`` keep both tables current. Queries look
+up their terms through the ``(term, kind, object_id)`` index and rank the
+matches by TF-IDF in SQL. They never scan the content tables, and the index
+behaves the same on MySQL and SQLite.
+"""
+import math
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, Q, Sum, Value, When
+
+from .models import Blog, Code, CodeSnippet, Comment, Discussion, News, SearchDocument, SearchPosting
+
+TITLE_WEIGHT = 3
+MAX_TERM_LENGTH = 64
+MAX_QUERY_TERMS = 10
+SNIPPET_LENGTH = 200
+
+STOP_WORDS = frozenset("""
+    a an and are as at be but by for from has have in is it its of on or that
+    the this to was were will with
+""".split())
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+_indexing_paused = ContextVar('search_indexing_paused', default=False)
+
+
+def _source(model, title, body, parent=None):
+    return {'model': model, 'title': title, 'body': body, 'parent': parent}
+
+
+# Search type -> how to extract the indexed text from an instance.
+SEARCH_SOURCES = {
+    'discussion': _source(Discussion, lambda o: o.title, lambda o: o.content),
+    'comment': _source(Comment, lambda o: o.discussion.title, lambda o: o.content,
+                       parent=lambda o: o.discussion_id),
+    'blog': _source(Blog, lambda o: o.title, lambda o: o.content),
+    'news': _source(News, lambda o: o.title, lambda o: o.body),
+    'snippet': _source(CodeSnippet, lambda o: o.title, lambda o: o.description),
+    'code': _source(Code, lambda o: o.snippet.title, lambda o: o.code,
+                    parent=lambda o: o.snippet_id),
+}
+
+SEARCH_KINDS = {source['model']: kind for kind, source in SEARCH_SOURCES.items()}
+
+# Types whose list endpoints are readable without logging in.
+PUBLIC_SEARCH_TYPES = ('discussion', 'news')
+
+
+def tokenize(text):
+    return [
+        token[:MAX_TERM_LENGTH]
+        for token in TOKEN_RE.findall(text.lower())
+        if len(token) > 1 and token not in STOP_WORDS
+    ]
+
+
+def _build(kind, instance):
+    source = SEARCH_SOURCES[kind]
+    title = source['title'](instance)[:200]
+    body = source['body'](instance)
+    document = SearchDocument(
+        kind=kind,
+        object_id=instance.pk,
+        parent_id=source['parent'](instance) if source['parent'] else None,
+        title=title,
+        body=body,
+        created_at=instance.created_at,
+    )
+    # Dampen repeated body terms so a long, repetitive text can't outrank a
+    # short one that is actually about the query.
+    weights = Counter({
+        term: 1 + int(math.log2(count))
+        for term, count in Counter(tokenize(body)).items()
+    })
+    for term in tokenize(title):
+        weights[term] += TITLE_WEIGHT
+    postings = [
+        SearchPosting(term=term, kind=kind, object_id=instance.pk, weight=weight)
+        for term, weight in weights.items()
+    ]
+    return document, postings
+
+
+def index_objects(instances):
+    """(Re)index model instances of any searchable type in a few bulk queries."""
+    documents, postings, keys = [], [], Q()
+    for instance in instances:
+        kind = SEARCH_KINDS[type(instance)]
+        document, document_postings = _build(kind, instance)
+        documents.append(document)
+        postings.extend(document_postings)
+        keys |= Q(kind=kind, object_id=instance.pk)
+
+    if not documents:
+        return
+    with transaction.atomic():
+        delete_rows(SearchDocument.objects.filter(keys))
+        delete_rows(SearchPosting.objects.filter(keys))
+        SearchDocument.objects.bulk_create(documents)
+        SearchPosting.objects.bulk_create(postings, batch_size=1000)
+
+
+def index_object(instance):
+    index_objects([instance])
+
+
+@contextmanager
+def paused_indexing():
+    """
+    Stop the post_save signal from indexing objects one at a time, for
+    callers that pass them to ``index_objects`` afterwards.
+    """
+    token = _indexing_paused.set(True)
+    try:
+        yield
+    finally:
+        _indexing_paused.reset(token)
+
+
+def indexing_paused():
+    return _indexing_paused.get()
+
+
+def delete_rows(queryset):
+    """
+    Delete with a single DELETE statement. The index tables have no relations
+    or signals, so there is nothing to collect first.
+    """
+    return queryset._raw_delete(queryset.db)
+
+
+def remove_object(instance):
+    kind = SEARCH_KINDS[type(instance)]
+    delete_rows(SearchDocument.objects.filter(kind=kind, object_id=instance.pk))
+    delete_rows(SearchPosting.objects.filter(kind=kind, object_id=instance.pk))
+
+
+def search(query, kinds):
+    """
+    Rank the documents of the given ``kinds`` matching ``query``.
+
+    Returns ``(terms, queryset)``. The queryset yields dicts with ``kind``,
+    ``object_id``, ``matched`` and ``score``, best matches first. Documents
+    matching more distinct terms come first, then higher TF-IDF scores.
+    """
+    terms = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+    postings = SearchPosting.objects.filter(term__in=terms, kind__in=kinds)
+    if not terms:
+        return terms, postings.none().values('kind', 'object_id')
+
+    total = SearchDocument.objects.filter(kind__in=kinds).count() or 1
+    frequencies = dict(
+        postings.values('term').annotate(documents=Count('pk')).values_list('term', 'documents')
+    )
+    score = Sum(Case(
+        *[
+            When(term=term, then=F('weight') * Value(math.log(1 + total / frequency)))
+            for term, frequency in frequencies.items()
+        ],
+        default=Value(0.0),
+        output_field=FloatField(),
+    ))
+    ranked = postings\
+        .values('kind', 'object_id')\
+        .annotate(matched=Count('term'), score=score)\
+        .order_by('-matched', '-score', '-object_id')
+    return terms, ranked
+
+
+def load_documents(hits):
+    """Fetch the ``SearchDocument`` rows for ranked hits in one query."""
+    keys = Q()
+    for hit in hits:
+        keys |= Q(kind=hit['kind'], object_id=hit['object_id'])
+    if not hits:
+        return {}
+    return {
+        (document.kind, document.object_id): document
+        for document in SearchDocument.objects.filter(keys)
+    }
+
+
+def make_snippet(text, terms, length=SNIPPET_LENGTH):
+    """Cut a window of ``text`` around the first matching term."""
+    text = ' '.join(text.split())
+    if len(text) <= length:
+        return text
+
+    start = 0
+    if terms:
+        pattern = re.compile('|'.join(re.escape(term) for term in terms), re.IGNORECASE)
+        match = pattern.search(text)
+        if match:
+            start = max(0, match.start() - length // 4)
+    snippet = text[start:start + length]
+    if start > 0:
+        snippet = '…' + snippet
+    if start + length < len(text):
+        snippet += '…'
+    return snippet
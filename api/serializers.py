@@ -1,7 +1,10 @@
 from rest_framework import serializers
-from .models import Category, Discussion, Comment, News, ProgrammingLanguage, Code, CodeSnippet, Tag, Blog
+from .models import Category, Discussion, Comment, News, ProgrammingLanguage, Code, CodeSnippet, Tag, Blog, Reaction
+from .bulk import create_blogs, create_snippets
+from .images import schedule_variants
+from .media import media_url
+from .reactions import REACTION_TARGETS
 from django.contrib.auth import get_user_model
-from django.utils.text import slugify
 from django.contrib.auth.models import Group
 
 User = get_user_model()
@@ -27,6 +30,11 @@ class UserSerializer(serializers.ModelSerializer):
             data['isActive'] = data.pop('is_active')
         return data
 
+class AuthorSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = ('id', 'username')
+
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
@@ -58,6 +66,30 @@ class DiscussionSerializer(serializers.ModelSerializer):
     class Meta:
         model = Discussion
         fields = '__all__' 
+        # Counters maintained by api.viewcounts and api.activity.
+        read_only_fields = ['views', 'unique_views', 'comment_count', 'last_activity_at']
+
+class DiscussionListSerializer(serializers.ModelSerializer):
+    """
+    List representation without the comment tree, using the stored
+    ``comment_count`` and ``last_activity_at``.
+    """
+    author = AuthorSummarySerializer(read_only=True)
+    category = CategorySerializer(read_only=True)
+    last_comment_at = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Discussion
+        fields = ['id', 'title', 'content', 'category', 'author', 'created_at',
+                 'updated_at', 'views', 'unique_views', 'is_pinned', 'comment_count',
+                 'last_comment_at', 'last_activity_at']
+
+    def get_last_comment_at(self, obj):
+        # Comments postdate their discussion, so with any comments the latest
+        # activity is the newest comment.
+        if not obj.comment_count:
+            return None
+        return serializers.DateTimeField().to_representation(obj.last_activity_at)
 
 class NewsSerializer(serializers.ModelSerializer):
     class Meta:
@@ -88,16 +120,18 @@ class CodeSnippetSerializer(serializers.ModelSerializer):
     class Meta:
         model = CodeSnippet
         fields = ['id', 'title', 'description', 'author', 'codes', 'created_at', 
-                 'likes_count', 'dislikes_count', 'user_reaction']
+                 'updated_at', 'likes_count', 'dislikes_count', 'user_reaction']
 
     def get_user_reaction(self, obj):
         user = self.context['request'].user
-        if user.is_authenticated:
-            if user in obj.likes.all():
-                return 'like'
-            elif user in obj.dislikes.all():
-                return 'dislike'
-        return None
+        if not user.is_authenticated:
+            return None
+        # Views resolve the whole page's reactions up front; see
+        # UserReactionContextMixin.
+        reactions = self.context.get('user_reactions')
+        if reactions is not None:
+            return reactions.get(obj.pk)
+        return obj.reactions.filter(user=user).values_list('kind', flat=True).first()
 
 class CodeSnippetCreateSerializer(serializers.ModelSerializer):
     codes = CodeSerializer(many=True)
@@ -106,19 +140,26 @@ class CodeSnippetCreateSerializer(serializers.ModelSerializer):
         model = CodeSnippet
         fields = ['title', 'description', 'codes']
 
+    def validate_codes(self, codes):
+        # Bulk imports pass every language id in the context to avoid one
+        # query per item.
+        known = self.context.get('language_ids')
+        if known is None:
+            known = set(ProgrammingLanguage.objects
+                        .filter(pk__in=[code['language_id'] for code in codes])
+                        .values_list('pk', flat=True))
+        unknown = sorted({code['language_id'] for code in codes} - set(known))
+        if unknown:
+            raise serializers.ValidationError(f'Unknown language id(s): {unknown}')
+        return codes
+
     def create(self, validated_data):
-        codes_data = validated_data.pop('codes')
-        snippet = CodeSnippet.objects.create(**validated_data)
-        
-        for code_data in codes_data:
-            Code.objects.create(snippet=snippet, **code_data)
-        
-        return snippet
+        return create_snippets([validated_data])[0]
 
 class TagSerializer(serializers.ModelSerializer):
     class Meta:
         model = Tag
-        fields = ['id', 'name', 'slug']
+        fields = ['id', 'name', 'slug', 'blog_count', 'last_used_at']
 
 class BlogSerializer(serializers.ModelSerializer):
     author = UserSerializer(read_only=True)
@@ -126,23 +167,42 @@ class BlogSerializer(serializers.ModelSerializer):
     likes_count = serializers.IntegerField(read_only=True)
     user_has_liked = serializers.SerializerMethodField()
     image_url = serializers.SerializerMethodField()
+    image_variants = serializers.SerializerMethodField()
     
     class Meta:
         model = Blog
         fields = ['id', 'title', 'content', 'author', 'tags', 'image', 'image_url',
-                 'created_at', 'updated_at', 'likes_count', 'user_has_liked']
+                 'image_variants', 'created_at', 'updated_at', 'likes_count', 'user_has_liked']
 
     def get_user_has_liked(self, obj):
         user = self.context['request'].user
-        return user in obj.likes.all() if user.is_authenticated else False
+        if not user.is_authenticated:
+            return False
+        reactions = self.context.get('user_reactions')
+        if reactions is not None:
+            return reactions.get(obj.pk) == Reaction.LIKE
+        return obj.reactions.filter(user=user, kind=Reaction.LIKE).exists()
 
     def get_image_url(self, obj):
         if obj.image:
             request = self.context.get('request')
             if request:
-                return request.build_absolute_uri(obj.image.url)
+                return request.build_absolute_uri(media_url(obj.image.name))
         return None
 
+    def get_image_variants(self, obj):
+        # {"320": {"webp": url, "png": url}, ...}; empty until generated.
+        request = self.context.get('request')
+        if not obj.image or not request:
+            return {}
+        return {
+            width: {
+                extension: request.build_absolute_uri(media_url(name))
+                for extension, name in files.items()
+            }
+            for width, files in obj.image_variants.items()
+        }
+
 class BlogCreateSerializer(serializers.ModelSerializer):
     tags = serializers.ListField(child=serializers.CharField(), write_only=True, required=False)
 
@@ -151,18 +211,25 @@ class BlogCreateSerializer(serializers.ModelSerializer):
         fields = ['title', 'content', 'image', 'tags']
 
     def create(self, validated_data):
-        tags_data = validated_data.pop('tags', [])
-        blog = Blog.objects.create(**validated_data)
-        
-        for tag_name in tags_data:
-            tag, _ = Tag.objects.get_or_create(
-                name=tag_name.lower(),
-                slug=slugify(tag_name)
-            )
-            blog.tags.add(tag)
+        blog = create_blogs([validated_data])[0]
+        if blog.image:
+            schedule_variants(blog)
         
         return blog
 
+class ReactionSyncSerializer(serializers.Serializer):
+    target = serializers.ChoiceField(choices=list(REACTION_TARGETS))
+    id = serializers.IntegerField(min_value=1)
+    kind = serializers.ChoiceField(choices=Reaction.KIND_CHOICES, allow_null=True)
+
+    def validate(self, attrs):
+        kind = attrs['kind']
+        if kind is not None and kind not in REACTION_TARGETS[attrs['target']].REACTION_KINDS:
+            raise serializers.ValidationError(
+                {'kind': f"A {attrs['target']} cannot receive a {kind}."}
+            )
+        return attrs
+
 class UserCreateSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
     role = serializers.ChoiceField(choices=['user', 'moderator', 'admin'])
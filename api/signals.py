@@ -0,0 +1,97 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .activity import comment_added, comment_removed
+from .authentication import invalidate_user
+from .cache import CACHE_NAMESPACES, invalidate
+from .models import Blog, Comment, Discussion
+from .reactions import remove_user_reactions
+from .search import SEARCH_KINDS, index_object, indexing_paused, remove_object
+from .tags import refresh_tag_stats
+
+
+def update_search_index(sender, instance, raw=False, **kwargs):
+    if not raw and not indexing_paused():
+        index_object(instance)
+
+
+def remove_from_search_index(sender, instance, **kwargs):
+    remove_object(instance)
+
+
+# Connected per model: a receiver without a sender listens to every model,
+# which stops Django from fast-deleting any of them.
+for model in SEARCH_KINDS:
+    post_save.connect(update_search_index, sender=model)
+    post_delete.connect(remove_from_search_index, sender=model)
+
+
+def invalidate_response_cache(sender, **kwargs):
+    invalidate(CACHE_NAMESPACES[sender])
+
+
+for model in CACHE_NAMESPACES:
+    post_save.connect(invalidate_response_cache, sender=model)
+    post_delete.connect(invalidate_response_cache, sender=model)
+
+
+@receiver(m2m_changed, sender=Blog.tags.through)
+def update_tag_stats(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        # The cleared ids are gone by post_clear; remember them.
+        if reverse:
+            instance._cleared_tag_ids = [instance.pk]
+        else:
+            instance._cleared_tag_ids = list(instance.tags.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        refresh_tag_stats(getattr(instance, '_cleared_tag_ids', []))
+    elif action in ('post_add', 'post_remove'):
+        # Reverse changes (tag.blogs.add(...)) only affect ``instance``.
+        refresh_tag_stats([instance.pk] if reverse else pk_set)
+
+
+@receiver(pre_delete, sender=Blog)
+def remember_blog_tags(sender, instance, **kwargs):
+    # Deleting a blog cascades to its links without m2m_changed.
+    instance._deleted_tag_ids = list(instance.tags.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Blog)
+def update_tag_stats_after_delete(sender, instance, **kwargs):
+    refresh_tag_stats(getattr(instance, '_deleted_tag_ids', []))
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_authenticated_user(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+
+
+@receiver(pre_delete, sender=get_user_model())
+def remove_deleted_user_reactions(sender, instance, **kwargs):
+    # The user's reactions cascade away without touching the counters.
+    remove_user_reactions(instance)
+
+
+@receiver(post_save, sender=Comment)
+def update_activity_after_comment(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        comment_added(instance)
+
+
+@receiver(pre_delete, sender=Discussion)
+def remember_deleted_discussion(sender, instance, origin=None, **kwargs):
+    # pre_delete fires for every collected object before the cascaded
+    # comments are deleted; mark the discussions on the delete's origin.
+    if origin is not None:
+        if not hasattr(origin, '_deleted_discussion_ids'):
+            origin._deleted_discussion_ids = set()
+        origin._deleted_discussion_ids.add(instance.pk)
+
+
+@receiver(post_delete, sender=Comment)
+def update_activity_after_comment_delete(sender, instance, origin=None, **kwargs):
+    # No point updating a discussion that goes away in the same delete.
+    if instance.discussion_id not in getattr(origin, '_deleted_discussion_ids', ()):
+        comment_removed(instance)
@@ -0,0 +1,37 @@
+"""
+Materialized per-tag statistics.
+
+``Tag.blog_count`` and ``Tag.last_used_at`` (the creation time of the newest
+blog carrying the tag) are recomputed from the link table whenever a tag's
+links change. Recomputing rather than incrementing makes concurrent updates
+converge on the right value. ``api.signals`` calls ``refresh_tag_stats`` for
+``blog.tags`` changes and blog deletions. ``api.bulk`` calls it after
+inserting links directly, and ``reconcile_tag_stats`` repairs everything.
+"""
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .cache import CACHE_NAMESPACES, invalidate
+from .models import Blog, Tag
+
+
+def tag_stats():
+    """UPDATE expressions recomputing the statistics of each tag row."""
+    links = Blog.tags.through.objects.filter(tag_id=OuterRef('pk')).order_by()
+    return {
+        'blog_count': Coalesce(Subquery(
+            links.values('tag_id').annotate(total=Count('pk')).values('total')
+        ), 0),
+        'last_used_at': Subquery(
+            links.order_by('-blog__created_at').values('blog__created_at')[:1]
+        ),
+    }
+
+
+def refresh_tag_stats(tag_ids):
+    tag_ids = list(tag_ids)
+    if not tag_ids:
+        return
+    Tag.objects.filter(pk__in=tag_ids).update(**tag_stats())
+    # update() bypasses the post_save cache invalidation.
+    invalidate(CACHE_NAMESPACES[Tag])
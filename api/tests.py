@@ -1,3 +1,1134 @@
-from django.test import TestCase
+import base64
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.db.models import QuerySet
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from . import instrumentation, replicas
+from .export import aexport_rows, export_rows
+from .images import generate_variants
+from .models import (
+    Blog, Category, Code, CodeSnippet, Comment, Discussion, ProgrammingLanguage, Reaction, SearchDocument, Tag,
+)
+from .reactions import toggle_reaction
+from .search import index_objects
+from .viewcounts import HyperLogLog, ViewCounter
+
+
+def encode_cursor(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode('ascii')).decode('ascii')
+
+
+def api_client(user):
+    client = APIClient()
+    # The replica middleware tells clients apart by their Authorization header.
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+    return client
+
+
+# Defined by backend.test_settings.
+HAS_REPLICA = 'replica' in settings.DATABASES
+
+
+@skipUnless(HAS_REPLICA, 'needs the replica database of backend.test_settings')
+@override_settings(DATABASE_REPLICAS=['replica'], REPLICA_PIN_SECONDS=60)
+class ReplicaRoutingTests(TestCase):
+    """
+    ``replica`` is a separate test database in ``backend.test_settings``, so
+    a row that only exists on one side shows which database served a request.
+    """
+    databases = {'default', 'replica'} if HAS_REPLICA else {'default'}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user('alice', 'alice@example.com', 'password')
+        cls.bob = User.objects.create_user('bob', 'bob@example.com', 'password')
+        cls.category = Category.objects.create(name='General', slug='general')
+        # Copied as-is, like replication would, without the save signals.
+        User.objects.using('replica').bulk_create([cls.alice, cls.bob])
+        Category.objects.using('replica').bulk_create([cls.category])
+
+    def setUp(self):
+        cache.clear()
+        replicas._health.clear()
+        replicas._health_checked_at = None
+        self.alice_client = api_client(self.alice)
+        self.bob_client = api_client(self.bob)
+
+    def create_discussion(self, using, title):
+        discussion = Discussion(title=title, content='content', author=self.alice, category=self.category)
+        Discussion.objects.using(using).bulk_create([discussion])
+        return discussion
+
+    def test_safe_methods_read_from_replica(self):
+        discussion = self.create_discussion('replica', 'replica only')
+        url = f'/api/discussions/{discussion.pk}/'
+
+        self.assertFalse(Discussion.objects.using('default').filter(pk=discussion.pk).exists())
+        self.assertEqual(self.bob_client.get(url).status_code, 200)
+        self.assertEqual(self.bob_client.head(url).status_code, 200)
+        titles = [item['title'] for item in self.bob_client.get('/api/discussions/').data['results']]
+        self.assertEqual(titles, ['replica only'])
+
+    def test_writes_go_to_primary(self):
+        response = self.alice_client.post('/api/discussions/', {
+            'title': 'new', 'content': 'content', 'category': self.category.pk,
+        }, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Discussion.objects.using('default').filter(title='new').exists())
+        self.assertFalse(Discussion.objects.using('replica').filter(title='new').exists())
+
+    def test_reads_follow_writes_after_post(self):
+        response = self.alice_client.post('/api/discussions/', {
+            'title': 'new', 'content': 'content', 'category': self.category.pk,
+        }, format='json')
+        url = f"/api/discussions/{Discussion.objects.get(title='new').pk}/"
+
+        # The writer is pinned to the primary; other clients still read the
+        # replica, which has not caught up.
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.alice_client.get(url).status_code, 200)
+        self.assertEqual(self.bob_client.get(url).status_code, 404)
+
+    def test_unhealthy_replica_falls_back_to_primary(self):
+        discussion = self.create_discussion('default', 'primary only')
+        url = f'/api/discussions/{discussion.pk}/'
+
+        with override_settings(REPLICA_MAX_LAG_SECONDS=-1):
+            self.assertEqual(self.bob_client.get(url).status_code, 200)
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alice', 'alice@example.com', 'password')
+        category = Category.objects.create(name='General', slug='general')
+        for number in range(5):
+            Discussion.objects.create(title=f'd{number}', content='content', author=cls.user, category=category)
+        # Equal timestamps leave the order to the id tie-breaker.
+        discussion = Discussion.objects.first()
+        Discussion.objects.update(created_at=discussion.created_at, last_activity_at=discussion.created_at)
+        cls.ids = sorted(Discussion.objects.values_list('pk', flat=True), reverse=True)
+
+    def setUp(self):
+        cache.clear()
+        self.client = api_client(self.user)
+
+    def test_pages_follow_next_links(self):
+        ids, url = [], '/api/discussions/?page_size=2'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids += [item['id'] for item in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(ids, self.ids)
+
+    def test_previous_link_returns_previous_page(self):
+        first = self.client.get('/api/discussions/?page_size=2').data
+        second = self.client.get(first['next']).data
+        self.assertIsNone(first['previous'])
+        self.assertEqual([item['id'] for item in second['results']], self.ids[2:4])
+
+        previous = self.client.get(second['previous']).data
+        self.assertEqual(previous['results'], first['results'])
+
+    def test_bad_cursors_are_not_found(self):
+        cursors = [
+            'not a cursor',
+            base64.urlsafe_b64encode(b'not json').decode('ascii'),
+            encode_cursor([1, 2]),
+            encode_cursor({'p': [1]}),
+            encode_cursor({'p': ['yesterday', 'x']}),
+            encode_cursor({'p': [None, 1]}),
+        ]
+        for cursor in cursors:
+            with self.subTest(cursor=cursor):
+                response = self.client.get('/api/discussions/', {'cursor': cursor})
+                self.assertEqual(response.status_code, 404)
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alice', 'alice@example.com', 'password')
+        category = Category.objects.create(name='General', slug='general')
+        cls.discussion = Discussion.objects.create(
+            title='title', content='content', author=cls.user, category=category,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = api_client(self.user)
+
+    def test_list_not_modified(self):
+        etag = self.client.get('/api/discussions/')['ETag']
+
+        response = self.client.get('/api/discussions/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_list_modified_after_change(self):
+        etag = self.client.get('/api/discussions/')['ETag']
+        Comment.objects.create(discussion=self.discussion, author=self.user, content='comment')
+
+        response = self.client.get('/api/discussions/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_detail_not_modified(self):
+        url = f'/api/discussions/{self.discussion.pk}/'
+        etag = self.client.get(url)['ETag']
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_detail_ignores_if_modified_since(self):
+        # A new comment leaves updated_at alone but changes the payload.
+        url = f'/api/discussions/{self.discussion.pk}/'
+        last_modified = self.client.get(url)['Last-Modified']
+        Comment.objects.create(discussion=self.discussion, author=self.user, content='comment')
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['comments'][0]['content'], 'comment')
+
+
+class ReactionToggleTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alice', 'alice@example.com', 'password')
+        cls.snippet = CodeSnippet.objects.create(title='snippet', description='description', author=cls.user)
+        cls.blog = Blog.objects.create(title='blog', content='content', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.client = api_client(self.user)
+
+    def react(self, kind):
+        response = self.client.post(f'/api/snippets/{self.snippet.pk}/{kind}/')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_like_twice_removes_the_like(self):
+        self.assertEqual(self.react('like'), {'likes_count': 1, 'dislikes_count': 0, 'user_reaction': 'like'})
+        self.assertEqual(self.react('like'), {'likes_count': 0, 'dislikes_count': 0, 'user_reaction': None})
+        self.assertFalse(Reaction.objects.exists())
+
+    def test_dislike_replaces_like(self):
+        self.react('like')
+        self.assertEqual(self.react('dislike'), {'likes_count': 0, 'dislikes_count': 1, 'user_reaction': 'dislike'})
+        self.assertEqual(Reaction.objects.get().kind, 'dislike')
+
+        self.snippet.refresh_from_db()
+        self.assertEqual((self.snippet.likes_count, self.snippet.dislikes_count), (0, 1))
+
+    def test_toggle_applies_to_row_stored_by_concurrent_request(self):
+        content_type = ContentType.objects.get_for_model(CodeSnippet)
+        Reaction.objects.create(user=self.user, content_type=content_type, object_id=self.snippet.pk, kind='dislike')
+        CodeSnippet.objects.filter(pk=self.snippet.pk).update(dislikes_count=1)
+        first = QuerySet.first
+        reads = []
+
+        def first_read_misses(queryset):
+            # The first read happens before the concurrent insert commits.
+            if queryset.model is Reaction and not reads:
+                reads.append(queryset)
+                return None
+            return first(queryset)
+
+        with mock.patch.object(QuerySet, 'first', autospec=True, side_effect=first_read_misses):
+            data = self.react('like')
+
+        self.assertEqual(data, {'likes_count': 1, 'dislikes_count': 0, 'user_reaction': 'like'})
+        self.assertEqual(Reaction.objects.get().kind, 'like')
+
+    def test_deleting_user_decrements_counters(self):
+        other = User.objects.create_user('bob', 'bob@example.com', 'password')
+        self.react('dislike')
+        self.client.post(f'/api/blogs/{self.blog.pk}/like/')
+        api_client(other).post(f'/api/snippets/{self.snippet.pk}/dislike/')
+        api_client(other).post(f'/api/blogs/{self.blog.pk}/like/')
+
+        other.delete()
+
+        self.snippet.refresh_from_db()
+        self.blog.refresh_from_db()
+        self.assertEqual((self.snippet.likes_count, self.snippet.dislikes_count), (0, 1))
+        self.assertEqual(self.blog.likes_count, 1)
+        self.assertEqual(Reaction.objects.count(), 2)
+
+    def test_blog_like_toggles(self):
+        url = f'/api/blogs/{self.blog.pk}/like/'
+        self.assertEqual(self.client.post(url).data, {'likes_count': 1, 'user_has_liked': True})
+        self.assertEqual(self.client.post(url).data, {'likes_count': 0, 'user_has_liked': False})
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alice', 'alice@example.com', 'password')
+        cls.category = Category.objects.create(name='General', slug='general')
+
+    def setUp(self):
+        cache.clear()
+
+    def create_discussion(self, title, content):
+        return Discussion.objects.create(title=title, content=content, author=self.user, category=self.category)
+
+    def search(self, client=None, **params):
+        response = (client or APIClient()).get('/api/search/', params)
+        self.assertEqual(response.status_code, 200)
+        return [(hit['type'], hit['id']) for hit in response.data['results']]
+
+    def test_title_matches_rank_first(self):
+        in_body = self.create_discussion('Deploying apps', 'Notes about django and gunicorn')
+        in_title = self.create_discussion('Django migrations', 'Notes about schema changes')
+        self.create_discussion('Unrelated', 'Nothing to see')
+
+        self.assertEqual(self.search(q='django'), [('discussion', in_title.pk), ('discussion', in_body.pk)])
+
+    def test_more_matched_terms_rank_first(self):
+        one = self.create_discussion('Django tips', 'Django Django Django')
+        both = self.create_discussion('Testing', 'Testing django views')
+
+        self.assertEqual(self.search(q='django views'), [('discussion', both.pk), ('discussion', one.pk)])
+
+    def test_index_follows_saves_and_deletes(self):
+        discussion = self.create_discussion('Celery queues', 'Background work')
+        self.assertEqual(self.search(q='celery'), [('discussion', discussion.pk)])
+
+        discussion.title = 'Task queues'
+        discussion.save()
+        self.assertEqual(self.search(q='celery'), [])
+        self.assertEqual(self.search(q='task'), [('discussion', discussion.pk)])
+
+        discussion.delete()
+        self.assertEqual(self.search(q='task'), [])
+        self.assertFalse(SearchDocument.objects.exists())
+
+    def test_anonymous_users_only_see_public_types(self):
+        blog = Blog.objects.create(title='Django blog', content='content', author=self.user)
+        discussion = self.create_discussion('Django forum', 'content')
+
+        self.assertEqual(self.search(q='django'), [('discussion', discussion.pk)])
+        self.assertEqual(
+            set(self.search(api_client(self.user), q='django')),
+            {('discussion', discussion.pk), ('blog', blog.pk)},
+        )
+
+    def test_rebuild_search_index(self):
+        discussion = self.create_discussion('Redis caching', 'content')
+        comment = Comment.objects.create(discussion=discussion, author=self.user, content='Try redis streams')
+        SearchDocument.objects.all().delete()
+        # Changed without signals; only a rebuild picks this up.
+        Discussion.objects.filter(pk=discussion.pk).update(title='Memcached caching')
+
+        call_command('rebuild_search_index', batch_size=1, stdout=StringIO())
+
+        # Comments are indexed under their discussion's title.
+        self.assertEqual(
+            set(self.search(api_client(self.user), q='memcached')),
+            {('discussion', discussion.pk), ('comment', comment.pk)},
+        )
+        self.assertEqual(self.search(api_client(self.user), q='redis'), [('comment', comment.pk)])
+
+    def test_missing_query(self):
+        self.assertEqual(APIClient().get('/api/search/').status_code, 400)
+
+
+class ImageVariantTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alice', 'alice@example.com', 'password')
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        media = override_settings(MEDIA_ROOT=media_root, IMAGE_VARIANT_WIDTHS=[16])
+        media.enable()
+        self.addCleanup(media.disable)
+
+    def create_blog(self, name, image_format):
+        buffer = BytesIO()
+        Image.new('RGB', (32, 24), 'red').save(buffer, format=image_format)
+        return Blog.objects.create(
+            title=name, content='content', author=self.user,
+            image=SimpleUploadedFile(name, buffer.getvalue()),
+        )
+
+    def test_same_stem_on_two_blogs_keeps_both_variants(self):
+        first = self.create_blog('photo.png', 'PNG')
+        second = self.create_blog('photo.jpg', 'JPEG')
+
+        first_variants = generate_variants(first.pk)
+        second_variants = generate_variants(second.pk)
+
+        self.assertNotEqual(first_variants['16']['webp'], second_variants['16']['webp'])
+        for entry in (*first_variants.values(), *second_variants.values()):
+            for name in entry.values():
+                self.assertTrue(default_storage.exists(name))
+
+    def test_regenerating_replaces_own_variants(self):
+        blog = self.create_blog('photo.png', 'PNG')
+        old = generate_variants(blog.pk)['16']['webp']
+        new = generate_variants(blog.pk)['16']['webp']
+
+        # The old files are deleted first, so the name is free again.
+        self.assertEqual(old, new)
+        self.assertTrue(default_storage.exists(new))
+
+
+class MediaServingTests(TestCase):
+    content = bytes(range(256)) * 4
+
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        media = override_settings(MEDIA_ROOT=media_root, MEDIA_SENDFILE_BACKEND='')
+        media.enable()
+        self.addCleanup(media.disable)
+        with open(os.path.join(media_root, 'file.bin'), 'wb') as handle:
+            handle.write(self.content)
+
+    def get(self, **headers):
+        return self.client.get('/blog_images/file.bin', **headers)
+
+    def test_full_file(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Cache-Control'], 'public, no-cache')
+
+    def test_byte_ranges(self):
+        cases = {
+            'bytes=0-9': (0, 9),
+            'bytes=1000-': (1000, 1023),
+            'bytes=-24': (1000, 1023),
+            'bytes=1020-5000': (1020, 1023),
+        }
+        for header, (start, end) in cases.items():
+            with self.subTest(header):
+                response = self.get(HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(b''.join(response.streaming_content), self.content[start:end + 1])
+                self.assertEqual(response['Content-Range'], f'bytes {start}-{end}/1024')
+                self.assertEqual(response['Content-Length'], str(end - start + 1))
+
+    def test_unsatisfiable_range(self):
+        for header in ('bytes=1024-', 'bytes=10-5', 'bytes=-0'):
+            with self.subTest(header):
+                response = self.get(HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 416)
+                self.assertEqual(response['Content-Range'], 'bytes */1024')
+
+    def test_unsupported_ranges_get_the_whole_file(self):
+        for header in ('bytes=0-1,5-6', 'items=0-1', 'bytes=-'):
+            with self.subTest(header):
+                self.assertEqual(self.get(HTTP_RANGE=header).status_code, 200)
+
+    def test_if_range(self):
+        etag = self.get()['ETag']
+        self.assertEqual(self.get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE=etag).status_code, 206)
+        self.assertEqual(self.get(HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"').status_code, 200)
+
+    def test_revalidation(self):
+        etag = self.get()['ETag']
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_versioned_urls_are_immutable(self):
+        version = hashlib.sha256(self.content).hexdigest()[:16]
+        response = self.client.get('/blog_images/file.bin', {'v': version})
+        self.assertIn('immutable', response['Cache-Control'])
+        response = self.client.get('/blog_images/file.bin', {'v': 'outdated'})
+        self.assertEqual(response['Cache-Control'], 'public, no-cache')
+
+    def test_sendfile_offload(self):
+        with override_settings(MEDIA_SENDFILE_BACKEND='xaccel', MEDIA_ACCEL_REDIRECT_PREFIX='/protected/'):
+            response = self.get()
+        self.assertEqual(response['X-Accel-Redirect'], '/protected/file.bin')
+        self.assertEqual(response.content, b'')
+
+    def test_paths_outside_media_root(self):
+        self.assertEqual(self.client.get('/blog_images/%2E%2E/%2E%2E/etc/hostname').status_code, 404)
+        self.assertEqual(self.client.get('/blog_images/missing.bin').status_code, 404)
+
+
+class UserListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('Admin', 'root@example.com', 'password')
+        User.objects.create_user('adam', 'adam@example.com', 'password')
+        User.objects.create_user('bob', 'Admiral@example.com', 'password', is_active=False)
+        User.objects.create_user('carol', 'carol@example.com', 'password')
+
+    def setUp(self):
+        cache.clear()
+        self.client = api_client(self.admin)
+
+    def usernames(self, **params):
+        response = self.client.get('/api/admin/users/', params)
+        self.assertEqual(response.status_code, 200)
+        return sorted(user['username'] for user in response.data['results'])
+
+    def test_prefix_search_ignores_case(self):
+        self.assertEqual(self.usernames(q='ADM'), ['Admin', 'bob'])
+        self.assertEqual(self.usernames(q='ad'), ['Admin', 'adam', 'bob'])
+
+    def test_filters_combine_with_search(self):
+        self.assertEqual(self.usernames(q='ad', is_active='true'), ['Admin', 'adam'])
+        self.assertEqual(self.usernames(role='admin'), ['Admin'])
+
+    def test_pages_and_role_counts(self):
+        first = self.client.get('/api/admin/users/', {'sort': 'oldest', 'page_size': 2}).data
+        second = self.client.get(first['next']).data
+
+        self.assertEqual([user['username'] for user in first['results'] + second['results']],
+                         ['Admin', 'adam', 'bob', 'carol'])
+        self.assertEqual(first['role_counts']['total'], 4)
+        self.assertEqual(first['role_counts']['active'], 3)
+        self.assertNotIn('role_counts', second)
+
+    def test_requires_admin(self):
+        user = User.objects.get(username='carol')
+        self.assertEqual(api_client(user).get('/api/admin/users/').status_code, 403)
+
+
+class BulkCreateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        cls.user = User.objects.create_user('alice', 'alice@example.com', 'password')
+        cls.language = ProgrammingLanguage.objects.create(name='Python', slug='python', code='py')
+
+    def setUp(self):
+        cache.clear()
+        self.client = api_client(self.admin)
+
+    def snippet(self, number):
+        return {
+            'title': f'snippet {number}', 'description': 'imported',
+            'codes': [{'language_id': self.language.pk, 'code': f'print({number})'}],
+        }
+
+    def test_snippets_report_invalid_items_by_position(self):
+        items = [self.snippet(0), {'title': 'no codes'}, self.snippet(1)]
+        response = self.client.post('/api/snippets/bulk/', items, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual([error['index'] for error in response.data['errors']], [1])
+        self.assertEqual(Code.objects.filter(snippet_id__in=response.data['ids']).count(), 2)
+        self.assertEqual(SearchDocument.objects.filter(kind__in=['snippet', 'code']).count(), 4)
+
+    def test_blogs_from_ndjson_share_tags(self):
+        lines = [json.dumps({'title': f'blog {number}', 'content': 'imported', 'tags': ['Django', 'orm']})
+                 for number in range(3)]
+        response = self.client.post('/api/blogs/bulk/', '\n'.join(lines) + '\n',
+                                    content_type='application/x-ndjson')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 3)
+        self.assertEqual(Tag.objects.count(), 2)
+        self.assertEqual(Tag.objects.get(slug='django').blog_count, 3)
+        self.assertEqual(SearchDocument.objects.filter(kind='blog').count(), 3)
+
+    def test_rows_are_indexed_once_without_multi_row_ids(self):
+        # The MySQL path: parents are saved one by one, indexed in one pass.
+        features = type(connection.features)
+        with mock.patch.object(features, 'can_return_rows_from_bulk_insert', False), \
+                mock.patch('api.bulk.index_objects', wraps=index_objects) as index, \
+                mock.patch('api.signals.index_object') as index_one:
+            response = self.client.post('/api/snippets/bulk/', [self.snippet(0), self.snippet(1)], format='json')
+
+        self.assertEqual(response.status_code, 201)
+        index.assert_called_once()
+        index_one.assert_not_called()
+        self.assertEqual(SearchDocument.objects.filter(kind__in=['snippet', 'code']).count(), 4)
+        self.assertEqual(Code.objects.filter(snippet_id__in=response.data['ids']).count(), 2)
+
+    def test_requires_admin(self):
+        response = api_client(self.user).post('/api/snippets/bulk/', [self.snippet(0)], format='json')
+        self.assertEqual(response.status_code, 403)
+
+    def test_rejects_non_list(self):
+        response = self.client.post('/api/blogs/bulk/', {'title': 'blog'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class HyperLogLogTests(TestCase):
+    def test_estimate_is_close(self):
+        sketch = HyperLogLog()
+        for number in range(5000):
+            sketch.add(f'viewer-{number}')
+        self.assertAlmostEqual(sketch.count(), 5000, delta=5000 * 0.05)
+
+    def test_repeated_viewers_count_once(self):
+        sketch = HyperLogLog()
+        for _ in range(3):
+            for number in range(100):
+                sketch.add(f'viewer-{number}')
+        self.assertAlmostEqual(sketch.count(), 100, delta=3)
+
+    def test_merge_counts_the_union(self):
+        first, second = HyperLogLog(), HyperLogLog()
+        for number in range(0, 600):
+            first.add(f'viewer-{number}')
+        for number in range(400, 1000):
+            second.add(f'viewer-{number}')
+        first.merge(HyperLogLog(registers=second.to_bytes()))
+        self.assertAlmostEqual(first.count(), 1000, delta=1000 * 0.05)
+
+
+class ViewCountingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alice', 'alice@example.com', 'password')
+        category = Category.objects.create(name='General', slug='general')
+        cls.discussion = Discussion.objects.create(
+            title='title', content='content', author=cls.user, category=category,
+        )
+
+    def counters(self):
+        self.discussion.refresh_from_db()
+        return self.discussion.views, self.discussion.unique_views
+
+    def test_views_are_buffered_until_flushed(self):
+        counter = ViewCounter(flush_interval=3600, flush_threshold=100)
+        for viewer in ('user:1', 'user:2', 'user:1'):
+            counter.record(self.discussion.pk, viewer)
+        self.assertEqual(self.counters(), (0, 0))
+
+        counter.flush()
+        self.assertEqual(self.counters(), (3, 2))
+
+    def test_flushes_merge_with_stored_sketch(self):
+        counter = ViewCounter(flush_interval=3600, flush_threshold=2)
+        for viewer in ('user:1', 'user:2', 'user:2', 'user:3'):
+            counter.record(self.discussion.pk, viewer)
+        # The threshold flushed both pairs.
+        self.assertEqual(self.counters(), (4, 3))
+
+    def test_spooled_views_are_merged_by_command(self):
+        spool_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, spool_dir)
+        for worker in ('user:1', 'user:2'):
+            counter = ViewCounter(flush_interval=3600, flush_threshold=100, spool_dir=spool_dir)
+            counter.record(self.discussion.pk, worker)
+            counter.record(self.discussion.pk, 'user:3')
+            counter.flush()
+        self.assertEqual(self.counters(), (0, 0))
+
+        call_command('merge_view_counts', spool_dir=spool_dir, stdout=StringIO())
+        self.assertEqual(self.counters(), (4, 3))
+        self.assertEqual(os.listdir(spool_dir), [])
+
+    def test_counters_are_read_only(self):
+        response = api_client(self.user).patch(f'/api/discussions/{self.discussion.pk}/', {
+            'title': 'renamed', 'views': 1000, 'unique_views': 1000,
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.discussion.refresh_from_db()
+        self.assertEqual(self.discussion.title, 'renamed')
+        self.assertEqual(self.counters(), (0, 0))
+
+
+class ResponseCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alice', 'alice@example.com', 'password')
+        Tag.objects.create(name='django', slug='django')
+
+    def setUp(self):
+        cache.clear()
+        self.client = api_client(self.user)
+
+    def tag_names(self, response):
+        return sorted(tag['name'] for tag in response.data)
+
+    def test_second_request_is_served_from_cache(self):
+        self.assertEqual(self.client.get('/api/tags/')['X-Cache'], 'MISS')
+        self.assertEqual(self.client.get('/api/tags/')['X-Cache'], 'HIT')
+
+    def test_write_invalidates_namespace(self):
+        self.client.get('/api/tags/')
+        Tag.objects.create(name='orm', slug='orm')
+
+        response = self.client.get('/api/tags/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(self.tag_names(response), ['django', 'orm'])
+
+    def test_evicted_generation_does_not_revive_old_entries(self):
+        self.client.get('/api/tags/')
+        Tag.objects.create(name='orm', slug='orm')
+        cache.delete('respcache:gen:tags')
+
+        response = self.client.get('/api/tags/')
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(self.tag_names(response), ['django', 'orm'])
+
+    def test_evicted_user_version_does_not_revive_old_user(self):
+        self.assertEqual(self.client.get('/api/tags/').status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        cache.delete(f'jwt-user:version:{self.user.pk}')
+
+        self.assertEqual(self.client.get('/api/tags/').status_code, 401)
+
+
+class TagStatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alice', 'alice@example.com', 'password')
+
+    def setUp(self):
+        cache.clear()
+        self.client = api_client(self.user)
+
+    def create_blog(self, title, tags):
+        response = self.client.post('/api/blogs/', {'title': title, 'content': 'content', 'tags': tags}, format='json')
+        self.assertEqual(response.status_code, 201)
+        return Blog.objects.get(title=title)
+
+    def blog_counts(self):
+        return dict(Tag.objects.values_list('slug', 'blog_count'))
+
+    def test_counts_follow_link_changes(self):
+        first = self.create_blog('first', ['Django', 'ORM'])
+        second = self.create_blog('second', ['django'])
+        self.assertEqual(self.blog_counts(), {'django': 2, 'orm': 1})
+        self.assertEqual(Tag.objects.get(slug='django').last_used_at, second.created_at)
+
+        first.tags.remove(Tag.objects.get(slug='orm'))
+        self.assertEqual(self.blog_counts(), {'django': 2, 'orm': 0})
+
+        second.delete()
+        self.assertEqual(self.blog_counts(), {'django': 1, 'orm': 0})
+
+        first.tags.clear()
+        self.assertEqual(self.blog_counts(), {'django': 0, 'orm': 0})
+        self.assertIsNone(Tag.objects.get(slug='django').last_used_at)
+
+    def test_blogs_filter_by_tag(self):
+        self.create_blog('first', ['django', 'orm'])
+        self.create_blog('second', ['django'])
+        self.create_blog('third', ['python'])
+
+        response = self.client.get('/api/blogs/', {'tag': 'django'})
+        self.assertEqual([blog['title'] for blog in response.data['results']], ['second', 'first'])
+
+    def test_popular_sort_and_reconcile(self):
+        self.create_blog('first', ['django', 'orm'])
+        self.create_blog('second', ['django'])
+        Tag.objects.update(blog_count=0)
+
+        call_command('reconcile_tag_stats', batch_size=1, stdout=StringIO())
+
+        response = self.client.get('/api/tags/', {'sort': 'popular'})
+        self.assertEqual([(tag['slug'], tag['blog_count']) for tag in response.data], [('django', 2), ('orm', 1)])
+
+
+class ReconcileReactionCountsTests(TestCase):
+    def test_recounts_from_reaction_rows(self):
+        user = User.objects.create_user('alice', 'alice@example.com', 'password')
+        snippets = [
+            CodeSnippet.objects.create(title=f'snippet {number}', description='description', author=user)
+            for number in range(3)
+        ]
+        content_type = ContentType.objects.get_for_model(CodeSnippet)
+        Reaction.objects.create(user=user, content_type=content_type, object_id=snippets[0].pk, kind='like')
+        Reaction.objects.create(user=user, content_type=content_type, object_id=snippets[2].pk, kind='dislike')
+        CodeSnippet.objects.update(likes_count=5, dislikes_count=5)
+
+        call_command('reconcile_reaction_counts', batch_size=2, stdout=StringIO())
+
+        self.assertEqual(
+            list(CodeSnippet.objects.order_by('pk').values_list('likes_count', 'dislikes_count')),
+            [(1, 0), (0, 0), (0, 1)],
+        )
+
+
+class DiscussionActivityTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alice', 'alice@example.com', 'password')
+        category = Category.objects.create(name='General', slug='general')
+        cls.old, cls.new = [
+            Discussion.objects.create(title=title, content='content', author=cls.user, category=category)
+            for title in ('old', 'new')
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client = api_client(self.user)
+
+    def titles(self, **params):
+        return [item['title'] for item in self.client.get('/api/discussions/', params).data['results']]
+
+    def test_comment_moves_discussion_up_in_active_order(self):
+        self.assertEqual(self.titles(sort='active'), ['new', 'old'])
+        comment = Comment.objects.create(discussion=self.old, author=self.user, content='comment')
+
+        self.old.refresh_from_db()
+        self.assertEqual((self.old.comment_count, self.old.last_activity_at), (1, comment.created_at))
+        self.assertEqual(self.titles(sort='active'), ['old', 'new'])
+        self.assertEqual(self.titles(), ['new', 'old'])
+
+    def test_deleting_comment_recomputes_activity(self):
+        first = Comment.objects.create(discussion=self.old, author=self.user, content='first')
+        second = Comment.objects.create(discussion=self.old, author=self.user, content='second')
+
+        second.delete()
+        self.old.refresh_from_db()
+        self.assertEqual((self.old.comment_count, self.old.last_activity_at), (1, first.created_at))
+
+        first.delete()
+        self.old.refresh_from_db()
+        self.assertEqual((self.old.comment_count, self.old.last_activity_at), (0, self.old.created_at))
+
+    def test_pinned_discussions_come_first(self):
+        Discussion.objects.filter(pk=self.old.pk).update(is_pinned=True)
+        self.assertEqual(self.titles(), ['old', 'new'])
+        self.assertEqual(self.titles(sort='active'), ['old', 'new'])
+
+    def test_reconcile_repairs_counters(self):
+        comment = Comment.objects.create(discussion=self.old, author=self.user, content='comment')
+        Discussion.objects.update(comment_count=7, last_activity_at=self.old.created_at)
+
+        call_command('reconcile_discussion_activity', batch_size=1, stdout=StringIO())
+
+        self.old.refresh_from_db()
+        self.new.refresh_from_db()
+        self.assertEqual((self.old.comment_count, self.old.last_activity_at), (1, comment.created_at))
+        self.assertEqual((self.new.comment_count, self.new.last_activity_at), (0, self.new.created_at))
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+        category = Category.objects.create(name='General', slug='general')
+        cls.discussions = [
+            Discussion.objects.create(title=f'd{number}', content='content', author=cls.admin, category=category)
+            for number in range(5)
+        ]
+
+    def setUp(self):
+        self.client = api_client(self.admin)
+
+    def export(self, kind, **params):
+        response = self.client.get(f'/api/admin/export/{kind}/', params)
+        self.assertEqual(response.status_code, 200)
+        return [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+
+    def test_full_export_streams_every_row(self):
+        rows = self.export('discussions')
+        self.assertEqual([row['id'] for row in rows], [discussion.pk for discussion in self.discussions])
+        self.assertEqual(rows[0]['author_username'], 'admin')
+        self.assertEqual(rows[0]['category_slug'], 'general')
+
+    def test_since_exports_changed_rows_once_across_batches(self):
+        changed = self.discussions[1::2] + self.discussions[:1]
+        since = self.discussions[-1].updated_at
+        # Equal timestamps make the id break ties at batch boundaries.
+        Discussion.objects.filter(pk__in=[discussion.pk for discussion in changed]).update(updated_at=since)
+
+        rows = list(export_rows('discussions', since, batch_size=2))
+        expected = sorted(discussion.pk for discussion in changed + [self.discussions[-1]])
+        self.assertEqual([row['id'] for row in rows], expected)
+
+        async def collect():
+            return [row async for row in aexport_rows('discussions', since, batch_size=2)]
+        self.assertEqual(async_to_sync(collect)(), rows)
+
+    def test_endpoint_since_filter(self):
+        since = self.discussions[-1].updated_at.isoformat()
+        self.assertEqual([row['id'] for row in self.export('discussions', since=since)], [self.discussions[-1].pk])
+
+    def test_children_are_included(self):
+        language = ProgrammingLanguage.objects.create(name='Python', slug='python', code='py')
+        snippet = CodeSnippet.objects.create(title='snippet', description='description', author=self.admin)
+        Code.objects.create(snippet=snippet, language=language, code='print(1)')
+        blog = Blog.objects.create(title='blog', content='content', author=self.admin)
+        blog.tags.add(Tag.objects.create(name='django', slug='django'))
+
+        self.assertEqual([code['language_slug'] for code in self.export('snippets')[0]['codes']], ['python'])
+        self.assertEqual(self.export('blogs')[0]['tags'], ['django'])
+
+    def test_rejects_bad_requests(self):
+        self.assertEqual(self.client.get('/api/admin/export/users/').status_code, 404)
+        self.assertEqual(self.client.get('/api/admin/export/discussions/', {'since': 'yesterday'}).status_code, 400)
+        user = User.objects.create_user('alice', 'alice@example.com', 'password')
+        self.assertEqual(api_client(user).get('/api/admin/export/discussions/').status_code, 403)
+
+
+class CommentStreamTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alice', 'alice@example.com', 'password')
+        category = Category.objects.create(name='General', slug='general')
+        cls.discussion = Discussion.objects.create(
+            title='Thread', content='content', author=cls.user, category=category,
+        )
+        cls.comments = [
+            Comment.objects.create(discussion=cls.discussion, author=cls.user, content=f'c{number}')
+            for number in range(5)
+        ]
+        # The middle comments share a timestamp; the id orders them.
+        Comment.objects.filter(pk__in=[comment.pk for comment in cls.comments[1:4]])\
+            .update(created_at=cls.comments[1].created_at)
+
+    def setUp(self):
+        cache.clear()
+        self.client = api_client(self.user)
+
+    def comment_ids(self, **params):
+        ids, url = [], f'/api/discussions/{self.discussion.pk}/comments/'
+        while url:
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            ids += [comment['id'] for comment in response.data['results']]
+            url, params = response.data['next'], {}
+        return ids
+
+    def test_comments_are_oldest_first(self):
+        self.assertEqual(self.comment_ids(page_size=2), [comment.pk for comment in self.comments])
+
+    def test_after_returns_later_comments(self):
+        ids = [comment.pk for comment in self.comments]
+        for position, comment in enumerate(self.comments):
+            with self.subTest(after=comment.pk):
+                self.assertEqual(self.comment_ids(after=comment.pk, page_size=2), ids[position + 1:])
+
+    def test_after_deleted_comment(self):
+        deleted = self.comments[2].pk
+        Comment.objects.filter(pk=deleted).delete()
+        self.assertEqual(self.comment_ids(after=deleted), [comment.pk for comment in self.comments[3:]])
+
+    def test_invalid_after(self):
+        response = self.client.get(f'/api/discussions/{self.discussion.pk}/comments/', {'after': 'latest'})
+        self.assertEqual(response.status_code, 400)
+
+
+class ReactionCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user('alice', 'alice@example.com', 'password')
+        cls.bob = User.objects.create_user('bob', 'bob@example.com', 'password')
+        cls.snippets = [
+            CodeSnippet.objects.create(title=f's{number}', description='description', author=cls.alice)
+            for number in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def react(self, user, snippet, kind):
+        response = api_client(user).post(f'/api/snippets/{snippet.pk}/{kind}/')
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_toggles_keep_counters_in_step(self):
+        snippet = self.snippets[0]
+        self.assertEqual(self.react(self.alice, snippet, 'like'),
+                         {'likes_count': 1, 'dislikes_count': 0, 'user_reaction': 'like'})
+        self.assertEqual(self.react(self.bob, snippet, 'like')['likes_count'], 2)
+        self.assertEqual(self.react(self.alice, snippet, 'dislike'),
+                         {'likes_count': 1, 'dislikes_count': 1, 'user_reaction': 'dislike'})
+        self.assertEqual(self.react(self.alice, snippet, 'dislike'),
+                         {'likes_count': 1, 'dislikes_count': 0, 'user_reaction': None})
+        self.assertEqual(Reaction.objects.count(), 1)
+
+    def test_most_liked_sort(self):
+        self.react(self.alice, self.snippets[1], 'like')
+        self.react(self.bob, self.snippets[1], 'like')
+        self.react(self.alice, self.snippets[2], 'like')
+
+        response = api_client(self.alice).get('/api/snippets/', {'sort': 'most_liked'})
+        self.assertEqual(
+            [(item['id'], item['likes_count']) for item in response.data['results']],
+            [(self.snippets[1].pk, 2), (self.snippets[2].pk, 1), (self.snippets[0].pk, 0)],
+        )
+
+
+class DiscussionListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alice', 'alice@example.com', 'password')
+        category = Category.objects.create(name='General', slug='general')
+        cls.quiet = Discussion.objects.create(title='quiet', content='content', author=cls.user, category=category)
+        cls.busy = Discussion.objects.create(title='busy', content='content', author=cls.user, category=category)
+        for number in range(3):
+            Comment.objects.create(discussion=cls.busy, author=cls.user, content=f'c{number}')
+
+    def setUp(self):
+        cache.clear()
+        self.client = api_client(self.user)
+
+    def test_list_has_counts_instead_of_comments(self):
+        response = self.client.get('/api/discussions/')
+        items = {item['id']: item for item in response.data['results']}
+
+        self.assertNotIn('comments', items[self.busy.pk])
+        self.assertEqual(items[self.busy.pk]['comment_count'], 3)
+        self.assertEqual(
+            items[self.busy.pk]['last_comment_at'],
+            self.busy.comments.latest('created_at').created_at.isoformat().replace('+00:00', 'Z'),
+        )
+        self.assertEqual(items[self.quiet.pk]['comment_count'], 0)
+        self.assertIsNone(items[self.quiet.pk]['last_comment_at'])
+        self.assertEqual(set(items[self.busy.pk]['author']), {'id', 'username'})
+
+    def test_list_queries_do_not_grow_with_comments(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/discussions/')
+        for number in range(5):
+            Comment.objects.create(discussion=self.quiet, author=self.user, content=f'more {number}')
+        cache.clear()
+        with self.assertNumQueries(len(queries)):
+            self.client.get('/api/discussions/')
+
+    def test_detail_keeps_the_comments(self):
+        response = self.client.get(f'/api/discussions/{self.busy.pk}/')
+        self.assertEqual(len(response.data['comments']), 3)
+
+
+class UserReactionContextTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user('alice', 'alice@example.com', 'password')
+        cls.bob = User.objects.create_user('bob', 'bob@example.com', 'password')
+        cls.blogs = [
+            Blog.objects.create(title=f'b{number}', content='content', author=cls.alice)
+            for number in range(3)
+        ]
+        cls.snippets = [
+            CodeSnippet.objects.create(title=f's{number}', description='description', author=cls.alice)
+            for number in range(3)
+        ]
+        toggle_reaction(cls.alice, cls.blogs[0], Reaction.LIKE)
+        toggle_reaction(cls.alice, cls.snippets[1], Reaction.DISLIKE)
+        toggle_reaction(cls.bob, cls.snippets[2], Reaction.LIKE)
+
+    def setUp(self):
+        cache.clear()
+
+    def results(self, user, url, field):
+        response = api_client(user).get(url)
+        self.assertEqual(response.status_code, 200)
+        results = response.data['results'] if 'results' in response.data else [response.data]
+        return {item['id']: item[field] for item in results}
+
+    def test_lists_show_the_requesting_users_reactions(self):
+        self.assertEqual(self.results(self.alice, '/api/snippets/', 'user_reaction'), {
+            self.snippets[0].pk: None, self.snippets[1].pk: 'dislike', self.snippets[2].pk: None,
+        })
+        self.assertEqual(self.results(self.bob, '/api/snippets/', 'user_reaction'), {
+            self.snippets[0].pk: None, self.snippets[1].pk: None, self.snippets[2].pk: 'like',
+        })
+        self.assertEqual(self.results(self.alice, '/api/blogs/', 'user_has_liked'), {
+            self.blogs[0].pk: True, self.blogs[1].pk: False, self.blogs[2].pk: False,
+        })
+
+    def test_detail_shows_the_reaction(self):
+        self.assertEqual(
+            self.results(self.alice, f'/api/blogs/{self.blogs[0].pk}/', 'user_has_liked'),
+            {self.blogs[0].pk: True},
+        )
+
+    def test_reactions_are_loaded_with_one_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            api_client(self.alice).get('/api/snippets/')
+        self.assertEqual(len([query for query in queries if 'api_reaction' in query['sql']]), 1)
+
+
+@override_settings(SQL_INSTRUMENTATION=True, SQL_NPLUSONE_THRESHOLD=3, SQL_SLOW_QUERY_MS=10_000)
+class QueryInstrumentationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alice', 'alice@example.com', 'password')
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(self.uninstall)
+
+    def uninstall(self):
+        # The middleware connects itself for the rest of the process.
+        connection_created.disconnect(instrumentation.install)
+        if instrumentation.record_queries in connection.execute_wrappers:
+            connection.execute_wrappers.remove(instrumentation.record_queries)
+
+    def test_server_timing_and_summary(self):
+        with self.assertLogs('api.instrumentation', 'INFO') as logs:
+            response = api_client(self.user).get('/api/news/')
+
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries", app;dur=[\d.]+$')
+        summary = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(summary['event'], 'request')
+        self.assertEqual(summary['path'], '/api/news/')
+        self.assertGreater(summary['queries'], 0)
+
+    def test_repeated_statements_are_flagged(self):
+        recorder = instrumentation.QueryRecorder()
+        for ids in ('(%s, %s)', '(%s, %s, %s)', '(%s,%s,%s,%s)'):
+            recorder.record(f'SELECT * FROM t WHERE id IN {ids}', 0.001, 'default')
+        recorder.record('SELECT 1', 0.001, 'default')
+
+        self.assertEqual(recorder.repeated(), [
+            {'sql': 'SELECT * FROM t WHERE id IN (...)', 'count': 3, 'fields': []},
+        ])
+
+
+class CachedJWTUserTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('alice', 'alice@example.com', 'password')
+
+    def setUp(self):
+        cache.clear()
+        self.client = api_client(self.user)
+
+    def user_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get('/api/news/').status_code, 200)
+        return [query for query in queries if 'auth_user' in query['sql']]
+
+    def test_user_is_loaded_once(self):
+        self.assertEqual(len(self.user_queries()), 1)
+        self.assertEqual(self.user_queries(), [])
+
+    def test_saving_the_user_reloads_it(self):
+        self.user_queries()
+        self.user.first_name = 'Alice'
+        self.user.save()
+        self.assertEqual(len(self.user_queries()), 1)
+
+    def test_deactivated_user_is_rejected(self):
+        self.user_queries()
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/news/').status_code, 401)
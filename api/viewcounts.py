@@ -0,0 +1,248 @@
+"""
+Buffered discussion view counting.
+
+Discussion detail requests record a hit in a per-process buffer instead of
+writing to the discussion row. The buffer is flushed every
+``DISCUSSION_VIEW_FLUSH_INTERVAL`` seconds or after
+``DISCUSSION_VIEW_FLUSH_THRESHOLD`` hits. A flush either applies the counts
+with one batched UPDATE, or writes a spool file to
+``DISCUSSION_VIEW_SPOOL_DIR`` for the ``merge_view_counts`` command to apply.
+
+Distinct viewers are estimated with a HyperLogLog sketch per discussion. The
+sketch uses a fixed 2 KiB whatever the traffic, and merging two sketches is a
+register-wise max, so worker buffers combine without double counting.
+"""
+import atexit
+import base64
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+
+from .models import Discussion, DiscussionViewerSketch
+
+logger = logging.getLogger(__name__)
+
+
+class HyperLogLog:
+    """HyperLogLog cardinality sketch with one byte per register."""
+
+    def __init__(self, precision=11, registers=None):
+        self.precision = precision
+        self.size = 1 << precision
+        if registers is None:
+            self.registers = bytearray(self.size)
+        else:
+            self.registers = bytearray(registers)
+            if len(self.registers) != self.size:
+                raise ValueError(
+                    f'Expected {self.size} registers, got {len(self.registers)}'
+                )
+
+    def add(self, value):
+        digest = hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest()
+        hashed = int.from_bytes(digest, 'big')
+        width = 64 - self.precision
+        index = hashed >> width
+        remainder = hashed & ((1 << width) - 1)
+        rank = width - remainder.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        if other.size != self.size:
+            raise ValueError('Cannot merge sketches of different precision')
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def count(self):
+        size = self.size
+        alpha = 0.7213 / (1 + 1.079 / size)
+        estimate = alpha * size * size / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        # Linear counting is far more accurate while most registers are empty.
+        if estimate <= 2.5 * size and zeros:
+            estimate = size * math.log(size / zeros)
+        return int(round(estimate))
+
+    def to_bytes(self):
+        return bytes(self.registers)
+
+
+def viewer_key(request):
+    """Identify a viewer: the user id when logged in, else client IP + agent."""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return f'user:{user.pk}'
+
+    forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+    address = forwarded.split(',')[0].strip() or request.META.get('REMOTE_ADDR', '')
+    agent = request.META.get('HTTP_USER_AGENT', '')
+    return f'anon:{address}:{agent}'
+
+
+def apply_view_counts(hits, sketches):
+    """
+    Add ``hits`` (discussion id -> views) to the stored counters and fold
+    ``sketches`` (discussion id -> HyperLogLog) into the stored sketches.
+    """
+    if not hits and not sketches:
+        return
+
+    with transaction.atomic():
+        if hits:
+            Discussion.objects.filter(pk__in=hits).update(views=F('views') + Case(
+                *[When(pk=pk, then=Value(count)) for pk, count in hits.items()],
+                default=Value(0),
+                output_field=IntegerField(),
+            ))
+
+        if not sketches:
+            return
+
+        live_ids = set(
+            Discussion.objects.filter(pk__in=sketches).values_list('pk', flat=True)
+        )
+        stored = {
+            row.discussion_id: row
+            for row in DiscussionViewerSketch.objects
+                .select_for_update()
+                .filter(discussion_id__in=live_ids)
+        }
+
+        to_create, to_update, estimates = [], [], {}
+        for pk, sketch in sketches.items():
+            if pk not in live_ids:
+                continue
+            row = stored.get(pk)
+            if row is not None:
+                sketch.merge(HyperLogLog(sketch.precision, bytes(row.registers)))
+                row.registers = sketch.to_bytes()
+                to_update.append(row)
+            else:
+                to_create.append(DiscussionViewerSketch(
+                    discussion_id=pk, registers=sketch.to_bytes()
+                ))
+            estimates[pk] = sketch.count()
+
+        if to_update:
+            DiscussionViewerSketch.objects.bulk_update(to_update, ['registers'])
+        if to_create:
+            DiscussionViewerSketch.objects.bulk_create(to_create)
+        if estimates:
+            Discussion.objects.filter(pk__in=estimates).update(unique_views=Case(
+                *[When(pk=pk, then=Value(count)) for pk, count in estimates.items()],
+                default=F('unique_views'),
+                output_field=IntegerField(),
+            ))
+
+
+def write_spool(spool_dir, hits, sketches):
+    """Write a buffer snapshot atomically so a reader never sees half a file."""
+    os.makedirs(spool_dir, exist_ok=True)
+    name = f'views-{os.getpid()}-{uuid.uuid4().hex}.json'
+    payload = {
+        'hits': {str(pk): count for pk, count in hits.items()},
+        'sketches': {
+            str(pk): base64.b64encode(sketch.to_bytes()).decode('ascii')
+            for pk, sketch in sketches.items()
+        },
+    }
+    temp_path = os.path.join(spool_dir, f'.{name}.tmp')
+    with open(temp_path, 'w') as handle:
+        json.dump(payload, handle)
+    os.replace(temp_path, os.path.join(spool_dir, name))
+
+
+def read_spool(path, hits, sketches):
+    """Merge the spool file at ``path`` into the ``hits``/``sketches`` maps."""
+    with open(path) as handle:
+        payload = json.load(handle)
+
+    for pk, count in payload.get('hits', {}).items():
+        hits[int(pk)] = hits.get(int(pk), 0) + count
+    for pk, encoded in payload.get('sketches', {}).items():
+        registers = base64.b64decode(encoded)
+        sketch = HyperLogLog(precision=len(registers).bit_length() - 1, registers=registers)
+        if int(pk) in sketches:
+            sketches[int(pk)].merge(sketch)
+        else:
+            sketches[int(pk)] = sketch
+
+
+class ViewCounter:
+    """Thread-safe, per-process buffer of discussion views."""
+
+    def __init__(self, flush_interval=30, flush_threshold=200, spool_dir=''):
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self.spool_dir = spool_dir
+        self._lock = threading.Lock()
+        self._hits = {}
+        self._sketches = {}
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            flush_interval=getattr(settings, 'DISCUSSION_VIEW_FLUSH_INTERVAL', 30),
+            flush_threshold=getattr(settings, 'DISCUSSION_VIEW_FLUSH_THRESHOLD', 200),
+            spool_dir=getattr(settings, 'DISCUSSION_VIEW_SPOOL_DIR', ''),
+        )
+
+    def record(self, discussion_id, viewer):
+        with self._lock:
+            self._hits[discussion_id] = self._hits.get(discussion_id, 0) + 1
+            sketch = self._sketches.get(discussion_id)
+            if sketch is None:
+                sketch = self._sketches[discussion_id] = HyperLogLog()
+            sketch.add(viewer)
+            self._pending += 1
+            due = (
+                self._pending >= self.flush_threshold
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            hits, sketches = self._hits, self._sketches
+            self._hits, self._sketches = {}, {}
+            self._pending = 0
+            self._last_flush = time.monotonic()
+
+        if not hits:
+            return
+
+        try:
+            if self.spool_dir:
+                write_spool(self.spool_dir, hits, sketches)
+            else:
+                apply_view_counts(hits, sketches)
+        except Exception:
+            logger.exception('Failed to flush discussion view counts, keeping them buffered')
+            self._restore(hits, sketches)
+
+    def _restore(self, hits, sketches):
+        with self._lock:
+            for pk, count in hits.items():
+                self._hits[pk] = self._hits.get(pk, 0) + count
+                self._pending += count
+            for pk, sketch in sketches.items():
+                if pk in self._sketches:
+                    self._sketches[pk].merge(sketch)
+                else:
+                    self._sketches[pk] = sketch
+
+
+view_counter = ViewCounter.from_settings()
+atexit.register(view_counter.flush)
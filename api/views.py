@@ -5,11 +5,29 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate, get_user_model
-from .models import Category, Discussion, Comment, News, ProgrammingLanguage, CodeSnippet, Code, Tag, Blog
-from .serializers import CategorySerializer, DiscussionSerializer, CommentSerializer, UserSerializer, DiscussionCreateSerializer, CommentCreateSerializer, NewsSerializer, ProgrammingLanguageSerializer, CodeSnippetSerializer, CodeSnippetCreateSerializer, TagSerializer, BlogSerializer, BlogCreateSerializer, UserCreateSerializer, GroupSerializer
+from .models import Category, Discussion, Comment, News, ProgrammingLanguage, CodeSnippet, Code, Tag, Blog, Reaction
+from .serializers import CategorySerializer, DiscussionSerializer, DiscussionListSerializer, CommentSerializer, UserSerializer, DiscussionCreateSerializer, CommentCreateSerializer, NewsSerializer, ProgrammingLanguageSerializer, CodeSnippetSerializer, CodeSnippetCreateSerializer, TagSerializer, BlogSerializer, BlogCreateSerializer, UserCreateSerializer, GroupSerializer, ReactionSyncSerializer
+from rest_framework.parsers import JSONParser
+from django.db import DataError, IntegrityError, transaction
+from django.core.exceptions import ImproperlyConfigured
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 import logging
-from rest_framework.pagination import PageNumberPagination
-from django.db.models import Count
+import os
+from .bulk import create_blogs, create_snippets
+from .cache import CachedListMixin, stats as response_cache_stats
+from .conditional import ConditionalGetMixin
+from .db.pool import pool_stats
+from .export import EXPORTS, aexport_lines, export_lines
+from .images import schedule_variants
+from .parsers import NDJSONParser
+from .pagination import KeysetPagination, DiscussionPagination, CommentPagination, SearchPagination, UserPagination
+from .reactions import REACTION_TARGETS, sync_reactions, toggle_reaction, user_reactions
+from .search import PUBLIC_SEARCH_TYPES, SEARCH_SOURCES, load_documents, make_snippet, search
+from .viewcounts import view_counter, viewer_key
+from django.db.models import Count, Max, Prefetch, Q
 from django.contrib.auth.models import Group
 
 logger = logging.getLogger(__name__)
@@ -18,48 +36,132 @@ User = get_user_model()
 
 # Create your views here.
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(CachedListMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [IsAdminUser]  # Only admin users can manage categories
+    cache_namespace = 'categories'
     
     def get_queryset(self):
         # Add ordering to make the list consistent
         return Category.objects.all().order_by('name')
 
-class DiscussionPagination(PageNumberPagination):
-    page_size = 20
-    page_size_query_param = 'page_size'
-    max_page_size = 100
-
-class DiscussionViewSet(viewsets.ModelViewSet):
+class DiscussionViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Discussion.objects.all()
     serializer_class = DiscussionSerializer
     pagination_class = DiscussionPagination
-    
-    def get_queryset(self):
-        queryset = Discussion.objects.all().order_by('-created_at')  # Most recent first
+    version_fields = ('views', 'unique_views', 'comment_count')
+
+    def get_filtered_queryset(self):
+        queryset = Discussion.objects.all()\
+            .order_by(*self.get_pagination_ordering())
         category = self.request.query_params.get('category', None)
         
         logger.debug(f"Category parameter received: {category}")
         
         if category is not None:
             queryset = queryset.filter(category__slug=category)
-            logger.debug(f"Filtered queryset count: {queryset.count()}")
+        return queryset
+    
+    def get_queryset(self):
+        if self.action == 'comments':
+            # Only looked up to 404 on unknown ids; the comments are paged
+            # by the action itself.
+            return Discussion.objects.all()
+
+        queryset = self.get_filtered_queryset().select_related('author', 'category')
+
+        if self.action != 'list':
+            queryset = queryset.prefetch_related(
+                Prefetch('comments', queryset=Comment.objects.select_related('author'))
+            )
             
         return queryset
 
+    def get_pagination_ordering(self):
+        if self.action == 'comments':
+            return CommentPagination.ordering
+        # Pinned discussions first, then by creation or latest comment.
+        if self.request.query_params.get('sort') == 'active':
+            return ('-is_pinned', '-last_activity_at', '-id')
+        return ('-is_pinned', '-created_at', '-id')
+
     def get_serializer_class(self):
         if self.action == 'create':
             return DiscussionCreateSerializer
+        if self.action == 'list':
+            return DiscussionListSerializer
+        if self.action == 'comments':
+            return CommentSerializer
         return DiscussionSerializer
 
+    def get_validator_queryset(self):
+        return self.get_filtered_queryset()
+
+    def get_list_aggregates(self):
+        # Comments change comment_count and last_activity_at through
+        # update(), without touching updated_at.
+        aggregates = super().get_list_aggregates()
+        aggregates['last_activity'] = Max('last_activity_at')
+        return aggregates
+
+    def get_object_validators(self, instance):
+        values, last_modified = super().get_object_validators(instance)
+        comments = instance.comments.all()  # prefetched
+        values['comments'] = len(comments)
+        values['comments_modified'] = max((c.updated_at for c in comments), default=None)
+        return values, last_modified
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        # Buffered: the counters are written in batches by view_counter.
+        view_counter.record(instance.pk, viewer_key(request))
+        return self.retrieve_conditionally(request, instance)
+
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
-class CommentViewSet(viewsets.ModelViewSet):
+    @action(detail=True, url_path='comments', pagination_class=CommentPagination)
+    def comments(self, request, pk=None):
+        """
+        The discussion's comments, oldest first, in keyset pages. ``after`` (a
+        comment id) returns only the comments posted after that one, so a
+        client can poll for new comments.
+        """
+        discussion = self.get_object()
+        queryset = Comment.objects.filter(discussion=discussion)\
+            .select_related('author')
+
+        after = request.query_params.get('after')
+        if after:
+            try:
+                after = int(after)
+            except ValueError:
+                return Response({'error': 'Invalid after comment id'}, status=status.HTTP_400_BAD_REQUEST)
+            anchor = Comment.objects.filter(pk=after, discussion=discussion)\
+                .values_list('created_at', flat=True)\
+                .first()
+            if anchor is None:
+                # The comment was deleted; ids still grow with time.
+                queryset = queryset.filter(pk__gt=after)
+            else:
+                queryset = queryset.filter(
+                    Q(created_at__gt=anchor) | Q(created_at=anchor, pk__gt=after)
+                )
+
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+class CommentViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Comment.objects.all()
     permission_classes = [IsAuthenticated]
+    pagination_class = CommentPagination
+
+    def get_queryset(self):
+        return Comment.objects.all()\
+            .select_related('author')\
+            .order_by('created_at', 'id')
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -67,7 +169,14 @@ class CommentViewSet(viewsets.ModelViewSet):
         return CommentSerializer
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user)
+        # The discussion's activity fields are updated by a signal; commit
+        # both or neither.
+        with transaction.atomic():
+            serializer.save(author=self.request.user)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            instance.delete()
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
@@ -93,10 +202,12 @@ def login_view(request):
     )
 
 
-class NewsViewSet(viewsets.ModelViewSet):
+class NewsViewSet(CachedListMixin, ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = News.objects.all()
     serializer_class = NewsSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    cache_namespace = 'news'
 
     def get_permissions(self):
         """
@@ -106,31 +217,112 @@ class NewsViewSet(viewsets.ModelViewSet):
             return [IsAdminUser()]
         return [AllowAny()]
 
-class ProgrammingLanguageViewSet(viewsets.ModelViewSet):
+class ProgrammingLanguageViewSet(CachedListMixin, viewsets.ModelViewSet):
     queryset = ProgrammingLanguage.objects.all()
     serializer_class = ProgrammingLanguageSerializer
     permission_classes = [IsAdminUser]  # Only admin users can manage languages
+    cache_namespace = 'languages'
     
     def get_queryset(self):
         return ProgrammingLanguage.objects.all().order_by('name')
 
-class CodeSnippetViewSet(viewsets.ModelViewSet):
+class UserReactionContextMixin:
+    """
+    Resolve the requesting user's reactions for every object being serialized
+    with one query, and pass them to the serializer as
+    ``context['user_reactions']`` (a dict of object id -> reaction).
+    """
+
+    def get_user_reactions(self, user, ids):
+        return user_reactions(user, self.queryset.model, ids)
+
+    def get_serializer(self, *args, **kwargs):
+        user = self.request.user
+        if args and args[0] is not None and user.is_authenticated:
+            instances = list(args[0]) if kwargs.get('many') else [args[0]]
+            ids = [instance.pk for instance in instances]
+            kwargs.setdefault('context', self.get_serializer_context())
+            kwargs['context']['user_reactions'] = self.get_user_reactions(user, ids) if ids else {}
+            if kwargs.get('many'):
+                args = (instances,) + args[1:]
+        return super().get_serializer(*args, **kwargs)
+
+class BulkCreateMixin:
+    """
+    ``POST <list url>/bulk/`` (admins only) creates many objects from a JSON
+    array or an NDJSON stream, e.g. when importing from another platform.
+    Items are validated one by one with ``bulk_serializer_class`` and the
+    valid ones are created in batches of ``bulk_batch_size``. Invalid items,
+    and items of a batch the database rejected, are reported by position.
+    """
+    bulk_serializer_class = None
+    bulk_batch_size = 500
+
+    def perform_bulk_create(self, items):
+        """Create the objects for ``items`` (validated data) and return them."""
+        raise ImproperlyConfigured(
+            f"'{type(self).__name__}' should override `perform_bulk_create()`."
+        )
+
+    @action(detail=False, methods=['POST'], url_path='bulk', permission_classes=[IsAdminUser],
+            parser_classes=[JSONParser, NDJSONParser])
+    def bulk(self, request):
+        if not isinstance(request.data, list):
+            return Response(
+                {'error': 'Expected a JSON array or NDJSON stream'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        created, errors, batch = [], [], []
+
+        def flush():
+            try:
+                created.extend(obj.pk for obj in self.perform_bulk_create([item for _, item in batch]))
+            except (IntegrityError, DataError) as e:
+                errors.extend({'index': index, 'errors': {'non_field_errors': [str(e)]}} for index, _ in batch)
+            batch.clear()
+
+        context = self.get_serializer_context()
+        for index, data in enumerate(request.data):
+            serializer = self.bulk_serializer_class(data=data, context=context)
+            if serializer.is_valid():
+                batch.append((index, {**serializer.validated_data, 'author': request.user}))
+            else:
+                errors.append({'index': index, 'errors': serializer.errors})
+            if len(batch) >= self.bulk_batch_size:
+                flush()
+        if batch:
+            flush()
+
+        return Response(
+            {'created': len(created), 'ids': created, 'errors': errors},
+            status=status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST
+        )
+
+class CodeSnippetViewSet(ConditionalGetMixin, UserReactionContextMixin, BulkCreateMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     serializer_class = CodeSnippetSerializer
     queryset = CodeSnippet.objects.all()
+    pagination_class = KeysetPagination
+    version_fields = ('likes_count', 'dislikes_count')
+    bulk_serializer_class = CodeSnippetCreateSerializer
 
     def get_queryset(self):
-        sort_by = self.request.query_params.get('sort', 'newest')
         queryset = CodeSnippet.objects.all()\
-            .select_related('author')\
-            .prefetch_related('codes', 'codes__language', 'likes', 'dislikes')
-        
+            .select_related('author')
+        if self.action in ('list', 'retrieve'):
+            # Only the serialized representations show the codes.
+            queryset = queryset.prefetch_related('codes', 'codes__language')
+        return queryset.order_by(*self.get_pagination_ordering())
+
+    def get_pagination_ordering(self):
+        sort_by = self.request.query_params.get('sort', 'newest')
         if sort_by == 'oldest':
-            return queryset.order_by('created_at')
+            return ('created_at', 'id')
         elif sort_by == 'most_liked':
-            return sorted(queryset.all(), key=lambda x: (-x.likes_count, -x.created_at.timestamp()))
+            return ('-likes_count', '-created_at', '-id')
         else:  # newest
-            return queryset.order_by('-created_at')
+            return ('-created_at', '-id')
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -140,56 +332,56 @@ class CodeSnippetViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if self.action == 'bulk':
+            context['language_ids'] = set(ProgrammingLanguage.objects.values_list('pk', flat=True))
+        return context
+
+    def perform_bulk_create(self, items):
+        return create_snippets(items)
+
     @action(detail=True, methods=['POST'])
     def like(self, request, pk=None):
         snippet = self.get_object()
-        user = request.user
-        
-        if user in snippet.dislikes.all():
-            snippet.dislikes.remove(user)
-        
-        if user in snippet.likes.all():
-            snippet.likes.remove(user)
-            reaction = None
-        else:
-            snippet.likes.add(user)
-            reaction = 'like'
+        reaction, counts = toggle_reaction(request.user, snippet, Reaction.LIKE)
         
         return Response({
-            'likes_count': snippet.likes_count,
-            'dislikes_count': snippet.dislikes_count,
+            'likes_count': counts['likes_count'],
+            'dislikes_count': counts['dislikes_count'],
             'user_reaction': reaction
         })
 
     @action(detail=True, methods=['POST'])
     def dislike(self, request, pk=None):
         snippet = self.get_object()
-        user = request.user
-        
-        if user in snippet.likes.all():
-            snippet.likes.remove(user)
-        
-        if user in snippet.dislikes.all():
-            snippet.dislikes.remove(user)
-            reaction = None
-        else:
-            snippet.dislikes.add(user)
-            reaction = 'dislike'
+        reaction, counts = toggle_reaction(request.user, snippet, Reaction.DISLIKE)
         
         return Response({
-            'likes_count': snippet.likes_count,
-            'dislikes_count': snippet.dislikes_count,
+            'likes_count': counts['likes_count'],
+            'dislikes_count': counts['dislikes_count'],
             'user_reaction': reaction
         })
 
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
+class TagViewSet(CachedListMixin, viewsets.ReadOnlyModelViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = [IsAuthenticated]
+    cache_namespace = 'tags'
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.query_params.get('sort') == 'popular':
+            # Served by tag_popular_idx.
+            queryset = queryset.order_by('-blog_count', 'name')
+        return queryset
 
-class BlogViewSet(viewsets.ModelViewSet):
+class BlogViewSet(ConditionalGetMixin, UserReactionContextMixin, BulkCreateMixin, viewsets.ModelViewSet):
     queryset = Blog.objects.all()
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    version_fields = ('likes_count',)
+    bulk_serializer_class = BlogCreateSerializer
     
     def get_serializer_class(self):
         if self.action == 'create':
@@ -202,36 +394,209 @@ class BlogViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
+    def perform_update(self, serializer):
+        blog = serializer.save()
+        if 'image' in serializer.validated_data:
+            schedule_variants(blog)
+
+    def perform_bulk_create(self, items):
+        return create_blogs(items)
+
     def get_queryset(self):
-        queryset = Blog.objects.all().order_by('-created_at')
+        queryset = Blog.objects.all()\
+            .select_related('author')\
+            .prefetch_related('tags')\
+            .order_by('-created_at', '-id')
         tag = self.request.query_params.get('tag', None)
         if tag:
-            queryset = queryset.filter(tags__slug=tag)
-        return queryset.distinct()
+            # A semi-join on the link table keeps one row per blog, so no
+            # DISTINCT sort over the joined rows is needed.
+            links = Blog.tags.through.objects\
+                .filter(tag__slug=tag)\
+                .values('blog_id')
+            queryset = queryset.filter(pk__in=links)
+        return queryset
 
     @action(detail=True, methods=['POST'])
     def like(self, request, pk=None):
         blog = self.get_object()
-        user = request.user
-        
-        if user in blog.likes.all():
-            blog.likes.remove(user)
-            liked = False
-        else:
-            blog.likes.add(user)
-            liked = True
+        reaction, counts = toggle_reaction(request.user, blog, Reaction.LIKE)
         
         return Response({
-            'likes_count': blog.likes_count,
-            'user_has_liked': liked
+            'likes_count': counts['likes_count'],
+            'user_has_liked': reaction == Reaction.LIKE
+        })
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_reactions(request):
+    """
+    Apply many reactions in one request, e.g. when an offline client syncs.
+    Each item sets the final state (``kind`` null clears it), so replaying a
+    batch is harmless.
+    """
+    serializer = ReactionSyncSerializer(data=request.data, many=True)
+    serializer.is_valid(raise_exception=True)
+
+    items = [
+        (REACTION_TARGETS[item['target']], item['id'], item['kind'])
+        for item in serializer.validated_data
+    ]
+    states, missing = sync_reactions(request.user, items)
+
+    names = {model: name for name, model in REACTION_TARGETS.items()}
+    return Response({
+        'results': [
+            {'target': names[model], 'id': object_id, 'user_reaction': kind, **counts}
+            for (model, object_id), (kind, counts) in states.items()
+        ],
+        'missing': [
+            {'target': names[model], 'id': object_id}
+            for model, object_id in missing
+        ],
+    })
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def search_view(request):
+    """
+    Ranked full-text search. ``q`` is the query and ``type`` an optional
+    comma-separated list of search types. Anonymous users only see types
+    whose listings are public.
+    """
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response({'error': 'Missing search query'}, status=status.HTTP_400_BAD_REQUEST)
+
+    allowed = list(SEARCH_SOURCES) if request.user.is_authenticated else list(PUBLIC_SEARCH_TYPES)
+    requested = request.query_params.get('type')
+    kinds = allowed
+    if requested:
+        kinds = [kind for kind in requested.split(',') if kind in allowed]
+
+    terms, ranked = search(query, kinds)
+    paginator = SearchPagination()
+    hits = paginator.paginate_queryset(ranked, request)
+    documents = load_documents(hits)
+
+    results = []
+    for hit in hits:
+        document = documents.get((hit['kind'], hit['object_id']))
+        if document is None:
+            continue
+        results.append({
+            'type': document.kind,
+            'id': document.object_id,
+            'parent_id': document.parent_id,
+            'title': document.title,
+            'snippet': make_snippet(document.body, terms),
+            'created_at': document.created_at,
+            'score': round(hit['score'], 4),
         })
+    return paginator.get_paginated_response(results)
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def cache_stats(request):
+    return Response(response_cache_stats())
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def db_pool_stats(request):
+    # Per process: each worker reports its own pools.
+    return Response({'pid': os.getpid(), 'pools': pool_stats()})
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def export_view(request, kind):
+    """
+    Stream every row of ``kind`` as NDJSON. ``since`` (ISO 8601) limits the
+    export to rows updated at or after that time.
+    """
+    if kind not in EXPORTS:
+        return Response({'error': f'Unknown export type: {kind}'}, status=status.HTTP_404_NOT_FOUND)
+
+    since = request.query_params.get('since')
+    if since:
+        try:
+            since = parse_datetime(since)
+        except ValueError:
+            since = None
+        if since is None:
+            return Response({'error': 'Invalid since timestamp'}, status=status.HTTP_400_BAD_REQUEST)
+        if timezone.is_naive(since):
+            since = timezone.make_aware(since)
+
+    # ASGI buffers a synchronous streaming iterator in full; give it an
+    # async one.
+    if isinstance(request._request, ASGIRequest):
+        lines = aexport_lines(kind, since)
+    else:
+        lines = export_lines(kind, since)
+    response = StreamingHttpResponse(lines, content_type='application/x-ndjson')
+    response['Content-Disposition'] = f'attachment; filename="{kind}.ndjson"'
+    return response
+
+# Role names as reported by UserSerializer.get_role.
+USER_ROLES = {
+    'admin': Q(is_superuser=True),
+    'moderator': Q(is_superuser=False, is_staff=True),
+    'user': Q(is_superuser=False, is_staff=False),
+}
+
+USER_SORTS = {
+    'newest': ('-date_joined', '-id'),
+    'oldest': ('date_joined', 'id'),
+    'username': ('username', 'id'),
+    'email': ('email', 'id'),
+}
 
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
 def user_list(request):
+    """
+    Cursor-paginated user listing. Filters: ``role`` (admin, moderator,
+    user), ``is_active`` (true/false) and ``q``, a username or email
+    prefix. ``sort`` is one of newest (default), oldest, username or email.
+    The first page also carries ``role_counts`` over all users.
+    """
     users = User.objects.all()
-    serializer = UserSerializer(users, many=True)
-    return Response(serializer.data)
+
+    role = request.query_params.get('role')
+    if role:
+        if role not in USER_ROLES:
+            return Response({'error': f'Unknown role: {role}'}, status=status.HTTP_400_BAD_REQUEST)
+        users = users.filter(USER_ROLES[role])
+
+    is_active = request.query_params.get('is_active')
+    if is_active:
+        if is_active.lower() not in ('true', 'false'):
+            return Response({'error': 'is_active must be true or false'}, status=status.HTTP_400_BAD_REQUEST)
+        users = users.filter(is_active=is_active.lower() == 'true')
+
+    prefix = request.query_params.get('q', '').strip()
+    if prefix:
+        # istartswith is a plain LIKE 'x%' on MySQL, case-insensitive under
+        # the column collation, so it can range-scan the username and email
+        # indexes. startswith would compile to LIKE BINARY, which can't.
+        users = users.filter(Q(username__istartswith=prefix) | Q(email__istartswith=prefix))
+
+    sort = request.query_params.get('sort', 'newest')
+    if sort not in USER_SORTS:
+        return Response({'error': f'Unknown sort: {sort}'}, status=status.HTTP_400_BAD_REQUEST)
+
+    paginator = UserPagination()
+    paginator.ordering = USER_SORTS[sort]
+    page = paginator.paginate_queryset(users, request)
+    response = paginator.get_paginated_response(UserSerializer(page, many=True).data)
+
+    if not request.query_params.get(paginator.cursor_query_param):
+        response.data['role_counts'] = User.objects.aggregate(
+            total=Count('pk'),
+            active=Count('pk', filter=Q(is_active=True)),
+            **{name: Count('pk', filter=condition) for name, condition in USER_ROLES.items()},
+        )
+    return response
 
 @api_view(['PATCH'])
 @permission_classes([IsAdminUser])
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+# Serve the hot read endpoints from the async views in api.async_views.
+os.environ.setdefault('DJANGO_ROOT_URLCONF', 'backend.asgi_urls')
 
 application = get_asgi_application()
@@ -0,0 +1,25 @@
+"""
+URL configuration used under ASGI (see backend/asgi.py).
+
+GET requests to the listed endpoints go to the async views in
+``api.async_views``; everything else falls through to ``backend.urls``.
+"""
+from django.urls import re_path
+
+from api.async_views import AsyncBlogView, AsyncCodeSnippetView, AsyncDiscussionView, AsyncNewsView
+from backend.urls import urlpatterns as sync_urlpatterns
+
+async_views = [
+    ('discussions', AsyncDiscussionView),
+    ('blogs', AsyncBlogView),
+    ('snippets', AsyncCodeSnippetView),
+    ('news', AsyncNewsView),
+]
+
+urlpatterns = []
+for prefix, view in async_views:
+    urlpatterns += [
+        re_path(rf'^api/{prefix}/$', view.as_view()),
+        re_path(rf'^api/{prefix}/(?P<pk>\d+)/$', view.as_view()),
+    ]
+urlpatterns += sync_urlpatterns
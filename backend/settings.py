@@ -47,6 +47,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',    # First
+    'api.instrumentation.QueryInstrumentationMiddleware',  # Only with SQL_INSTRUMENTATION
+    'api.replicas.ReplicaMiddleware',  # Only with DATABASE_REPLICAS
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -102,7 +104,7 @@ CORS_EXPOSE_HEADERS = ['*']
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ),
 }
 
@@ -112,7 +114,9 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
 }
 
-ROOT_URLCONF = 'backend.urls'
+# backend/asgi.py switches to backend.asgi_urls, which adds the async read
+# views in front of the regular routes.
+ROOT_URLCONF = os.environ.get('DJANGO_ROOT_URLCONF', 'backend.urls')
 
 TEMPLATES = [
     {
@@ -136,9 +140,14 @@ WSGI_APPLICATION = 'backend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# DB_POOL=True swaps in a MySQL backend with a per-process connection pool
+# (api.db.pool). Connections then go back to the pool after every request
+# instead of being held by each thread, so CONN_MAX_AGE defaults to 0.
+DB_POOL = os.environ.get('DB_POOL', 'False') == 'True'
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.mysql',
+        'ENGINE': 'api.db.mysql_pool' if DB_POOL else 'django.db.backends.mysql',
         'NAME': os.environ.get('DB_NAME', 'forum_db'),
         'USER': os.environ.get('DB_USER', 'forum_user'),
         'PASSWORD': os.environ.get('DB_PASSWORD', 'forum_password'),
@@ -147,10 +156,66 @@ DATABASES = {
         'OPTIONS': {
             'init_command': "SET sql_mode='STRICT_TRANS_TABLES'",
             'charset': 'utf8mb4'
-        }
+        },
+        # Keep connections open between requests rather than reconnecting
+        # (and rerunning init_command) every time, and ping a reused
+        # connection before its first query in a request.
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '0' if DB_POOL else '60')),
+        'CONN_HEALTH_CHECKS': os.environ.get('DB_CONN_HEALTH_CHECKS', 'True') == 'True',
+        'POOL': {
+            'MAX_SIZE': int(os.environ.get('DB_POOL_MAX_SIZE', '10')),
+            'IDLE_TIMEOUT': int(os.environ.get('DB_POOL_IDLE_TIMEOUT', '300')),
+            'TIMEOUT': float(os.environ.get('DB_POOL_TIMEOUT', '10')),
+        },
     }
 }
 
+# Read replicas: DB_REPLICA_HOSTS is a comma-separated list of "host" or
+# "host:port" entries, each added as a copy of the default database
+# (replica1, replica2, ...). GET, HEAD and OPTIONS requests read from a
+# replica; writes and other requests use the primary (api.replicas).
+DATABASE_REPLICAS = []
+for number, replica in enumerate(filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(',')), start=1):
+    host, _, port = replica.strip().partition(':')
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        'HOST': host,
+        'PORT': port or DATABASES['default']['PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica{number}')
+
+DATABASE_ROUTERS = ['api.replicas.ReplicaRouter']
+
+# Seconds a client's reads stay on the primary after it sends a write, so it
+# sees its own changes. Needs a shared cache to hold across workers.
+REPLICA_PIN_SECONDS = int(os.environ.get('REPLICA_PIN_SECONDS', '5'))
+
+# Reads fall back to the primary while a replica is further behind than this
+# (or not replicating at all). Lag is rechecked every REPLICA_CHECK_INTERVAL
+# seconds per process.
+REPLICA_MAX_LAG_SECONDS = float(os.environ.get('REPLICA_MAX_LAG_SECONDS', '5'))
+REPLICA_CHECK_INTERVAL = float(os.environ.get('REPLICA_CHECK_INTERVAL', '5'))
+
+
+# Cache
+# Defaults to a per-process memory cache. Point CACHE_BACKEND at the file or
+# database backend to share entries (and invalidations) between workers.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', 'noure-default'),
+    }
+}
+
+# Seconds a cached reference-data response (tags, languages, categories,
+# news) may be served before it is rebuilt, even without an invalidation.
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get('RESPONSE_CACHE_TIMEOUT', '300'))
+
+# Seconds an authenticated user's row is served from the cache. Saving the
+# user invalidates it, but only in this process unless the cache is shared.
+JWT_USER_CACHE_TIMEOUT = int(os.environ.get('JWT_USER_CACHE_TIMEOUT', '60'))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -193,10 +258,51 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Discussion view counting: hits are buffered per process and flushed in
+# batches. With a spool directory set, workers write their buffers there and
+# `manage.py merge_view_counts` applies them.
+DISCUSSION_VIEW_FLUSH_INTERVAL = int(os.environ.get('DISCUSSION_VIEW_FLUSH_INTERVAL', '30'))
+DISCUSSION_VIEW_FLUSH_THRESHOLD = int(os.environ.get('DISCUSSION_VIEW_FLUSH_THRESHOLD', '200'))
+DISCUSSION_VIEW_SPOOL_DIR = os.environ.get('DISCUSSION_VIEW_SPOOL_DIR', '')
+
+# SQL instrumentation: per-request query counts and timings as Server-Timing
+# headers and JSON log lines, with N+1 and slow-query reports.
+SQL_INSTRUMENTATION = os.environ.get('SQL_INSTRUMENTATION', 'False') == 'True'
+SQL_SLOW_QUERY_MS = float(os.environ.get('SQL_SLOW_QUERY_MS', '100'))
+SQL_NPLUSONE_THRESHOLD = int(os.environ.get('SQL_NPLUSONE_THRESHOLD', '10'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'api.instrumentation': {
+            'handlers': ['console'],
+            'level': os.environ.get('SQL_INSTRUMENTATION_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
 # Media files configuration
 MEDIA_URL = '/blog_images/'
 MEDIA_ROOT = str(BASE_DIR / 'blog_images')
 
+# Hand media downloads to the front proxy: '' (serve from Django),
+# 'xsendfile' (Apache/lighttpd) or 'xaccel' (nginx internal location).
+MEDIA_SENDFILE_BACKEND = os.environ.get('MEDIA_SENDFILE_BACKEND', '')
+MEDIA_ACCEL_REDIRECT_PREFIX = os.environ.get('MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+
+# Blog image variants: widths rendered (as WebP plus the original format)
+# after an upload, by a small background thread pool.
+IMAGE_VARIANT_WIDTHS = [
+    int(width) for width in os.environ.get('IMAGE_VARIANT_WIDTHS', '160,320,640,1280').split(',')
+]
+IMAGE_VARIANT_WORKERS = int(os.environ.get('IMAGE_VARIANT_WORKERS', '2'))
+IMAGE_VARIANTS_IN_BACKGROUND = os.environ.get('IMAGE_VARIANTS_IN_BACKGROUND', 'True') == 'True'
+
 # Security settings
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
 SESSION_COOKIE_SECURE = True
@@ -0,0 +1,15 @@
+"""
+Settings for the test suite:
+
+    python manage.py test --settings=backend.test_settings
+"""
+from .settings import *  # noqa: F403
+
+# A "replica" database with its own test database rather than a mirror of
+# default, so api.tests can tell which database served a request. The tests
+# route reads to it with override_settings. Its tables are created from the
+# models; the data migrations only run on default.
+DATABASES['replica'] = {
+    **DATABASES['default'],
+    'TEST': {'NAME': f"test_{DATABASES['default']['NAME']}_replica", 'MIGRATE': False},
+}
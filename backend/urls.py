@@ -22,11 +22,10 @@ from api.views import (
     login_view, NewsViewSet, ProgrammingLanguageViewSet, 
     CodeSnippetViewSet, BlogViewSet, TagViewSet,
     user_list, toggle_user_status, create_user, update_user,
-    GroupViewSet
+    GroupViewSet, bulk_reactions, search_view, cache_stats, db_pool_stats, export_view
 )
 from django.conf import settings
-from django.conf.urls.static import static
-from django.views.static import serve
+from api.media import serve_media
 import os
 from django.http import JsonResponse
 
@@ -60,15 +59,18 @@ urlpatterns = [
     path('api/', include(router.urls)),
     path('api/admin/', include(admin_router.urls)),  # Admin endpoints
     path('api/login/', login_view, name='login'),
+    path('api/reactions/bulk/', bulk_reactions, name='bulk-reactions'),
+    path('api/search/', search_view, name='search'),
     path('api/admin/users/create/', create_user, name='create-user'),
     path('api/admin/users/', user_list, name='user-list'),
     path('api/admin/users/<int:user_id>/update/', update_user, name='update-user'),
     path('api/admin/users/<int:user_id>/toggle/', toggle_user_status, name='toggle-user-status'),
-    path('blog_images/<path:path>', serve, {
-        'document_root': settings.MEDIA_ROOT,
-    }),
+    path('api/admin/cache-stats/', cache_stats, name='cache-stats'),
+    path('api/admin/db-pool-stats/', db_pool_stats, name='db-pool-stats'),
+    path('api/admin/export/<str:kind>/', export_view, name='export'),
+    path('blog_images/<path:path>', serve_media, name='media'),
     path('api/debug-media/', debug_media, name='debug-media'),
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+]
 
 print("MEDIA_ROOT exists:", os.path.exists(settings.MEDIA_ROOT))
 print("MEDIA_ROOT contents:", os.listdir(settings.MEDIA_ROOT) if os.path.exists(settings.MEDIA_ROOT) else "Directory not found")
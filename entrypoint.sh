@@ -27,6 +27,20 @@ else:
 END
 fi
 
-# Start the application
-echo "Starting application..."
-python manage.py runserver 0.0.0.0:8000 
\ No newline at end of file
+# Start the application. APP_SERVER selects the server:
+#   gunicorn  (default) WSGI workers tuned by gunicorn.conf.py
+#   asgi      the same gunicorn setup with uvicorn workers on backend.asgi
+#   runserver Django's development server, for local work only
+echo "Starting application (${APP_SERVER:-gunicorn})..."
+case "${APP_SERVER:-gunicorn}" in
+    runserver)
+        exec python manage.py runserver 0.0.0.0:8000
+        ;;
+    asgi)
+        exec gunicorn backend.asgi:application --worker-class uvicorn.workers.UvicornWorker
+        ;;
+    *)
+        exec gunicorn backend.wsgi:application
+        ;;
+esac
+ 
\ No newline at end of file
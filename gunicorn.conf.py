@@ -0,0 +1,61 @@
+"""
+Gunicorn settings for production, read from environment variables.
+
+gunicorn loads this file from the working directory, so
+``gunicorn backend.wsgi:application`` picks it up without extra flags.
+The defaults suit a container with a few CPUs in front of MySQL:
+
+- ``2 * CPUs + 1`` worker processes.
+- A few threads per worker, so requests blocked on the database do not
+  stall a whole process.
+- Workers recycle after ``max_requests`` requests, with jitter so that they
+  don't all restart together.
+"""
+import multiprocessing
+import os
+
+
+def _int(name, default):
+    return int(os.environ.get(name, default))
+
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+
+workers = _int('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1)
+threads = _int('GUNICORN_THREADS', 4)
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread' if threads > 1 else 'sync')
+
+# Import Django once in the master and fork the workers from it: faster
+# restarts and copy-on-write memory sharing. Connections are opened lazily
+# by each worker, so nothing database-related is shared across the fork.
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'True') == 'True'
+
+max_requests = _int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = _int('GUNICORN_MAX_REQUESTS_JITTER', 100)
+
+timeout = _int('GUNICORN_TIMEOUT', 30)
+graceful_timeout = _int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = _int('GUNICORN_KEEPALIVE', 5)
+
+# Worker heartbeats go to a tmpfs; Docker's overlay filesystem can make
+# them block long enough to trip the timeout.
+worker_tmp_dir = os.environ.get('GUNICORN_WORKER_TMP_DIR', '/dev/shm' if os.path.isdir('/dev/shm') else None)
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOG_LEVEL', 'info')
+
+
+def post_fork(server, worker):
+    from django.db import connections
+
+    # Never reuse a connection the master may have opened while preloading.
+    for connection in connections.all(initialized_only=True):
+        connection.close()
+
+
+def worker_exit(server, worker):
+    # Recycled workers must not lose buffered discussion views.
+    from api.viewcounts import view_counter
+
+    view_counter.flush()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+"""
+Measure concurrency of the async read path when the database is slow.
+
+The database is a throwaway SQLite file with an artificial delay added to
+every query through a connection execute wrapper. It stands in for a loaded
+MySQL server. The same endpoint is served three ways:
+
+- wsgi: gunicorn gthread with one worker and ``--threads`` threads, the
+  production WSGI setup.
+- asgi-sync: uvicorn with the regular sync DRF views (backend.urls).
+- asgi-async: uvicorn with the async views (backend.asgi_urls).
+
+Each mode gets the same ``--concurrency`` keep-alive clients. Run from the
+project root:
+
+    python scripts/bench_async.py --latency-ms 20 --concurrency 32
+"""
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from bench_server import free_port, run_load, wait_until_ready  # noqa: E402
+
+SETTINGS_TEMPLATE = '''
+import os
+import time
+
+from backend.settings import *  # noqa: F401,F403
+from django.db.backends.signals import connection_created
+
+DATABASES = {{'default': {{'ENGINE': 'django.db.backends.sqlite3', 'NAME': {database!r}}}}}
+
+_LATENCY = float(os.environ.get('BENCH_DB_LATENCY_MS', '0')) / 1000
+
+
+def _slow_execute(execute, sql, params, many, context):
+    time.sleep(_LATENCY)
+    return execute(sql, params, many, context)
+
+
+def _add_latency(sender, connection, **kwargs):
+    # The wrapper object outlives the connections it opens; add it once.
+    if _LATENCY and _slow_execute not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_slow_execute)
+
+
+connection_created.connect(_add_latency)
+'''
+
+SEED = '''
+from django.contrib.auth.models import User
+from api.models import Category, Comment, Discussion
+
+author = User.objects.create_user('bench', 'bench@example.com', 'bench')
+category = Category.objects.create(name='Bench')
+discussions = Discussion.objects.bulk_create([
+    Discussion(title=f'Discussion {{i}}', content='Body ' * 50, author=author, category=category)
+    for i in range({discussions})
+])
+Comment.objects.bulk_create([
+    Comment(discussion=discussion, content='Reply', author=author)
+    for discussion in discussions
+    for _ in range(5)
+])
+'''
+
+
+def server_command(mode, port, threads):
+    if mode == 'wsgi':
+        return [sys.executable, '-m', 'gunicorn', 'backend.wsgi:application', '--bind', f'127.0.0.1:{port}',
+                '--workers', '1', '--threads', str(threads), '--worker-class', 'gthread']
+    return [sys.executable, '-m', 'uvicorn', 'backend.asgi:application', '--port', str(port),
+            '--no-access-log', '--log-level', 'warning']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--path', default='/api/discussions/')
+    parser.add_argument('--latency-ms', type=float, default=20)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--threads', type=int, default=4, help='Threads of the WSGI worker.')
+    parser.add_argument('--discussions', type=int, default=100)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench-async-')
+    with open(os.path.join(workdir, 'bench_async_settings.py'), 'w') as handle:
+        handle.write(SETTINGS_TEMPLATE.format(database=os.path.join(workdir, 'db.sqlite3')))
+
+    env = dict(
+        os.environ,
+        PYTHONPATH=os.pathsep.join([workdir, os.getcwd(), os.environ.get('PYTHONPATH', '')]),
+        DJANGO_SETTINGS_MODULE='bench_async_settings',
+        GUNICORN_ACCESS_LOG='/dev/null',
+    )
+    subprocess.run([sys.executable, 'manage.py', 'migrate', '-v0'], env=env, check=True)
+    subprocess.run([sys.executable, 'manage.py', 'shell', '-c', SEED.format(discussions=args.discussions)],
+                   env=env, check=True, stdout=subprocess.DEVNULL)
+
+    modes = {
+        'wsgi': 'backend.urls',
+        'asgi-sync': 'backend.urls',
+        'asgi-async': 'backend.asgi_urls',
+    }
+    results = {}
+    for mode, urlconf in modes.items():
+        port = free_port()
+        server_env = dict(env, DJANGO_ROOT_URLCONF=urlconf, BENCH_DB_LATENCY_MS=str(args.latency_ms))
+        process = subprocess.Popen(
+            server_command(mode, port, args.threads), env=server_env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_until_ready(port, args.path, {})
+            run_load(port, args.path, {}, args.concurrency, args.concurrency)
+            results[mode] = run_load(port, args.path, {}, args.requests, args.concurrency)
+        finally:
+            # SIGINT is an immediate shutdown for both servers.
+            process.send_signal(signal.SIGINT)
+            process.wait(timeout=30)
+        print(f'{mode:>10}: {json.dumps(results[mode])}', file=sys.stderr)
+
+    print(json.dumps({
+        'path': args.path,
+        'latency_ms_per_query': args.latency_ms,
+        'concurrency': args.concurrency,
+        'results': results,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
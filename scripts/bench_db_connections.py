@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+"""
+Measure the per-request cost of opening database connections.
+
+The same authenticated GET is sent ``--requests`` times through the Django
+test client under each connection mode:
+
+- reconnect: ``CONN_MAX_AGE=0``, a new connection (and init_command) for
+  every request, as before.
+- persistent: ``CONN_MAX_AGE=60`` with health checks.
+- pooled: the ``DB_POOL`` backend with ``CONN_MAX_AGE=0``.
+
+Connections are closed or recycled between requests the way the WSGI and
+ASGI handlers do it. Each mode reports the time spent in ``connect()`` per
+request, the number of connections opened and the mean request time. Run it
+from the project root against the real database settings:
+
+    DB_HOST=... python scripts/bench_db_connections.py --path /api/discussions/
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+MODES = {
+    'reconnect': {'DB_CONN_MAX_AGE': '0', 'DB_POOL': 'False'},
+    'persistent': {'DB_CONN_MAX_AGE': '60', 'DB_POOL': 'False'},
+    'pooled': {'DB_CONN_MAX_AGE': '0', 'DB_POOL': 'True'},
+}
+
+WORKER = '''
+import json
+import time
+
+from django.contrib.auth.models import User
+from django.db import close_old_connections, connection, connections
+from django.test import Client
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from api.db.pool import pool_stats
+
+connects = []
+DatabaseWrapper = type(connections['default'])
+original_connect = DatabaseWrapper.connect
+
+
+def timed_connect(self):
+    started = time.perf_counter()
+    try:
+        return original_connect(self)
+    finally:
+        connects.append(time.perf_counter() - started)
+
+
+DatabaseWrapper.connect = timed_connect
+
+
+
+def request(client):
+    # Servers run close_old_connections around every request, which closes
+    # or recycles the connection; the test client deliberately skips it.
+    close_old_connections()
+    try:
+        return client.get({path!r}).status_code
+    finally:
+        close_old_connections()
+
+
+user = User.objects.filter(is_superuser=True).order_by('pk').first()
+headers = {{'HTTP_AUTHORIZATION': f'Bearer {{RefreshToken.for_user(user).access_token}}'}} if user else {{}}
+connection.close()
+client = Client(**headers)
+for _ in range({warmup}):
+    request(client)
+del connects[:]
+
+started = time.perf_counter()
+for _ in range({requests}):
+    status = request(client)
+elapsed = time.perf_counter() - started
+
+pools = pool_stats()
+print(json.dumps({{
+    'status': status,
+    'requests': {requests},
+    'mean_request_ms': round(elapsed / {requests} * 1000, 3),
+    'connects': len(connects),
+    'connections_opened': pools['default']['created'] if pools else len(connects),
+    'connect_ms_per_request': round(sum(connects) / {requests} * 1000, 3),
+}}))
+'''
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--path', default='/api/discussions/')
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--mode', action='append', choices=list(MODES), help='Default: all modes.')
+    args = parser.parse_args()
+
+    code = WORKER.format(path=args.path, requests=args.requests, warmup=args.warmup)
+    results = {}
+    for mode in args.mode or list(MODES):
+        output = subprocess.run(
+            [sys.executable, 'manage.py', 'shell', '-c', code],
+            env=dict(os.environ, **MODES[mode]), check=True, stdout=subprocess.PIPE, text=True,
+        ).stdout
+        results[mode] = json.loads(output.strip().splitlines()[-1])
+        print(f'{mode:>10}: {json.dumps(results[mode])}', file=sys.stderr)
+
+    baseline = results.get('reconnect')
+    if baseline:
+        for result in results.values():
+            result['connect_ms_saved_per_request'] = round(
+                baseline['connect_ms_per_request'] - result['connect_ms_per_request'], 3
+            )
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+"""
+Compare requests per second of the application servers.
+
+Starts each server mode on a free port and waits until it answers, then
+sends ``--requests`` GETs from ``--concurrency`` keep-alive clients. For
+each mode it prints throughput and latency percentiles. Run it from the
+project root with the environment the server needs, e.g.:
+
+    python scripts/bench_server.py --path '/api/search/?q=django' \\
+        --mode runserver --mode gunicorn --mode asgi
+
+Authenticated endpoints can be measured with
+``--header 'Authorization: Bearer <token>'``.
+"""
+import argparse
+import http.client
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+MODES = {
+    'runserver': ['{python}', 'manage.py', 'runserver', '--noreload', '127.0.0.1:{port}'],
+    'gunicorn': ['{python}', '-m', 'gunicorn', 'backend.wsgi:application', '--bind', '127.0.0.1:{port}'],
+    'asgi': ['{python}', '-m', 'gunicorn', 'backend.asgi:application', '--bind', '127.0.0.1:{port}',
+             '--worker-class', 'uvicorn.workers.UvicornWorker'],
+}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(port, path, headers, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            connection.request('GET', path, headers=headers)
+            connection.getresponse().read()
+            connection.close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'server on port {port} did not come up within {timeout}s')
+
+
+def client(port, path, headers, count, latencies, errors):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    for _ in range(count):
+        started = time.perf_counter()
+        try:
+            connection.request('GET', path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors.append(response.status)
+            if response.getheader('Connection', '').lower() == 'close':
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        except (OSError, http.client.HTTPException) as exc:
+            errors.append(type(exc).__name__)
+            connection.close()
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        latencies.append(time.perf_counter() - started)
+    connection.close()
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run_load(port, path, headers, total, concurrency):
+    latencies, errors = [], []
+    per_client = [total // concurrency + (1 if i < total % concurrency else 0) for i in range(concurrency)]
+    threads = [
+        threading.Thread(target=client, args=(port, path, headers, count, latencies, errors))
+        for count in per_client
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return {
+        'requests': len(latencies),
+        'errors': len(errors),
+        'seconds': round(elapsed, 3),
+        'rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+    }
+
+
+def bench_mode(mode, args, headers):
+    port = free_port()
+    command = [part.format(python=sys.executable, port=port) for part in MODES[mode]]
+    env = dict(os.environ, GUNICORN_ACCESS_LOG=os.environ.get('GUNICORN_ACCESS_LOG', '/dev/null'))
+    process = subprocess.Popen(
+        command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True,
+    )
+    try:
+        wait_until_ready(port, args.path, headers)
+        run_load(port, args.path, headers, args.warmup, args.concurrency)
+        return run_load(port, args.path, headers, args.requests, args.concurrency)
+    finally:
+        os.killpg(process.pid, signal.SIGTERM)
+        process.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--mode', action='append', choices=sorted(MODES),
+                        help='Server mode to measure; repeat to compare (default: runserver and gunicorn).')
+    parser.add_argument('--path', default='/api/search/?q=django')
+    parser.add_argument('--header', action='append', default=[], help="Extra request header, 'Name: value'.")
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--warmup', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=16)
+    args = parser.parse_args()
+
+    headers = dict(header.split(': ', 1) for header in args.header)
+    results = {}
+    for mode in args.mode or ['runserver', 'gunicorn']:
+        results[mode] = bench_mode(mode, args, headers)
+        print(f'{mode:>10}: {json.dumps(results[mode])}', file=sys.stderr)
+
+    baseline = results.get('runserver')
+    if baseline:
+        for mode, result in results.items():
+            result['speedup_vs_runserver'] = round(result['rps'] / baseline['rps'], 2)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()